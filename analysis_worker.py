@@ -0,0 +1,62 @@
+# 분석 노드 실행부: HTTP 없이 브로커에서 영상/음성 분석 작업을 가져와 실행
+# API 노드(serve.py / main.py)와 분리해서 CPU를 많이 쓰는 분석만 따로 늘릴 수 있다.
+#
+#   ANALYSIS_BROKER=sqlite python serve.py                                  # API 노드: 작업을 넣기만 함
+#   ANALYSIS_BROKER=sqlite ANALYSIS_NODE_THREADS=4 python analysis_worker.py  # 분석 노드 (여러 개 실행 가능)
+#
+# - SIGTERM/SIGINT: 새 작업을 가져가지 않고 실행 중인 작업을 마친 뒤 종료
+# - 작업 중 노드가 죽으면 ANALYSIS_JOB_LEASE_SECONDS 후 다른 노드가 다시 가져감
+# - 죽은 노드가 남긴 임시 작업 디렉터리는 (API 노드와 마찬가지로) 주기적으로 정리
+
+import signal
+import sys
+import threading
+
+from config.settings import ANALYSIS_BROKER, ANALYSIS_NODE_THREADS, PRELOAD_MODELS, SCRATCH_SWEEP_INTERVAL_SECONDS
+from core.structured_logging import get_logger, setup_logging
+
+setup_logging()
+
+from core import model_registry  # noqa: E402
+from core.scratch import scratch  # noqa: E402
+from core.work_broker import TASKS, AnalysisNode, get_broker  # noqa: E402
+import domains.evaluation.service  # noqa: E402,F401  (@analysis_task 등록)
+
+logger = get_logger("analysis_worker")
+
+# 분석 노드에 필요 없는 모델 (답변 선별/잠정 점수는 API 노드에서 사용)
+_API_ONLY_MODELS = {"answer_screen", "score"}
+
+
+def _sweep_scratch_periodically(stopping: threading.Event):
+    """죽은 노드/예외로 남은 임시 작업 디렉터리를 주기적으로 정리"""
+    while True:
+        try:
+            scratch.sweep()
+        except Exception as e:
+            logger.error("❌ 임시 작업 디렉터리 정리 실패: %s", e)
+        if stopping.wait(SCRATCH_SWEEP_INTERVAL_SECONDS):
+            return
+
+
+def main():
+    if ANALYSIS_BROKER in ("local", "inprocess"):
+        sys.exit(f"ANALYSIS_BROKER={ANALYSIS_BROKER} 에서는 API 프로세스가 직접 분석합니다 (sqlite 등 공유 브로커 필요)")
+
+    model_registry.load_models([name for name in PRELOAD_MODELS if name not in _API_ONLY_MODELS])
+    node = AnalysisNode(get_broker(), ANALYSIS_NODE_THREADS)
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+
+    node.start()
+    threading.Thread(target=_sweep_scratch_periodically, args=(stopping,), name="scratch-sweeper", daemon=True).start()
+    logger.info("✅ 분석 노드 준비 완료 (브로커 %s, 작업 %s)", ANALYSIS_BROKER, ', '.join(sorted(TASKS)))
+    stopping.wait()
+    logger.info("분석 노드 종료 중: 실행 중인 작업 완료 대기")
+    node.stop()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,46 +1,130 @@
-from fastapi import APIRouter, HTTPException, Body
-from dotenv import load_dotenv
-from openai import OpenAI
-import os
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from config.settings import QUIZ_DEFAULT_COUNT, QUIZ_MAX_COUNT
+from app.services.document_store import document_store
+from app.services.quiz_bank import QuizParseError, parse_quiz_items, quiz_bank, source_key_for
+from core.fair_scheduler import TenantOverloadedError
+from core.gpt_gateway import chat_completion_async
+from core.prompt_templates import PromptTemplate
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
 
+class QuizRequest(BaseModel):
+    text: Optional[str] = None  # 기존 방식: 추출한 텍스트를 그대로 전송
+    document_id: Optional[str] = None  # /upload-ppt 가 돌려준 문서 ID
+    slide_start: Optional[int] = None  # 슬라이드 범위 (1부터, 양 끝 포함)
+    slide_end: Optional[int] = None
+    count: Optional[int] = None  # 문제 수 (기본 QUIZ_DEFAULT_COUNT)
+
+
+def resolve_quiz_text(request: QuizRequest) -> str:
+    """document_id가 있으면 저장소에서 (슬라이드 범위의) 텍스트를, 없으면 본문 text를 사용"""
+    if request.document_id:
+        document = document_store.get(request.document_id)
+        if document is None:
+            raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다. 자료를 다시 업로드해 주세요.")
+        return document.text(request.slide_start, request.slide_end)
+    return request.text or ""
+
+
+QUIZ_PROMPT = PromptTemplate(
+    "quiz",
+    system="""
+    너는 교육 콘텐츠를 바탕으로 객관식 퀴즈를 생성하는 친절한 AI야.
+    사용자가 제공한 텍스트를 기반으로 요청한 개수만큼 객관식 문제를 만들어줘.
+    각 문제는 다음과 같은 구조로 JSON 배열로 출력해:
+
+    - question: 질문 문자열
+    - options: 보기 4개를 포함한 리스트
+    - answer_index: 정답 보기의 인덱스 (0부터 시작)
+
+    형식은 다음 예시처럼 맞춰줘:
+    [
+      {
+        "question": "질문 내용",
+        "options": ["보기1", "보기2", "보기3", "보기4"],
+        "answer_index": 2
+      },
+      ...
+    ]
+    """,
+    context="""
+    [교육 자료]
+    {text}
+    """,
+    request="""
+    문제 {count}개를 만들어줘.
+    {existing}
+    """,
+)
+
+
+async def generate_quiz_items(text: str, count: int, existing: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """GPT로 count개 생성 후 파싱/검증 (이미 은행에 있는 질문은 피하도록 알려줌)"""
+    existing_note = ""
+    if existing:
+        existing_note = "다음 문제들과 겹치지 않는 새로운 내용으로 만들어줘:\n" + "\n".join(
+            f"- {item['question']}" for item in existing
+        )
+    # 입력 토큰 예산을 넘으면 기존 문제 목록 → 교육 자료 순으로 뒤쪽을 잘라냄
+    messages = QUIZ_PROMPT.render_fitted(
+        {"text": text, "count": count, "existing": existing_note},
+        trim_order=("existing", "text"),
+    )
+    response = await chat_completion_async("quiz", messages=messages)
+    return parse_quiz_items(response.choices[0].message.content)
+
+
 @router.post("/generate-quiz")
-async def generate_gpt(text: str = Body(..., embed=True)):
-    print("요청 들어옴:", text)
-    if not text:
+async def generate_gpt(request: QuizRequest):
+    text = resolve_quiz_text(request)
+    logger.info("퀴즈 생성 요청 들어옴", extra={"text_length": len(text), "document_id": request.document_id})
+    if not text.strip():
         raise HTTPException(status_code=400, detail="prompt가 없습니다.")
+    count = max(1, min(request.count or QUIZ_DEFAULT_COUNT, QUIZ_MAX_COUNT))
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "너는 교육 콘텐츠를 바탕으로 객관식 퀴즈를 생성하는 친절한 AI야. "
-                    "사용자가 제공한 텍스트를 기반으로 총 5개의 객관식 문제를 만들어줘. "
-                    "각 문제는 다음과 같은 구조로 JSON 배열로 출력해:\n\n"
-                    "- question: 질문 문자열\n"
-                    "- options: 보기 4개를 포함한 리스트\n"
-                    "- answer_index: 정답 보기의 인덱스 (0부터 시작)\n\n"
-                    "형식은 다음 예시처럼 맞춰줘:\n"
-                    "[\n"
-                    "  {\n"
-                    "    \"question\": \"질문 내용\",\n"
-                    "    \"options\": [\"보기1\", \"보기2\", \"보기3\", \"보기4\"],\n"
-                    "    \"answer_index\": 2\n"
-                    "  },\n"
-                    "  ... (총 5문제)\n"
-                    "]"
- },
-                {"role": "user", "content": text}
-            ]
-        )
-        return {
-            "prompt": text,
-            "answer": response.choices[0].message.content
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail="GPT 호출 실패: " + str(e))
\ No newline at end of file
+    # 은행에 서로 다른 문제가 충분하면 GPT 없이 출제, 부족하면 모자란 만큼만 생성
+    source_key = source_key_for(request.document_id, request.slide_start, request.slide_end, text)
+    banked = await asyncio.to_thread(quiz_bank.items, source_key)
+    generated = 0
+    if len(banked) < count:
+        try:
+            new_items = await generate_quiz_items(text, count - len(banked), banked)
+        except TenantOverloadedError:
+            raise  # 429로 응답 (main.py 예외 처리기)
+        except QuizParseError as e:
+            logger.warning("⚠️ 퀴즈 응답 파싱 실패: %s", e)
+            if not banked:
+                raise HTTPException(status_code=502, detail="GPT 응답을 퀴즈로 해석하지 못했습니다: " + str(e))
+            new_items = []
+        except Exception as e:
+            if not banked:
+                raise HTTPException(status_code=500, detail="GPT 호출 실패: " + str(e))
+            logger.warning("⚠️ 퀴즈 추가 생성 실패, 은행 문제만 출제: %s", e)
+            new_items = []
+        added, _ = await asyncio.to_thread(quiz_bank.add, source_key, new_items)
+        generated = len(added)
+
+    quiz = await asyncio.to_thread(quiz_bank.draw, source_key, count)
+    logger.info("📝 퀴즈 %s문제 출제 (새로 생성 %s개)", len(quiz), generated)
+
+    result = {
+        "quiz": quiz,
+        "answer": json.dumps(quiz, ensure_ascii=False),  # 기존 클라이언트 호환 (JSON 문자열)
+        "generated": generated,  # 이번 요청에서 새로 생성해 은행에 추가한 문제 수
+        "bank_size": len(banked) + generated,
+    }
+    if request.document_id:
+        result["document_id"] = request.document_id  # 문서 텍스트는 다시 돌려보내지 않음
+    else:
+        result["prompt"] = text
+    return result
@@ -1,17 +1,23 @@
+import asyncio
+
 from fastapi import APIRouter, UploadFile, File
-from app.services.ppt_parser import extract_text_from_pptx
-import os
+from app.services.document_store import document_store
 
 router = APIRouter()
-UPLOAD_DIR = "input"
-os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
 @router.post("/upload-ppt")
-async def upload_ppt(file: UploadFile = File(...)):
-    file_path = os.path.join(UPLOAD_DIR, file.filename)
-    with open(file_path, "wb") as f:
-        f.write(await file.read())
-
-    extracted_text = extract_text_from_pptx(file_path)
-    return {"filename": file.filename, "text": extracted_text}
\ No newline at end of file
+async def upload_ppt(file: UploadFile = File(...), include_text: bool = False):
+    # 내용 해시로 저장 → 같은 덱은 다시 파싱하지 않고, 퀴즈 생성은 document_id로 요청
+    # (기존처럼 추출 텍스트가 필요하면 ?include_text=true)
+    data = await file.read()
+    document, created = await asyncio.to_thread(document_store.put, data, file.filename or "")
+    response = {
+        "document_id": document.document_id,
+        "filename": document.filename,
+        "slide_count": len(document.slides),
+        "duplicate": not created,
+    }
+    if include_text:
+        response["text"] = document.text()
+    return response
@@ -0,0 +1,101 @@
+# app/services/document_store.py
+# 업로드한 교육 자료 저장소
+# - 문서 ID = 파일 내용의 sha256 → 같은 덱을 다시 올리면 파싱 없이 기존 문서 반환
+# - 슬라이드별 텍스트를 {DOCUMENT_STORE_DIR}/{문서 ID}.json 으로 저장 (워커 프로세스끼리 공유)
+# - 최근 문서는 메모리에도 보관해 퀴즈 생성 때 파일을 다시 읽지 않음
+
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Tuple
+
+from config.settings import DOCUMENT_CACHE_SIZE, DOCUMENT_STORE_DIR
+from app.services.ppt_parser import extract_slides_from_pptx
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+_DOCUMENT_ID = re.compile(r"^[0-9a-f]{64}$")
+
+
+class StoredDocument(NamedTuple):
+    document_id: str
+    filename: str
+    slides: List[str]
+    created_at: float
+
+    def text(self, slide_start: Optional[int] = None, slide_end: Optional[int] = None) -> str:
+        """슬라이드 범위(1부터, 양 끝 포함)의 텍스트, 범위를 생략하면 전체"""
+        start = max(1, slide_start or 1)
+        end = min(len(self.slides), slide_end or len(self.slides))
+        return "".join(self.slides[start - 1:end])
+
+
+class DocumentStore:
+    def __init__(self, root: str = DOCUMENT_STORE_DIR, cache_size: int = DOCUMENT_CACHE_SIZE):
+        self.root = root
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, StoredDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, document_id: str) -> str:
+        return os.path.join(self.root, f"{document_id}.json")
+
+    def _remember(self, document: StoredDocument):
+        with self._lock:
+            self._cache[document.document_id] = document
+            self._cache.move_to_end(document.document_id)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get(self, document_id: str) -> Optional[StoredDocument]:
+        if not _DOCUMENT_ID.match(document_id or ""):
+            return None
+        with self._lock:
+            document = self._cache.get(document_id)
+            if document is not None:
+                self._cache.move_to_end(document_id)
+                return document
+        try:
+            with open(self._path(document_id), encoding="utf-8") as f:
+                raw = json.load(f)
+        except FileNotFoundError:
+            return None
+        document = StoredDocument(document_id, raw.get("filename", ""), raw["slides"], raw.get("created_at", 0.0))
+        self._remember(document)
+        return document
+
+    def put(self, data: bytes, filename: str = "") -> Tuple[StoredDocument, bool]:
+        """(문서, 새로 저장했는지) 반환, 이미 있는 내용이면 파싱하지 않음"""
+        document_id = hashlib.sha256(data).hexdigest()
+        existing = self.get(document_id)
+        if existing is not None:
+            logger.info("📄 이미 저장된 문서 재사용: %s", document_id[:12])
+            return existing, False
+
+        slides = extract_slides_from_pptx(io.BytesIO(data))
+        document = StoredDocument(document_id, os.path.basename(filename or ""), slides, time.time())
+
+        # 임시 파일에 쓴 뒤 이름만 바꿔서, 다른 워커가 반쯤 쓴 파일을 읽지 않도록
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(document._asdict(), f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(document_id))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._remember(document)
+        logger.info("📄 문서 저장: %s (슬라이드 %s장)", document_id[:12], len(slides))
+        return document, True
+
+
+document_store = DocumentStore()
@@ -1,10 +1,18 @@
+from typing import BinaryIO, List, Union
+
 from pptx import Presentation
 
-def extract_text_from_pptx(file_path: str) -> str:
+def extract_slides_from_pptx(file_path: Union[str, BinaryIO]) -> List[str]:
+    """슬라이드별 텍스트 목록 (슬라이드 범위를 지정해 퀴즈를 만들 때 사용)"""
     prs = Presentation(file_path)
-    text =""
+    slides = []
     for slide in prs.slides:
+        text = ""
         for shape in slide.shapes:
-            if hasattr(shape,"text"):
-                text +=shape.text + "\n"
-    return text
\ No newline at end of file
+            if hasattr(shape, "text"):
+                text += shape.text + "\n"
+        slides.append(text)
+    return slides
+
+def extract_text_from_pptx(file_path: Union[str, BinaryIO]) -> str:
+    return "".join(extract_slides_from_pptx(file_path))
@@ -0,0 +1,177 @@
+# app/services/quiz_bank.py
+# 퀴즈 문제 은행
+# - GPT가 만든 퀴즈 문자열을 파싱/검증 (question, 보기 4개, answer_index 0~3)
+# - 자료(문서 + 슬라이드 범위, 또는 본문 텍스트 해시)별로 문제를 {QUIZ_BANK_DIR}/{키 해시}.json 에 누적
+# - MinHash(정규화한 한국어 문장의 글자 3-gram)로 거의 같은 문제는 저장하지 않음
+# - 저장(읽기 → 중복 제거 → 쓰기)은 자료별 파일 잠금(flock)으로 보호 (serve.py의 워커 프로세스끼리도 겹치지 않도록)
+# - 은행에 서로 다른 문제가 충분하면 GPT 없이 바로 출제, 부족하면 모자란 만큼만 생성
+
+import fcntl
+import hashlib
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import unicodedata
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from config.settings import QUIZ_BANK_DIR, QUIZ_DUPLICATE_THRESHOLD, QUIZ_MINHASH_PERMUTATIONS
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+_PRIME = (1 << 61) - 1
+_rng = random.Random(20240611)  # 프로세스/재시작과 무관하게 같은 해시 함수를 쓰도록 고정 시드
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(QUIZ_MINHASH_PERMUTATIONS)]
+_JSON_ARRAY = re.compile(r"\[.*\]", re.DOTALL)
+
+
+class QuizParseError(ValueError):
+    """GPT 응답에서 유효한 문제를 하나도 찾지 못함"""
+
+
+# ---------- 파싱 / 검증 ----------
+def _validate_item(item: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(item, dict):
+        return None
+    question = str(item.get("question") or "").strip()
+    options = item.get("options")
+    answer_index = item.get("answer_index")
+    if not question or not isinstance(options, list) or len(options) != 4:
+        return None
+    options = [str(option).strip() for option in options]
+    if not all(options) or len(set(options)) != 4:
+        return None
+    if isinstance(answer_index, str) and answer_index.strip().isdigit():
+        answer_index = int(answer_index)
+    if not isinstance(answer_index, int) or isinstance(answer_index, bool) or not 0 <= answer_index <= 3:
+        return None
+    return {"question": question, "options": options, "answer_index": answer_index}
+
+
+def parse_quiz_items(text: str) -> List[Dict[str, Any]]:
+    """```json 코드 블록이나 앞뒤 설명이 붙어 있어도 JSON 배열만 찾아 유효한 문제만 반환"""
+    match = _JSON_ARRAY.search(text or "")
+    if not match:
+        raise QuizParseError("응답에서 JSON 배열을 찾지 못했습니다.")
+    try:
+        raw_items = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        raise QuizParseError(f"JSON 파싱 실패: {e}") from e
+    items = [item for item in (_validate_item(raw) for raw in raw_items) if item]
+    if not items:
+        raise QuizParseError("형식에 맞는 문제가 없습니다.")
+    if len(items) < len(raw_items):
+        logger.warning("⚠️ 형식이 맞지 않는 퀴즈 문제 %s개 제외", len(raw_items) - len(items))
+    return items
+
+
+# ---------- MinHash ----------
+def normalize_text(text: str) -> str:
+    """NFKC 정규화 + 소문자 + 공백/문장부호 제거 (한글/영문/숫자만 남김)"""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(ch for ch in text if ch.isalnum())
+
+
+def minhash_signature(text: str, ngram: int = 3) -> List[int]:
+    normalized = normalize_text(text)
+    shingles = {normalized[i:i + ngram] for i in range(max(1, len(normalized) - ngram + 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def signature_similarity(a: Sequence[int], b: Sequence[int]) -> float:
+    """두 시그니처의 추정 자카드 유사도"""
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def _item_text(item: Dict[str, Any]) -> str:
+    # 질문과 정답 보기를 함께 비교 (같은 질문이라도 묻는 답이 다르면 다른 문제로 취급)
+    return f"{item['question']} {item['options'][item['answer_index']]}"
+
+
+# ---------- 은행 ----------
+class QuizBank:
+    def __init__(self, root: str = QUIZ_BANK_DIR, threshold: float = QUIZ_DUPLICATE_THRESHOLD):
+        self.root = root
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, source_key: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(source_key.encode("utf-8")).hexdigest() + ".json")
+
+    @contextmanager
+    def _locked(self, source_key: str) -> Iterator[None]:
+        """자료별 잠금: 같은 프로세스의 스레드끼리(threading.Lock), 다른 워커 프로세스끼리(flock)"""
+        with self._lock, open(self._path(source_key) + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load(self, source_key: str) -> List[Dict[str, Any]]:
+        try:
+            with open(self._path(source_key), encoding="utf-8") as f:
+                return json.load(f)["items"]
+        except FileNotFoundError:
+            return []
+
+    def _save(self, source_key: str, items: List[Dict[str, Any]]):
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"source": source_key, "items": items}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(source_key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def items(self, source_key: str) -> List[Dict[str, Any]]:
+        """저장된 문제 (시그니처 제외)"""
+        return [_public(item) for item in self._load(source_key)]
+
+    def add(self, source_key: str, new_items: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """기존 문제/서로 간에 거의 같은 문제를 뺀 나머지를 저장, (추가된 문제, 중복으로 버린 수) 반환"""
+        with self._locked(source_key):
+            stored = self._load(source_key)  # 잠근 뒤에 다시 읽어 다른 워커가 방금 저장한 문제까지 포함
+            added = []
+            duplicates = 0
+            for item in new_items:
+                signature = minhash_signature(_item_text(item))
+                if any(signature_similarity(signature, other["minhash"]) >= self.threshold for other in stored):
+                    duplicates += 1
+                    continue
+                stored.append({**item, "minhash": signature})
+                added.append(item)
+            if added:
+                self._save(source_key, stored)
+        if duplicates:
+            logger.info("🔁 거의 같은 퀴즈 문제 %s개 제외", duplicates)
+        return added, duplicates
+
+    def draw(self, source_key: str, count: int) -> List[Dict[str, Any]]:
+        """은행에서 count개를 무작위로 뽑음 (부족하면 있는 만큼)"""
+        items = self.items(source_key)
+        return random.sample(items, min(count, len(items)))
+
+
+def _public(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in item.items() if key != "minhash"}
+
+
+def source_key_for(document_id: Optional[str], slide_start: Optional[int], slide_end: Optional[int], text: str) -> str:
+    """문제를 모을 자료 단위: 문서 + 슬라이드 범위, 문서 없이 텍스트만 오면 텍스트 해시"""
+    if document_id:
+        if slide_start or slide_end:
+            return f"{document_id}#{slide_start or 1}-{slide_end or 'end'}"
+        return document_id
+    return "text:" + hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+quiz_bank = QuizBank()
@@ -0,0 +1,127 @@
+# benchmarks/fixtures.py
+# 벤치마크용 합성 입력 생성 (외부 파일 없이 로컬에서 재현 가능하도록 고정 시드 사용)
+# - 얼굴 모양이 천천히 움직이는 토킹헤드 풍 영상 (mp4 / webm, 해상도/길이 가변)
+# - 사인파 톤 또는 음성과 비슷한 포먼트/음절 리듬을 가진 오디오
+# - 10~300장짜리 PPT 덱
+
+import os
+import subprocess
+import wave
+
+import cv2
+import numpy as np
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), ".fixtures")
+SAMPLE_RATE = 16000
+SEED = 20240601
+
+
+def _fixture_path(name: str) -> str:
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    return os.path.join(FIXTURE_DIR, name)
+
+
+def synth_audio(seconds: float, kind: str = "speech") -> np.ndarray:
+    """16kHz mono float32 오디오 생성 (kind: tone / speech)"""
+    rng = np.random.default_rng(SEED)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    if kind == "tone":
+        return (0.3 * np.sin(2 * np.pi * 440 * t)).astype(np.float32)
+
+    # 음성 흉내: 기본 주파수가 흔들리는 성대음 + 포먼트 3개, 4Hz 음절 리듬으로 진폭 변조
+    f0 = 140 + 25 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    voice = sum(np.sin(k * phase) / k for k in range(1, 12))
+    formants = sum(np.sin(2 * np.pi * f * t) * a for f, a in ((700, 0.5), (1200, 0.3), (2600, 0.15)))
+    syllables = np.clip(np.sin(2 * np.pi * 4 * t + rng.uniform(0, np.pi)), 0, None) ** 2
+    pauses = (np.sin(2 * np.pi * 0.25 * t) > -0.6).astype(np.float32)  # 문장 사이 쉼
+    signal = (0.6 * voice + 0.4 * voice * formants) * syllables * pauses
+    signal += 0.005 * rng.standard_normal(len(t))
+    return (0.25 * signal / (np.abs(signal).max() + 1e-9)).astype(np.float32)
+
+
+def write_wav(path: str, audio: np.ndarray):
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def _draw_face(frame: np.ndarray, t: float):
+    """밝은 배경 위에 좌우/상하로 천천히 움직이는 얼굴 (눈 2개, 입)"""
+    h, w = frame.shape[:2]
+    cx = int(w / 2 + w * 0.06 * np.sin(2 * np.pi * 0.2 * t))
+    cy = int(h / 2 + h * 0.03 * np.sin(2 * np.pi * 0.13 * t))
+    fw, fh = int(w * 0.16), int(h * 0.3)
+    cv2.ellipse(frame, (cx, cy), (fw, fh), 0, 0, 360, (150, 180, 220), -1)
+    eye_dy, eye_dx = int(fh * 0.25), int(fw * 0.4)
+    eye_r = max(3, fw // 7)
+    for sx in (-1, 1):
+        cv2.circle(frame, (cx + sx * eye_dx, cy - eye_dy), eye_r, (255, 255, 255), -1)
+        cv2.circle(frame, (cx + sx * eye_dx, cy - eye_dy), eye_r // 2, (30, 30, 30), -1)
+    mouth_open = int(fh * 0.08 * (1 + np.sin(2 * np.pi * 4 * t)))
+    cv2.ellipse(frame, (cx, cy + int(fh * 0.45)), (fw // 3, max(2, mouth_open)), 0, 0, 360, (60, 40, 120), -1)
+
+
+def make_video(seconds: int, width: int, height: int, container: str = "mp4", fps: int = 30) -> str:
+    """합성 영상 파일 경로 반환 (이미 만들어져 있으면 재사용)"""
+    name = f"talk_{seconds}s_{width}x{height}_{fps}fps.{container}"
+    path = _fixture_path(name)
+    if os.path.exists(path):
+        return path
+
+    silent_path = _fixture_path(f"_silent_{name}.avi")
+    wav_path = _fixture_path(f"_audio_{seconds}s.wav")
+
+    writer = cv2.VideoWriter(silent_path, cv2.VideoWriter_fourcc(*"MJPG"), fps, (width, height))
+    background = np.full((height, width, 3), 235, dtype=np.uint8)
+    for i in range(seconds * fps):
+        frame = background.copy()
+        _draw_face(frame, i / fps)
+        writer.write(frame)
+    writer.release()
+
+    write_wav(wav_path, synth_audio(seconds))
+
+    codecs = (
+        ["-c:v", "libvpx-vp9", "-b:v", "1M", "-c:a", "libopus"] if container == "webm"
+        else ["-c:v", "libx264", "-pix_fmt", "yuv420p", "-c:a", "aac"]
+    )
+    subprocess.run(
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", silent_path, "-i", wav_path, *codecs, "-shortest", path],
+        check=True,
+    )
+    os.remove(silent_path)
+    os.remove(wav_path)
+    return path
+
+
+def make_deck(slides: int) -> str:
+    """슬라이드마다 제목 + 본문 3~6줄짜리 PPT 파일 경로 반환"""
+    from pptx import Presentation
+    from pptx.util import Inches
+
+    path = _fixture_path(f"deck_{slides}.pptx")
+    if os.path.exists(path):
+        return path
+
+    rng = np.random.default_rng(SEED)
+    words = ["고객", "응대", "음료", "주문", "매장", "청결", "레시피", "안전", "서비스", "교육", "매뉴얼", "위생"]
+    prs = Presentation()
+    layout = prs.slide_layouts[1]
+    for i in range(slides):
+        slide = prs.slides.add_slide(layout)
+        slide.shapes.title.text = f"{i + 1}. {rng.choice(words)} {rng.choice(words)} 절차"
+        body = slide.placeholders[1].text_frame
+        for line_no in range(int(rng.integers(3, 7))):
+            sentence = " ".join(rng.choice(words, size=int(rng.integers(6, 14))))
+            if line_no == 0:
+                body.text = sentence
+            else:
+                body.add_paragraph().text = sentence
+        note = slide.shapes.add_textbox(Inches(1), Inches(6.5), Inches(8), Inches(0.5))
+        note.text_frame.text = f"참고: 슬라이드 {i + 1}"
+    prs.save(path)
+    return path
@@ -0,0 +1,61 @@
+# benchmarks/import_time.py
+# `import main` 소요 시간을 새 프로세스에서 측정하고 예산(IMPORT_TIME_BUDGET_SECONDS)을 넘으면 실패
+#
+#   python -m benchmarks.import_time             # 5회 측정 중앙값
+#   python -m benchmarks.import_time --top 15    # 누적 import 시간이 큰 모듈 15개 출력
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from config.settings import IMPORT_TIME_BUDGET_SECONDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_once() -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import main"], cwd=ROOT, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def top_imports(limit: int) -> list:
+    """python -X importtime 출력에서 누적 시간이 큰 모듈 목록 [(초, 모듈)]"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us) / 1e6, name.rstrip()))
+    return sorted(rows, reverse=True)[:limit]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="import main 시간 예산 확인")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=IMPORT_TIME_BUDGET_SECONDS)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    timings = [measure_once() for _ in range(args.runs)]
+    median = statistics.median(timings)
+
+    print(f"import main: 중앙값 {median:.2f}s (최소 {min(timings):.2f}s, 예산 {args.budget:.2f}s)")
+    for seconds, name in top_imports(args.top):
+        print(f"  {seconds:>7.3f}s  {name}")
+
+    if median > args.budget:
+        print(f"❌ import 시간 예산 초과: {median:.2f}s > {args.budget:.2f}s")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+# benchmarks/run.py
+# 평가 파이프라인 단계별 벤치마크
+#
+#   python -m benchmarks.run                  # 전체 매트릭스 실행 후 baseline.json과 비교
+#   python -m benchmarks.run --quick          # 짧은 영상/작은 덱만
+#   python -m benchmarks.run --write-baseline   # 처음 실행: baseline.json이 없으면 이번 결과로 만들고, 있으면 비교
+#   python -m benchmarks.run --update-baseline  # 기준값 갱신 (기존 값을 이번 결과로 덮어씀)
+#   python -m benchmarks.run --no-compare       # 기준값 없이 측정만
+#
+# baseline.json 값은 측정한 장비에 따라 다르므로, 회귀 검사를 돌릴 벤치마크 장비에서
+# --write-baseline으로 처음 만든 뒤 커밋하고 이후에는 같은 장비에서 비교한다.
+#
+# 각 단계의 중앙값 시간, 처리량, 최대 RSS 증가량을 출력하고
+# 기준값보다 --tolerance 이상 느려진 단계가 있으면 종료 코드 1로 실패한다.
+# 기준값 파일이 없거나, 실행한 단계 중 기준값이 있는 것이 하나도 없으면 종료 코드 2
+# (비교 없이 통과하면 회귀 검사가 항상 성공하므로)
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import psutil
+
+from benchmarks.fixtures import make_deck, make_video
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+VIDEO_CASES = [
+    # (초, 가로, 세로, 컨테이너)
+    (5, 640, 360, "mp4"),
+    (15, 640, 360, "mp4"),
+    (15, 1280, 720, "mp4"),
+    (15, 640, 360, "webm"),
+    (45, 1280, 720, "mp4"),
+]
+QUICK_VIDEO_CASES = [(5, 640, 360, "mp4"), (5, 640, 360, "webm")]
+DECK_CASES = [10, 50, 150, 300]
+QUICK_DECK_CASES = [10, 50]
+
+
+class PeakRss:
+    """블록 실행 중 RSS 최대값을 10ms 간격으로 관측"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.process = psutil.Process()
+        self.peak_delta = 0
+
+    def __enter__(self):
+        self._start = self.process.memory_info().rss
+        self._peak = self._start
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self._peak = max(self._peak, self.process.memory_info().rss)
+            self._stop.wait(self.interval)
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self._peak = max(self._peak, self.process.memory_info().rss)
+        self.peak_delta = self._peak - self._start
+
+
+def measure(fn, repeats: int, setup=None) -> dict:
+    """fn을 repeats번 실행해 중앙값/최소 시간, 최대 RSS 증가량(MB) 반환"""
+    timings = []
+    peak = 0
+    for _ in range(repeats):
+        arg = setup() if setup else None
+        with PeakRss() as rss:
+            started = time.perf_counter()
+            fn(arg) if setup else fn()
+            timings.append(time.perf_counter() - started)
+        peak = max(peak, rss.peak_delta)
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "peak_rss_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def _as_mp4_temp(src: str) -> str:
+    """analyze_video_all과 같은 조건: 업로드 컨테이너와 무관하게 .mp4 임시 파일"""
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    shutil.copyfile(src, path)
+    return path
+
+
+def bench_video(cases, repeats: int) -> dict:
+    from core.model_registry import load_models
+    from domains.evaluation import service
+
+    load_models(["stt", "cascades"])  # 모델 로드 시간이 첫 측정에 섞이지 않도록
+
+    results = {}
+    for seconds, width, height, container in cases:
+        src = make_video(seconds, width, height, container)
+        case = f"{seconds}s_{width}x{height}_{container}"
+        frames = seconds * 30
+
+        def fixup(path):
+            out = service.fix_video_metadata(path)
+            for p in (path, out):
+                if os.path.exists(p):
+                    os.remove(p)
+
+        def transcribe(path):
+            service.transcribe_audio_from_video(path)
+            os.remove(path)
+
+        def pose(path):
+            service.analyze_pose_only(path)
+            os.remove(path)
+
+        with open(src, "rb") as f:
+            binary = f.read()
+
+        stages = {
+            "fix_video_metadata": measure(fixup, repeats, setup=lambda: _as_mp4_temp(src)),
+            "transcribe_audio_from_video": measure(transcribe, repeats, setup=lambda: _as_mp4_temp(src)),
+            "analyze_pose_only": measure(pose, repeats, setup=lambda: _as_mp4_temp(src)),
+            "analyze_video_all": measure(lambda: service.analyze_video_all(binary), repeats),
+        }
+        for stage, result in stages.items():
+            result["throughput"] = f"{seconds / result['median_s']:.2f} 영상초/s"
+            if stage == "analyze_pose_only":
+                result["throughput"] += f", {frames / result['median_s']:.1f} fps"
+            results[f"{stage}[{case}]"] = result
+    return results
+
+
+def bench_decks(cases, repeats: int) -> dict:
+    from app.services.ppt_parser import extract_text_from_pptx
+
+    results = {}
+    for slides in cases:
+        path = make_deck(slides)
+        result = measure(lambda: extract_text_from_pptx(path), repeats)
+        result["throughput"] = f"{slides / result['median_s']:.1f} 슬라이드/s"
+        results[f"extract_text_from_pptx[{slides}_slides]"] = result
+    return results
+
+
+def bench_prompts(repeats: int) -> dict:
+    from domains.simulation.router import (
+        EducationalAnalysisRequest,
+        build_scenarios_info_from_request,
+        generate_educational_analysis_prompt,
+        generate_hints_only_prompt,
+    )
+
+    scenarios = [
+        {"scenarioId": 100 + i, "scenarioContent": f"상황 {i}: 고객이 음료 주문을 변경하려고 함", "scenarioTag": "고객클레임,주문관리"}
+        for i in range(20)
+    ]
+    request = EducationalAnalysisRequest(
+        userid="bench", companyid=1, userorder=[144, 132, 162, 154, 112],
+        reason="매장 운영에 영향이 큰 순서대로 처리했습니다." * 5,
+        responseTexts={str(i): "고객님 불편을 드려 죄송합니다. 바로 확인해 드리겠습니다." for i in [144, 132, 162, 154, 112]},
+        hints={}, orderSelectionTime=40, reasonWritingTime=80, totalTimeSpent=300,
+    )
+    recommendation = {"recommendedOrder": [1, 4, 2, 5, 3], "priorityCriteria": "기준", "detailedReasoning": "이유"}
+    loops = 200
+
+    def run(fn):
+        def _loop():
+            for _ in range(loops):
+                fn()
+        result = measure(_loop, repeats)
+        result["throughput"] = f"{loops / result['median_s']:.0f} 프롬프트/s"
+        return result
+
+    return {
+        "generate_hints_only_prompt[20_scenarios]": run(lambda: generate_hints_only_prompt(scenarios)),
+        "build_scenarios_info_from_request[5]": run(lambda: build_scenarios_info_from_request(request)),
+        "generate_educational_analysis_prompt[5]": run(
+            lambda: generate_educational_analysis_prompt(request, recommendation, [])
+        ),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> tuple:
+    """기준값 대비 tolerance 이상 느려진 항목 목록, 기준값이 없는 항목 목록"""
+    regressions = []
+    missing = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base:
+            missing.append(key)
+            continue
+        ratio = result["median_s"] / base["median_s"]
+        if ratio > 1 + tolerance:
+            regressions.append((key, base["median_s"], result["median_s"], ratio))
+    return regressions, missing
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="평가 파이프라인 벤치마크")
+    parser.add_argument("--quick", action="store_true", help="짧은 영상/작은 덱만 실행")
+    parser.add_argument("--only", choices=["video", "deck", "prompt"], action="append", help="특정 그룹만 실행")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="허용 성능 저하 비율 (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--write-baseline", action="store_true", help="기준값 파일이 없을 때만 이번 결과로 생성")
+    parser.add_argument("--no-compare", action="store_true", help="기준값과 비교하지 않고 측정 결과만 출력")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args(argv)
+
+    groups = args.only or ["video", "deck", "prompt"]
+    results = {}
+    if "video" in groups:
+        results.update(bench_video(QUICK_VIDEO_CASES if args.quick else VIDEO_CASES, args.repeats))
+    if "deck" in groups:
+        results.update(bench_decks(QUICK_DECK_CASES if args.quick else DECK_CASES, args.repeats))
+    if "prompt" in groups:
+        results.update(bench_prompts(args.repeats))
+
+    print(f"{'단계':<60} {'중앙값(s)':>10} {'최대RSS(MB)':>12}  처리량")
+    for key, result in results.items():
+        print(f"{key:<60} {result['median_s']:>10.4f} {result['peak_rss_mb']:>12.1f}  {result['throughput']}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.write_baseline and not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"기준값 생성 (첫 실행): {args.baseline} — 다음 실행부터 이 값과 비교합니다")
+        return 0
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, ensure_ascii=False, indent=2)
+        print(f"기준값 갱신: {args.baseline}")
+        return 0
+
+    if args.no_compare:
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"❌ 기준값 파일이 없습니다: {args.baseline} (처음이면 --write-baseline, 비교 없이 측정만 하려면 --no-compare)")
+        return 2
+
+    with open(args.baseline, encoding="utf-8") as f:
+        regressions, missing = compare(results, json.load(f), args.tolerance)
+    for key in missing:
+        print(f"⚠️ 기준값 없음 (비교 생략): {key}")
+    for key, base, current, ratio in regressions:
+        print(f"❌ 성능 저하: {key} {base:.4f}s → {current:.4f}s (x{ratio:.2f})")
+    if results and len(missing) == len(results):
+        print("❌ 비교할 수 있는 단계가 없습니다 (--update-baseline 으로 기준값 갱신)")
+        return 2
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
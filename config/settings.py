@@ -1 +1,210 @@
-#환경 변수, 공통 설정 파일 저장
\ No newline at end of file
+#환경 변수, 공통 설정 파일 저장
+import json
+import os
+import tempfile
+from dotenv import load_dotenv
+
+load_dotenv()  # .env 파일에서 환경변수 로드
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+# 시나리오 카탈로그 (DB 스냅샷 JSON, 변경 시 자동 재로드)
+SCENARIO_CATALOG_PATH = os.getenv("SCENARIO_CATALOG_PATH", "data/scenarios.json")
+SCENARIO_CATALOG_RELOAD_CHECK_SECONDS = float(os.getenv("SCENARIO_CATALOG_RELOAD_CHECK_SECONDS", "5"))
+
+# 힌트 캐시
+HINT_CACHE_TTL_SECONDS = int(os.getenv("HINT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+HINT_WARMUP_ON_STARTUP = _env_bool("HINT_WARMUP_ON_STARTUP", True)
+HINT_WARMUP_BATCH_SIZE = int(os.getenv("HINT_WARMUP_BATCH_SIZE", "20"))
+
+# OpenAI (OPENAI_BASE_URL을 지정하면 호환 서버로 호출, 예: 부하 테스트용 스텁)
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+
+# 메뉴얼/평가 기준을 제공하는 백엔드 서버
+BACKEND_BASE_URL = os.getenv("BACKEND_BASE_URL", "http://localhost:9000").rstrip("/")
+
+# GPT 모델 티어 (빠른 순서의 역순: 앞쪽이 고품질, 뒤쪽이 저지연)
+GPT_MODEL_TIERS = json.loads(os.getenv("GPT_MODEL_TIERS", json.dumps({
+    "premium": "gpt-4",
+    "standard": "gpt-4o-mini",
+    "fast": "gpt-3.5-turbo",
+})))
+GPT_TIER_ORDER = list(GPT_MODEL_TIERS.keys())
+
+# 호출 지점별 모델 티어
+GPT_ROUTE_TIERS = json.loads(os.getenv("GPT_ROUTE_TIERS", json.dumps({
+    "question_generation": "premium",
+    "feedback": "premium",
+    "educational_analysis": "premium",
+    "hints": "fast",
+    "recommended_order": "fast",
+    "quiz": "fast",
+})))
+GPT_DEFAULT_TIER = os.getenv("GPT_DEFAULT_TIER", "premium")
+
+# 지연 SLO(초): 주 모델의 관측 지연(p90)이 이를 넘으면 더 빠른 티어로 우회
+GPT_LATENCY_SLO_SECONDS = float(os.getenv("GPT_LATENCY_SLO_SECONDS", "20"))
+GPT_ROUTE_LATENCY_SLO = json.loads(os.getenv("GPT_ROUTE_LATENCY_SLO", json.dumps({
+    "hints": 5,
+    "recommended_order": 8,
+    "quiz": 15,
+})))
+GPT_MAX_ERROR_RATE = float(os.getenv("GPT_MAX_ERROR_RATE", "0.3"))
+GPT_STATS_WINDOW = int(os.getenv("GPT_STATS_WINDOW", "50"))
+GPT_STATS_MIN_SAMPLES = int(os.getenv("GPT_STATS_MIN_SAMPLES", "5"))
+GPT_PRIMARY_PROBE_EVERY = int(os.getenv("GPT_PRIMARY_PROBE_EVERY", "10"))  # 우회 중에도 N번에 1번은 주 모델로 보내 회복 여부 확인
+
+# GPT 호출 데드라인(초): 호출 지점별 타임아웃, 초과 시 기본값으로 빠르게 대체
+GPT_TIMEOUT_SECONDS = float(os.getenv("GPT_TIMEOUT_SECONDS", "30"))
+GPT_ROUTE_TIMEOUT_SECONDS = json.loads(os.getenv("GPT_ROUTE_TIMEOUT_SECONDS", json.dumps({
+    "hints": 8,
+    "recommended_order": 10,
+    "educational_analysis": 40,
+    "feedback": 40,
+    "question_generation": 20,
+    "quiz": 30,
+})))
+GPT_MAX_RETRIES = int(os.getenv("GPT_MAX_RETRIES", "0"))
+
+# GPT 호출 지점별 토큰 예산: input을 넘으면 가변 부분을 잘라내고, output은 max_tokens로 강제
+# (premium 티어 gpt-4는 컨텍스트가 8k이므로 input + output이 8192를 넘지 않게)
+GPT_DEFAULT_TOKEN_BUDGET = {"input": 6000, "output": 1000}
+GPT_ROUTE_TOKEN_BUDGETS = json.loads(os.getenv("GPT_ROUTE_TOKEN_BUDGETS", json.dumps({
+    "hints": {"input": 4000, "output": 2000},
+    "recommended_order": {"input": 2000, "output": 600},
+    "educational_analysis": {"input": 4000, "output": 4000},
+    "feedback": {"input": 6000, "output": 800},
+    "question_generation": {"input": 6000, "output": 300},
+    "quiz": {"input": 6000, "output": 1500},
+})))
+
+# GPT 서킷 브레이커: 연속 실패/타임아웃 N회 시 열림, 일정 시간 후 반열림 상태에서 탐색 호출
+GPT_BREAKER_FAILURE_THRESHOLD = int(os.getenv("GPT_BREAKER_FAILURE_THRESHOLD", "5"))
+GPT_BREAKER_RESET_SECONDS = float(os.getenv("GPT_BREAKER_RESET_SECONDS", "30"))
+
+# 영상 분석 작업 풀 (ffmpeg/Whisper/OpenCV 등 CPU 작업을 이벤트 루프 밖에서 실행)
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# 로깅 (큐 기반 비동기 구조화 로그)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # 가득 차면 요청을 막지 않고 버림
+LOG_MAX_FIELD_CHARS = int(os.getenv("LOG_MAX_FIELD_CHARS", "500"))  # 메뉴얼/GPT 응답 등 긴 값 잘라내기
+LOG_SAMPLE_RATES = json.loads(os.getenv("LOG_SAMPLE_RATES", json.dumps({
+    "DEBUG": 0.05,
+    "INFO": 1.0,
+})))  # 레벨별 기록 비율 (없는 레벨은 전부 기록)
+
+# 모델 로딩 (import 시점이 아니라 서버 시작 단계에서 로드)
+STT_MODEL_SIZE = os.getenv("STT_MODEL_SIZE", "base")  # /submit-answer 영상 STT, /submit-audio-answer
+WHISPER_ENGINE_MODEL_SIZE = os.getenv("WHISPER_ENGINE_MODEL_SIZE", "small")  # core/whisper_engine
+PRELOAD_MODELS = [m.strip() for m in os.getenv("PRELOAD_MODELS", "stt,cascades,face_mesh,answer_screen,score").split(",") if m.strip()]
+MODEL_WARMUP_INFERENCE = _env_bool("MODEL_WARMUP_INFERENCE", True)  # 로드 후 더미 추론으로 첫 요청 지연 제거
+IMPORT_TIME_BUDGET_SECONDS = float(os.getenv("IMPORT_TIME_BUDGET_SECONDS", "3"))
+
+# 서버 실행 (serve.py: 부모 프로세스에서 모델 로드 후 워커 fork)
+SERVER_HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "5000"))
+DEV_RELOAD = _env_bool("DEV_RELOAD", True)  # python main.py 개발 실행 시 자동 리로드
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", str(os.cpu_count() or 2)))
+WORKER_MAX_REQUESTS = int(os.getenv("WORKER_MAX_REQUESTS", "1000"))  # 요청 N건 처리 후 워커 재시작 (메모리 증가 억제)
+WORKER_MAX_REQUESTS_JITTER = int(os.getenv("WORKER_MAX_REQUESTS_JITTER", "100"))  # 워커들이 동시에 재시작하지 않도록
+WORKER_MEMORY_REPORT_SECONDS = float(os.getenv("WORKER_MEMORY_REPORT_SECONDS", "60"))
+
+# 시선/고개 분석 엔진 (landmark: mediapipe 얼굴 랜드마크로 실제 yaw/pitch 계산, haar: 기존 Haar Cascade)
+POSE_ENGINE = os.getenv("POSE_ENGINE", "landmark")
+POSE_SAMPLE_FPS = float(os.getenv("POSE_SAMPLE_FPS", "5"))  # 초당 분석 프레임 수 (0이면 전체 프레임)
+POSE_MAX_WIDTH = int(os.getenv("POSE_MAX_WIDTH", "640"))  # 분석 전 축소할 최대 가로 해상도
+POSE_BATCH_SIZE = int(os.getenv("POSE_BATCH_SIZE", "16"))
+POSE_GAZE_YAW_DEG = float(os.getenv("POSE_GAZE_YAW_DEG", "15"))  # |yaw|가 이보다 크면 좌/우 응시로 판정
+POSE_MOTION_STD_DEG = float(os.getenv("POSE_MOTION_STD_DEG", "6"))  # yaw/pitch 표준편차가 이보다 크면 "움직임 있음"
+
+# 감정(표정) 분석 채널 (analyze_video_all에서 pose와 같은 디코딩 결과를 공유)
+EMOTION_CHANNEL_ENABLED = _env_bool("EMOTION_CHANNEL_ENABLED", False)
+EMOTION_SAMPLE_FPS = float(os.getenv("EMOTION_SAMPLE_FPS", "2"))
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "16"))
+
+# 작업용 임시 파일 (업로드 영상, ffmpeg 변환본, 추출한 wav 등)
+# 기본은 tmpfs(/dev/shm)에 두어 디스크 I/O를 피하고, 없으면 시스템 임시 디렉터리 사용
+SCRATCH_DIR = os.getenv("SCRATCH_DIR") or (
+    "/dev/shm/growkit-scratch" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "growkit-scratch")
+)
+SCRATCH_QUOTA_BYTES = int(os.getenv("SCRATCH_QUOTA_BYTES", str(2 * 2**30)))  # 프로세스당 예약 가능한 총 용량
+SCRATCH_MIN_FREE_BYTES = int(os.getenv("SCRATCH_MIN_FREE_BYTES", str(256 * 2**20)))  # 파일시스템에 항상 남겨 둘 여유
+SCRATCH_WAIT_SECONDS = float(os.getenv("SCRATCH_WAIT_SECONDS", "30"))  # 용량이 없을 때 기다리는 최대 시간 (초과 시 503)
+SCRATCH_VIDEO_EXPANSION = float(os.getenv("SCRATCH_VIDEO_EXPANSION", "4"))  # 영상 1개 분석에 필요한 용량 = 업로드 크기 x N (원본+변환본+wav)
+SCRATCH_ORPHAN_SECONDS = float(os.getenv("SCRATCH_ORPHAN_SECONDS", "1800"))  # 이보다 오래된 작업 디렉터리는 누수로 보고 삭제
+SCRATCH_SWEEP_INTERVAL_SECONDS = float(os.getenv("SCRATCH_SWEEP_INTERVAL_SECONDS", "300"))
+
+# 테넌트(회사)별 공정 스케줄링 (GPT 호출 / 영상 분석 풀 앞단, 워커 프로세스마다 적용)
+GPT_MAX_CONCURRENCY = int(os.getenv("GPT_MAX_CONCURRENCY", "8"))  # 동시에 진행하는 GPT 호출 수
+GPT_TENANT_MAX_CONCURRENCY = int(os.getenv("GPT_TENANT_MAX_CONCURRENCY", "4"))
+ANALYSIS_TENANT_MAX_CONCURRENCY = int(os.getenv("ANALYSIS_TENANT_MAX_CONCURRENCY", str(max(1, (ANALYSIS_WORKERS + 1) // 2))))
+TENANT_DEFAULT_WEIGHT = float(os.getenv("TENANT_DEFAULT_WEIGHT", "1"))
+TENANT_RATE_PER_SECOND = float(os.getenv("TENANT_RATE_PER_SECOND", "0"))  # 테넌트별 초당 작업 시작 수 (0 = 제한 없음)
+TENANT_RATE_BURST = float(os.getenv("TENANT_RATE_BURST", "5"))
+TENANT_MAX_QUEUED = int(os.getenv("TENANT_MAX_QUEUED", "200"))  # 테넌트별 대기열 길이 상한 (초과 시 429)
+TENANT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("TENANT_QUEUE_TIMEOUT_SECONDS", "120"))
+# 테넌트별 예외 설정: {"7": {"weight": 2, "max_concurrency": 6, "rate_per_second": 1, "burst": 3}}
+TENANT_OVERRIDES = json.loads(os.getenv("TENANT_OVERRIDES", "{}"))
+# 별도 테넌트로 스케줄링할 회사 ID (쉼표 구분, TENANT_OVERRIDES의 키도 포함)
+# 그 밖의 X-Company-ID / companyid 값은 모두 "default" 테넌트로 묶음 (헤더를 바꿔 가며 상한을 피하거나 지표 라벨을 늘릴 수 없도록)
+TENANT_KNOWN_IDS = {t.strip() for t in os.getenv("TENANT_KNOWN_IDS", "").split(",") if t.strip()} | set(TENANT_OVERRIDES)
+
+# 업로드한 교육 자료(PPT) 저장소: 내용 해시(sha256)를 문서 ID로 사용, 같은 파일은 다시 파싱하지 않음
+DOCUMENT_STORE_DIR = os.getenv("DOCUMENT_STORE_DIR", "data/documents")
+DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "64"))  # 메모리에 유지할 최근 문서 수
+
+# 퀴즈 문제 은행: 자료별로 생성한 문제를 누적해 두고, 충분하면 GPT 없이 출제
+QUIZ_BANK_DIR = os.getenv("QUIZ_BANK_DIR", "data/quiz_bank")
+QUIZ_DEFAULT_COUNT = int(os.getenv("QUIZ_DEFAULT_COUNT", "5"))
+QUIZ_MAX_COUNT = int(os.getenv("QUIZ_MAX_COUNT", "20"))
+QUIZ_DUPLICATE_THRESHOLD = float(os.getenv("QUIZ_DUPLICATE_THRESHOLD", "0.8"))  # MinHash 유사도가 이 이상이면 같은 문제로 봄
+QUIZ_MINHASH_PERMUTATIONS = int(os.getenv("QUIZ_MINHASH_PERMUTATIONS", "64"))
+
+# 답변 사전 선별 (규칙 + 글자 n-gram 분류기): 확실히 채점 불가한 답변은 GPT로 보내지 않음
+ANSWER_SCREEN_MODEL_PATH = os.getenv("ANSWER_SCREEN_MODEL_PATH", "models/answer_screen.joblib")
+ANSWER_SCREEN_INVALID_THRESHOLD = float(os.getenv("ANSWER_SCREEN_INVALID_THRESHOLD", "0.9"))  # 이상이면 채점 불가
+ANSWER_SCREEN_BORDERLINE_THRESHOLD = float(os.getenv("ANSWER_SCREEN_BORDERLINE_THRESHOLD", "0.5"))  # 이상이면 애매 (GPT로 보냄)
+
+# 잠정 점수 모델 (CPU 회귀): GPT 피드백이 오기 전에 항목별 점수를 먼저 보여줌, GPT 채점 결과로 재학습
+SCORE_MODEL_PATH = os.getenv("SCORE_MODEL_PATH", "models/score_model.joblib")
+SCORE_LOG_PATH = os.getenv("SCORE_LOG_PATH", "data/score_log.jsonl")  # GPT 채점 결과 누적 (재학습용)
+SCORE_MODEL_MIN_SAMPLES = int(os.getenv("SCORE_MODEL_MIN_SAMPLES", "50"))
+
+# 요청 단위 샘플링 프로파일러 (X-Profile: 1 헤더 또는 샘플링 비율로 선택), 결과는 /admin/profiles 에서 다운로드
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # 0~1, 헤더 없이도 프로파일링할 요청 비율
+PROFILE_HEADER_ENABLED = _env_bool("PROFILE_HEADER_ENABLED", True)
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.005"))
+PROFILE_MAX_CONCURRENT = int(os.getenv("PROFILE_MAX_CONCURRENT", "4"))  # 동시에 프로파일링할 최대 요청 수 (오버헤드 상한)
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_ADMIN_TOKEN = os.getenv("PROFILE_ADMIN_TOKEN", "")  # 관리자 엔드포인트(프로파일 다운로드, 힌트 워밍업) 토큰, 비어 있으면 비활성
+
+# 요청별 자원 상한 (0이면 제한 없음): 넘으면 분석을 중단하고 413
+REQUEST_MAX_VIDEO_SECONDS = float(os.getenv("REQUEST_MAX_VIDEO_SECONDS", "600"))
+REQUEST_MAX_FRAMES = int(os.getenv("REQUEST_MAX_FRAMES", "36000"))  # 디코딩 프레임 수 (30fps 기준 20분)
+REQUEST_MAX_AUDIO_SECONDS = float(os.getenv("REQUEST_MAX_AUDIO_SECONDS", "600"))
+
+# 요청 간 STT 배칭: 동시에 들어온 오디오를 잠깐 모아 Whisper 배치 추론 (STT_BATCH_MAX_SIZE는 VAD 발화 구간 수)
+STT_BATCHING_ENABLED = _env_bool("STT_BATCHING_ENABLED", True)
+STT_BATCH_MAX_SIZE = int(os.getenv("STT_BATCH_MAX_SIZE", "8"))
+STT_BATCH_MAX_WAIT_SECONDS = float(os.getenv("STT_BATCH_MAX_WAIT_SECONDS", "0.05"))  # 첫 요청 이후 더 모으는 최대 시간
+
+# 분석 작업 브로커: local(API 프로세스에서 실행) / inprocess(프로세스 내 큐, 테스트용) / sqlite(analysis_worker.py가 가져감)
+ANALYSIS_BROKER = os.getenv("ANALYSIS_BROKER", "local")
+ANALYSIS_BROKER_SQLITE_PATH = os.getenv("ANALYSIS_BROKER_SQLITE_PATH", "data/analysis_jobs.sqlite3")
+ANALYSIS_BROKER_POLL_SECONDS = float(os.getenv("ANALYSIS_BROKER_POLL_SECONDS", "0.1"))
+ANALYSIS_JOB_TIMEOUT_SECONDS = float(os.getenv("ANALYSIS_JOB_TIMEOUT_SECONDS", "600"))
+ANALYSIS_JOB_LEASE_SECONDS = float(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "60"))  # 분석 노드의 임대 연장이 이 시간 동안 없으면 다시 대기열로
+ANALYSIS_NODE_THREADS = int(os.getenv("ANALYSIS_NODE_THREADS", str(ANALYSIS_WORKERS)))
+# sqlite 브로커에 남은 작업 보존 시간: API 노드가 죽어 아무도 가져가지 않은 결과/대기 작업을 지움 (ANALYSIS_JOB_TIMEOUT_SECONDS보다 길어야 함)
+ANALYSIS_JOB_RETENTION_SECONDS = float(os.getenv("ANALYSIS_JOB_RETENTION_SECONDS", str(ANALYSIS_JOB_TIMEOUT_SECONDS * 2)))
+# STT 배치 결과를 기다리는 최대 시간 (배치 스레드가 멈춰도 분석 스레드가 무한정 묶이지 않도록, 기본은 분석 작업 제한 시간)
+STT_BATCH_TIMEOUT_SECONDS = float(os.getenv("STT_BATCH_TIMEOUT_SECONDS", str(ANALYSIS_JOB_TIMEOUT_SECONDS)))
@@ -0,0 +1,17 @@
+# core/admin_auth.py
+# 관리자 전용 엔드포인트 인증 (X-Admin-Token 헤더, 프로파일 다운로드 / 힌트 캐시 워밍업 등)
+
+import hmac
+
+from fastapi import HTTPException, Request
+
+from config.settings import PROFILE_ADMIN_TOKEN
+
+
+def require_admin(request: Request):
+    # 토큰이 설정되지 않았으면 엔드포인트가 없는 것처럼 404
+    token = request.headers.get("X-Admin-Token", "")
+    if not PROFILE_ADMIN_TOKEN:
+        raise HTTPException(status_code=404)
+    if not hmac.compare_digest(token, PROFILE_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="관리자 토큰이 올바르지 않습니다.")
@@ -0,0 +1,94 @@
+# core/analysis_pool.py
+# CPU 작업(영상 분석 등)을 이벤트 루프 밖 스레드 풀에서 실행
+# 풀에 넣기 전에 테넌트별 공정 스케줄러에서 차례를 기다린다.
+# 대기/실행 중 작업 수를 지표로 노출한다.
+# ANALYSIS_BROKER가 local이 아니면 @analysis_task로 등록된 함수는 브로커를 거쳐 분석 노드에서 실행한다
+# (이때 ANALYSIS_WORKERS는 API 프로세스 하나가 동시에 맡겨 둘 수 있는 작업 수).
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from config.settings import (
+    ANALYSIS_BROKER_POLL_SECONDS,
+    ANALYSIS_JOB_TIMEOUT_SECONDS,
+    ANALYSIS_TENANT_MAX_CONCURRENCY,
+    ANALYSIS_WORKERS,
+)
+from core.fair_scheduler import FairScheduler, current_tenant
+from core import profiler, request_usage
+from core.metrics import QUEUE_DEPTH, TASKS_IN_FLIGHT, current_route
+from core.structured_logging import request_id
+from core.work_broker import AnalysisTimeoutError, decode, encode, get_broker
+
+_executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+analysis_scheduler = FairScheduler("analysis", ANALYSIS_WORKERS, ANALYSIS_TENANT_MAX_CONCURRENCY)
+
+
+def _measured(queue: str, fn, args):
+    # 요청 컨텍스트 안에서 실행: CPU/RSS를 요청 사용량에 더하고, 프로파일링 중이면 이 스레드도 포함
+    with request_usage.measure():
+        return profiler.call(queue, fn, *args)
+
+
+async def _run_remote(broker, task: str, args):
+    """브로커에 작업을 넣고 결과가 나올 때까지 (루프를 막지 않고) 폴링"""
+    context = {"request_id": request_id.get(), "route": current_route.get(), "tenant": current_tenant.get()}
+    job_id = await asyncio.to_thread(broker.submit, task, encode({"args": args, "context": context}))
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + ANALYSIS_JOB_TIMEOUT_SECONDS
+    try:
+        while True:
+            outcome = await asyncio.to_thread(broker.result, job_id)
+            if outcome is not None:
+                break
+            if loop.time() >= deadline:
+                raise AnalysisTimeoutError(f"{task} 작업이 {ANALYSIS_JOB_TIMEOUT_SECONDS:.0f}초 안에 끝나지 않음")
+            await asyncio.sleep(ANALYSIS_BROKER_POLL_SECONDS)
+    except BaseException:
+        # 시간 초과/클라이언트 취소 시 대기 중인 작업은 실행하지 않음 (sqlite 쓰기라 스레드에서)
+        await asyncio.shield(asyncio.to_thread(broker.cancel, job_id))
+        raise
+
+    data = decode(outcome)
+    usage = request_usage.current_usage.get()
+    if usage is not None:
+        usage.merge(data["usage"])
+    if "error" in data:
+        raise data["error"]
+    return data["result"]
+
+
+async def run_analysis(fn, *args, queue: str = "analysis"):
+    """fn(*args)를 분석 풀(또는 브로커 설정 시 분석 노드)에서 실행하고 결과 반환 (요청 컨텍스트 유지)"""
+    broker = get_broker() if getattr(fn, "task_name", None) else None
+    if broker is not None:
+        async with analysis_scheduler.slot():
+            return await _run_remote(broker, fn.task_name, args)
+
+    ctx = contextvars.copy_context()
+    waiting = QUEUE_DEPTH.labels(queue)
+    running = TASKS_IN_FLIGHT.labels(queue)
+
+    started = False
+
+    def _task():
+        nonlocal started
+        started = True
+        waiting.dec()
+        running.inc()
+        try:
+            return ctx.run(_measured, queue, fn, args)
+        finally:
+            running.dec()
+
+    waiting.inc()
+    loop = asyncio.get_running_loop()
+    try:
+        # 스케줄러 자리 수 = 풀 스레드 수이므로 풀 내부 대기열에는 작업이 쌓이지 않음
+        async with analysis_scheduler.slot():
+            return await loop.run_in_executor(_executor, _task)
+    finally:
+        # 시작 전에 취소된 작업은 대기 수에서 제외
+        if not started:
+            waiting.dec()
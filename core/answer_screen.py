@@ -0,0 +1,147 @@
+# core/answer_screen.py
+# 답변 사전 선별: GPT로 보내기 전에 CPU에서 채점 불가능한 답변을 걸러냄
+# 1) 규칙: 너무 짧음, 자음/모음만, 반복 문자, 숫자/특수문자만, Whisper 환각 문구, 같은 구절 반복(STT 루프)
+# 2) 분류기: 글자 n-gram TF-IDF + 로지스틱 회귀 (scikit-learn, 파일이 없으면 규칙만 사용)
+#
+# 판정: invalid(확실히 채점 불가 → 템플릿 피드백) / borderline(애매 → GPT) / valid(→ GPT)
+#
+# 학습: python -m core.answer_screen train samples.jsonl   ({"text": "...", "label": 1(채점 불가) 또는 0})
+
+import json
+import re
+import sys
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from config.settings import (
+    ANSWER_SCREEN_BORDERLINE_THRESHOLD,
+    ANSWER_SCREEN_INVALID_THRESHOLD,
+    ANSWER_SCREEN_MODEL_PATH,
+)
+from core.metrics import SCREEN_DECISIONS
+from core.model_registry import get_answer_screen_model
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+INVALID = "invalid"
+BORDERLINE = "borderline"
+VALID = "valid"
+
+# Whisper가 무음/잡음 구간에서 자주 만들어내는 문구
+_STT_HALLUCINATIONS = (
+    "시청해주셔서 감사합니다", "시청해 주셔서 감사합니다", "구독과 좋아요", "mbc 뉴스", "다음 영상에서 만나요",
+)
+_JAMO_ONLY = re.compile(r"^[ㄱ-ㅎㅏ-ㅣ\s]+$")
+_REPEATED_CHAR = re.compile(r"^(.)\1{2,}$")
+_SYMBOLS_ONLY = re.compile(r"^[^a-zA-Z0-9가-힣]+$")
+
+FEEDBACK_TEMPLATES = {
+    "too_short": "⚠️ 답변이 너무 짧아 평가가 불가능합니다. 상황에 맞는 응대 내용을 충분히 말씀해 주세요.",
+    "jamo_only": "⚠️ 답변이 정상적으로 인식되지 않아 평가가 불가능합니다. 문의 후 재평가 요청을 진행해 주세요.",
+    "repeated": "⚠️ 같은 말이 반복되어 인식되어 평가가 불가능합니다. 조용한 환경에서 다시 녹화해 주세요.",
+    "no_words": "⚠️ 답변에서 의미 있는 단어를 찾지 못해 평가가 불가능합니다. 다시 녹화해 주세요.",
+    "stt_noise": "⚠️ 음성이 제대로 녹음되지 않은 것 같습니다. 마이크 상태를 확인한 뒤 다시 녹화해 주세요.",
+    "classifier": "⚠️ 답변이 질문과 관련된 응대로 인식되지 않아 평가가 불가능합니다. 문의 후 재평가 요청을 진행해 주세요.",
+}
+
+
+class ScreenResult(NamedTuple):
+    verdict: str  # invalid / borderline / valid
+    reason: Optional[str]  # invalid일 때 FEEDBACK_TEMPLATES 키
+    p_invalid: Optional[float]  # 분류기 확률 (모델이 없거나 규칙으로 판정하면 None)
+
+    @property
+    def scorable(self) -> bool:
+        return self.verdict != INVALID
+
+    @property
+    def feedback(self) -> str:
+        return FEEDBACK_TEMPLATES.get(self.reason or "", FEEDBACK_TEMPLATES["classifier"])
+
+
+def rule_reason(text: str, min_chars: int = 5) -> Optional[str]:
+    """규칙으로 확실히 채점 불가인 경우 이유 키, 아니면 None"""
+    stripped = (text or "").strip()
+    if len(stripped) < min_chars:
+        return "too_short"
+    if _JAMO_ONLY.match(stripped):
+        return "jamo_only"
+    if _REPEATED_CHAR.match(stripped):
+        return "repeated"
+    if stripped.replace(" ", "").isdigit() or _SYMBOLS_ONLY.match(stripped):
+        return "no_words"
+    lowered = stripped.lower()
+    if any(phrase in lowered for phrase in _STT_HALLUCINATIONS) and len(stripped) < 40:
+        return "stt_noise"
+    if len(stripped) <= 10:
+        # 같은 문자가 절반 이상 (ㄱㄱㄱ, 안안안, 네네네 등)
+        if max(stripped.count(ch) for ch in set(stripped)) / len(stripped) > 0.5:
+            return "repeated"
+    words = stripped.split()
+    if len(words) >= 6 and len(set(words)) / len(words) < 0.3:
+        return "repeated"  # STT 반복 루프 ("감사합니다 감사합니다 감사합니다 ...")
+    return None
+
+
+def screen_answers(texts: List[str], min_chars: int = 5) -> List[ScreenResult]:
+    """여러 답변을 한 번에 선별 (분류기는 규칙을 통과한 답변만 한 번의 배치로 추론)"""
+    results: List[Optional[ScreenResult]] = [None] * len(texts)
+    pending: List[Tuple[int, str]] = []
+    for i, text in enumerate(texts):
+        reason = rule_reason(text, min_chars)
+        if reason:
+            results[i] = ScreenResult(INVALID, reason, None)
+        else:
+            pending.append((i, text.strip()))
+
+    model = get_answer_screen_model() if pending else None
+    if model is not None:
+        probabilities = model.predict_proba([text for _, text in pending])[:, 1]
+        for (i, _), p in zip(pending, probabilities):
+            p = float(p)
+            if p >= ANSWER_SCREEN_INVALID_THRESHOLD:
+                results[i] = ScreenResult(INVALID, "classifier", p)
+            elif p >= ANSWER_SCREEN_BORDERLINE_THRESHOLD:
+                results[i] = ScreenResult(BORDERLINE, None, p)
+            else:
+                results[i] = ScreenResult(VALID, None, p)
+    else:
+        for i, _ in pending:
+            results[i] = ScreenResult(VALID, None, None)
+
+    for result in results:
+        SCREEN_DECISIONS.labels(result.verdict, result.reason or "").inc()
+    return results
+
+
+def screen_answer(text: str, min_chars: int = 5) -> ScreenResult:
+    return screen_answers([text], min_chars)[0]
+
+
+def train_screen_model(samples: Iterable[Tuple[str, int]], path: str = ANSWER_SCREEN_MODEL_PATH):
+    """(텍스트, 라벨 1=채점 불가/0=정상) 목록으로 분류기를 학습해 저장"""
+    import os
+
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+
+    texts, labels = zip(*samples)
+    model = make_pipeline(
+        TfidfVectorizer(analyzer="char_wb", ngram_range=(1, 3), min_df=2, sublinear_tf=True),
+        LogisticRegression(max_iter=1000, class_weight="balanced"),
+    )
+    model.fit(list(texts), list(labels))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(model, path)
+    logger.info("✅ 답변 선별 모델 저장: %s (샘플 %s개, 채점 불가 %s개)", path, len(texts), sum(labels))
+    return model
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] != "train":
+        sys.exit("사용법: python -m core.answer_screen train samples.jsonl")
+    with open(sys.argv[2], encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    train_screen_model((row["text"], int(row["label"])) for row in rows)
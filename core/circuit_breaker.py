@@ -0,0 +1,77 @@
+# core/circuit_breaker.py
+# 외부 호출(GPT 등)용 서킷 브레이커
+# closed: 정상 / open: 즉시 실패 처리 / half_open: 탐색 호출 1건만 허용
+
+import threading
+import time
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """브레이커가 열려 있어 호출을 보내지 않음"""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_seconds:
+                return self.HALF_OPEN
+            return self._state
+
+    def is_open(self) -> bool:
+        """호출을 보내도 소용없는 상태인지 (탐색 호출 차례면 False)"""
+        state = self.state
+        return state == self.OPEN or (state == self.HALF_OPEN and self._probe_in_flight)
+
+    def before_call(self):
+        """호출 직전 확인: 열려 있으면 CircuitOpenError"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN and time.monotonic() - self._opened_at < self.reset_seconds:
+                raise CircuitOpenError(f"{self.name} 서킷 브레이커 열림")
+            # 반열림: 탐색 호출은 한 번에 하나만
+            if self._probe_in_flight:
+                raise CircuitOpenError(f"{self.name} 서킷 브레이커 탐색 중")
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("✅ %s 서킷 브레이커 닫힘 (정상 복구)", self.name)
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.error("❌ %s 서킷 브레이커 열림 (연속 실패 %s회)", self.name, self._failures)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """실패로 치지 않는 오류(잘못된 요청 등)로 끝난 탐색 호출 정리"""
+        with self._lock:
+            self._probe_in_flight = False
@@ -1,22 +1,75 @@
-from fer import FER
-import cv2
+# core/emotion_engine.py
+# 표정(감정) 분석: 공용 디코더에서 샘플링한 프레임을 배치로 받아
+# MTCNN으로 얼굴을 한 번에 검출하고 FER로 분류한 뒤, 고정 크기 NumPy 누적기에 평균을 쌓는다.
+
+from typing import Dict, List
+
 import numpy as np
 
-def analyze_emotion(video_file):
-    detector = FER(mtcnn=True)
-    cap = cv2.VideoCapture(video_file)
-    emotions = []
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        result = detector.detect_emotions(frame)
-        if result:
-            emotions.append(result[0]['emotions'])
-    cap.release()
-
-    if emotions:
-        avg = {k: sum(d[k] for d in emotions)/len(emotions) for k in emotions[0]}
-        return avg
-    return {}
+from core.model_registry import get_emotion_detector
+
+EMOTION_LABELS = ("angry", "disgust", "fear", "happy", "sad", "surprise", "neutral")
+EMOTION_LABELS_KO = {
+    "angry": "화남", "disgust": "혐오", "fear": "두려움", "happy": "기쁨",
+    "sad": "슬픔", "surprise": "놀람", "neutral": "중립",
+}
+
+
+class EmotionAnalyzer:
+    """add_batch()로 프레임을 넣고 summarize()로 평균 감정 점수를 받음 (영상 1개당 1개)"""
+
+    def __init__(self):
+        self._mtcnn, self._fer = get_emotion_detector()
+        self._sum = np.zeros(len(EMOTION_LABELS), dtype=np.float64)  # 감정별 점수 합
+        self._dominant = np.zeros(len(EMOTION_LABELS), dtype=np.int64)  # 프레임별 최고 감정 횟수
+        self.faces = 0
+        self.frames_seen = 0
+
+    def add_batch(self, frames: List[np.ndarray]):
+        if not frames:
+            return
+        self.frames_seen += len(frames)
+
+        # MTCNN 배치 검출은 같은 크기 프레임만 가능 (공용 디코더가 같은 크기로 축소해서 넘겨줌)
+        rgb = [np.ascontiguousarray(frame[:, :, ::-1]) for frame in frames]
+        boxes, probs = self._mtcnn.detect(rgb)
+
+        for frame, frame_boxes in zip(frames, boxes):
+            if frame_boxes is None or len(frame_boxes) == 0:
+                continue
+            x1, y1, x2, y2 = (int(v) for v in frame_boxes[0])  # keep_all=False → 가장 확실한 얼굴 1개
+            result = self._fer.detect_emotions(frame, face_rectangles=[(x1, y1, x2 - x1, y2 - y1)])
+            if not result:
+                continue
+            scores = np.fromiter((result[0]["emotions"][k] for k in EMOTION_LABELS), dtype=np.float64, count=len(EMOTION_LABELS))
+            self._sum += scores
+            self._dominant[int(scores.argmax())] += 1
+            self.faces += 1
+
+    def summarize(self) -> Dict:
+        if not self.faces:
+            return {}
+        averages = self._sum / self.faces
+        return {
+            "emotions": {label: round(float(v), 3) for label, v in zip(EMOTION_LABELS, averages)},
+            "dominant_emotion": EMOTION_LABELS[int(self._dominant.argmax())],
+            "emotion_frames": self.faces,
+        }
+
+
+def describe_emotions(emotions: Dict[str, float], top: int = 3) -> str:
+    """프롬프트용 요약: '중립 0.62, 기쁨 0.21, 놀람 0.08'"""
+    ranked = sorted(emotions.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return ", ".join(f"{EMOTION_LABELS_KO.get(k, k)} {v:.2f}" for k, v in ranked)
+
+
+def analyze_emotion(video_file, sample_fps: float = None):
+    """영상 파일 하나의 평균 감정 점수 (기존 호환용, 단독 디코딩)"""
+    from config.settings import EMOTION_SAMPLE_FPS, EMOTION_BATCH_SIZE, POSE_MAX_WIDTH
+    from core.video_frames import batched, iter_sampled_frames
+
+    analyzer = EmotionAnalyzer()
+    frames = iter_sampled_frames(video_file, sample_fps or EMOTION_SAMPLE_FPS, POSE_MAX_WIDTH)
+    for batch in batched(frames, EMOTION_BATCH_SIZE):
+        analyzer.add_batch([frame.image for frame in batch])
+    return analyzer.summarize().get("emotions", {})
@@ -0,0 +1,202 @@
+# core/fair_scheduler.py
+# 테넌트(회사)별 가중 공정 큐잉 스케줄러
+# 한 회사가 교육일에 제출을 몰아서 보내도 다른 회사 요청이 굶지 않도록,
+# 공유 자원(GPT 호출, 영상 분석 풀) 앞에서 실행 순서를 정한다.
+#
+# - 가중 공정 큐잉: 테넌트마다 가상 종료 시각(finish tag)을 두고 가장 작은 테넌트부터 실행
+#   (weight가 2인 테넌트는 경쟁 상황에서 1인 테넌트보다 2배 자주 차례가 옴)
+# - 테넌트별 동시 실행 상한(max_concurrency), 초당 시작 횟수 제한(토큰 버킷)
+# - 테넌트별 대기열 길이/대기 시간 상한을 넘으면 TenantOverloadedError (라우터에서 429)
+# - 테넌트 키는 resolve_tenant로 정규화 (TENANT_KNOWN_IDS 밖의 값은 "default"), 쉬고 있는 테넌트 상태는 지움
+#
+#   async with gpt_scheduler.slot():
+#       ...
+
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from config.settings import (
+    TENANT_DEFAULT_WEIGHT,
+    TENANT_KNOWN_IDS,
+    TENANT_MAX_QUEUED,
+    TENANT_OVERRIDES,
+    TENANT_QUEUE_TIMEOUT_SECONDS,
+    TENANT_RATE_BURST,
+    TENANT_RATE_PER_SECOND,
+)
+from core.metrics import TENANT_QUEUE_DEPTH, TENANT_QUEUE_WAIT, TENANT_REJECTED
+
+# 현재 요청의 테넌트 (미들웨어에서 X-Company-ID 헤더로 설정, 본문에 companyid가 있는 엔드포인트는 직접 설정)
+current_tenant: ContextVar[str] = ContextVar("current_tenant", default="default")
+
+
+def resolve_tenant(raw) -> str:
+    """클라이언트가 보낸 회사 ID → 테넌트 키 (등록되지 않은 값은 "default")"""
+    tenant = str(raw).strip() if raw is not None else ""
+    return tenant if tenant in TENANT_KNOWN_IDS else "default"
+
+
+class TenantOverloadedError(RuntimeError):
+    """테넌트 대기열이 가득 찼거나 대기 시간이 너무 길어 요청을 받을 수 없음"""
+
+
+class _TenantState:
+    def __init__(self, weight: float, max_concurrency: int, rate_per_second: float, burst: float):
+        self.weight = max(weight, 1e-6)
+        self.max_concurrency = max_concurrency
+        self.rate_per_second = rate_per_second
+        self.burst = max(burst, 1.0)
+        self.tokens = self.burst
+        self.refilled_at = time.monotonic()
+        self.waiters = deque()  # asyncio.Future (먼저 온 순서)
+        self.running = 0
+        self.finish_tag = 0.0
+
+    def token_wait(self, now: float) -> float:
+        """지금 시작할 수 있으면 0, 아니면 토큰이 생길 때까지 남은 초"""
+        if self.rate_per_second <= 0:
+            return 0.0
+        self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate_per_second)
+        self.refilled_at = now
+        if self.tokens >= 1.0:
+            return 0.0
+        return (1.0 - self.tokens) / self.rate_per_second
+
+    def is_idle(self, now: float) -> bool:
+        """대기/실행 중인 요청이 없고 토큰이 가득 참 (지웠다가 다시 만들어도 속도 제한이 풀리지 않음)
+        지워진 테넌트는 현재 가상 시각부터 다시 시작 (마지막 차례의 finish tag만큼, 한 차례 이내 차이)"""
+        if self.waiters or self.running:
+            return False
+        return self.rate_per_second <= 0 or self.tokens + (now - self.refilled_at) * self.rate_per_second >= self.burst
+
+    def take_token(self):
+        if self.rate_per_second > 0:
+            self.tokens -= 1.0
+
+
+class FairScheduler:
+    """이벤트 루프 안에서만 사용 (스레드에서 호출하지 않음)"""
+
+    def __init__(self, name: str, capacity: int, tenant_max_concurrency: int,
+                 rate_per_second: float = TENANT_RATE_PER_SECOND, burst: float = TENANT_RATE_BURST,
+                 max_queued: int = TENANT_MAX_QUEUED, queue_timeout: float = TENANT_QUEUE_TIMEOUT_SECONDS):
+        self.name = name
+        self.capacity = capacity
+        self.tenant_max_concurrency = tenant_max_concurrency
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._tenants: Dict[str, _TenantState] = {}
+        self._running = 0
+        self._virtual_time = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _tenant(self, tenant: str) -> _TenantState:
+        state = self._tenants.get(tenant)
+        if state is None:
+            self._evict_idle()
+            override = TENANT_OVERRIDES.get(tenant, {})
+            state = _TenantState(
+                weight=float(override.get("weight", TENANT_DEFAULT_WEIGHT)),
+                max_concurrency=int(override.get("max_concurrency", self.tenant_max_concurrency)),
+                rate_per_second=float(override.get("rate_per_second", self.rate_per_second)),
+                burst=float(override.get("burst", self.burst)),
+            )
+            self._tenants[tenant] = state
+        return state
+
+    def _evict_idle(self):
+        """새 테넌트 상태를 만들 때 쉬고 있는 테넌트 상태를 정리 (테넌트 수만큼 계속 늘어나지 않도록)"""
+        now = time.monotonic()
+        for tenant in [t for t, state in self._tenants.items() if state.is_idle(now)]:
+            del self._tenants[tenant]
+
+    def _dispatch(self):
+        """빈 자리가 있는 동안, 실행 가능한 테넌트 중 finish tag가 가장 작은 테넌트의 첫 요청을 깨움"""
+        self._timer = None
+        now = time.monotonic()
+        retry_in = None
+        while self._running < self.capacity:
+            best = best_start = best_finish = None
+            for state in self._tenants.values():
+                while state.waiters and state.waiters[0].done():
+                    state.waiters.popleft()  # 대기 중 취소된 요청
+                if not state.waiters or state.running >= state.max_concurrency:
+                    continue
+                wait = state.token_wait(now)
+                if wait > 0:
+                    retry_in = wait if retry_in is None else min(retry_in, wait)
+                    continue
+                start = state.finish_tag
+                finish = start + 1.0 / state.weight
+                if best is None or finish < best_finish:
+                    best, best_start, best_finish = state, start, finish
+            if best is None:
+                break
+
+            best.take_token()
+            best.finish_tag = best_finish
+            self._virtual_time = best_start
+            best.running += 1
+            self._running += 1
+            best.waiters.popleft().set_result(None)
+
+        # 토큰 부족으로 보류된 테넌트는 토큰이 생기는 시점에 다시 시도
+        if retry_in is not None and self._running < self.capacity:
+            self._timer = asyncio.get_running_loop().call_later(retry_in, self._dispatch)
+
+    def _release(self, state: _TenantState):
+        state.running -= 1
+        self._running -= 1
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, tenant: Optional[str] = None):
+        """차례가 올 때까지 기다렸다가 블록을 실행 (블록이 끝나면 자리 반환)"""
+        tenant = tenant or current_tenant.get()
+        state = self._tenant(tenant)
+        if len(state.waiters) >= self.max_queued:
+            TENANT_REJECTED.labels(self.name, tenant, "queue_full").inc()
+            raise TenantOverloadedError(f"{tenant} 대기 요청이 너무 많습니다 ({len(state.waiters)}건)")
+
+        if not state.waiters:
+            # 쉬다가 돌아온 테넌트는 현재 가상 시각부터 시작 (쉬는 동안 몫을 적립하지 않음)
+            state.finish_tag = max(state.finish_tag, self._virtual_time)
+        future = asyncio.get_running_loop().create_future()
+        state.waiters.append(future)
+        depth = TENANT_QUEUE_DEPTH.labels(self.name, tenant)
+        depth.inc()
+        started = time.perf_counter()
+        if self._timer is not None:
+            self._timer.cancel()
+        self._dispatch()
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as e:
+            if future.done() and not future.cancelled():
+                self._release(state)  # 자리를 받은 직후 취소됨
+            else:
+                future.cancel()
+                try:
+                    state.waiters.remove(future)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                TENANT_REJECTED.labels(self.name, tenant, "timeout").inc()
+                raise TenantOverloadedError(f"{tenant} 대기 시간 초과 ({self.queue_timeout:.0f}초)") from e
+            raise
+        finally:
+            depth.dec()
+            TENANT_QUEUE_WAIT.labels(self.name, tenant).observe(time.perf_counter() - started)
+
+        try:
+            yield
+        finally:
+            self._release(state)
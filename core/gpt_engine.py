@@ -1,21 +1,115 @@
-import os
-from openai import OpenAI
-from dotenv import load_dotenv
 import requests
 from fastapi import HTTPException
 import httpx
 import re
+from config.settings import BACKEND_BASE_URL
+from core.answer_screen import rule_reason
+from core.emotion_engine import describe_emotions
+from core.gpt_gateway import chat_completion_async
+from core.prompt_templates import PromptTemplate
+from core.score_model import SCORE_CRITERIA
+from core.metrics import stage_timer
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# 프롬프트 템플릿 (고정 지시문 → 매뉴얼/평가 기준 → 요청별 내용, prefix 캐시 적중용)
+QUESTION_PROMPT = PromptTemplate(
+    "question_generation",
+    system="""
+    너는 지금 서비스직 평가를 위한 시뮬레이션 문제를 하나 생성하는 역할이야.
+    스타벅스 매장에서 실제 발생할 수 있는 단 하나의 상황을 설정해 줘.
+
+    [조건]
+    - 함께 주어지는 교육 매뉴얼을 참고하여, 서비스직원이 실제 겪을 수 있는 상황 한 가지를 작성해.
+    - 너무 매뉴얼에 갇히지 말고 창의성을 발휘해서 너가 생각하는 카페에서 일어날 수 있는 다양한 상황 중에 하나를 골라서 제시해. (예시: 진상 손님, 나이가 많은 노인, 메뉴 추천 요청하는 손님, 무리한 요청을 하는 손님 등)
+    - 절대 예시, 번호, 유형 등을 넣지 마.
+    - 무조건 하나의 상황만 작성해.
+    - 출력은 단 한 문장만. 다른 말, 설명, 앞말 없이 바로 "상황 설명 : ..." 형식으로만 출력.
+    - 혹시나 대화 응답을 해야하는 상황이라면 상황 설명 이후 대화를 추가로 출력해줘. 대화 상황이 아니라면 상황 설명만 출력해.
+
+    [출력 예시]
+    상황 설명 : 한 고객이 주문한 음료를 받고 나서, 맛이 다르다며 불만을 제기하고 있습니다.
+    대화 : "아니 제가 분명 바닐라 라떼를 시켰는데, 그냥 카페라떼가 나온거 아니에요?"
+
+    or
+
+    상황 설명 : 현재 예상하지 못한 지진이 발생하여 매장 내부가 패닉에 빠졌습니다. 이 상황을 대처하기 위한 행동을 말하세요.
+
+    ※ 절대 여러 상황을 나열하지 말 것.
+    ※ 절대 문제 번호, 예시, 유형 등의 문구를 포함하지 말 것.
+    ※ 반드시 아래 형식처럼 시작할 것: 상황 설명 :
+    """,
+    context="""
+    [교육 매뉴얼]
+    {manual}
+    """,
+)
+
+FEEDBACK_PROMPT = PromptTemplate(
+    "feedback",
+    system="""
+    너는 지금 스타벅스 직원의 모의 시뮬레이션 평가를 담당하고 있어.
+
+    [요청 사항]
+    - 메뉴얼을 참고해서 응시자의 답변을 채점 해주세요.
+    - 점수 채점을 진행할 때 평가 기준을 참고 해주세요.
+    - 각 항목을 5점 만점으로 채점하고, 아래 형식으로 마지막에는 총평을 출력해 주세요.
+    - 총평에는 평과 결과와 피드백으로 구성해 주세요.
+    - 점수가 낮은 항목(3.5 이하)은 반드시 개선 방향도 함께 제시할 것.
+
+    다음 6가지 항목에 대해 각각 5점 만점 기준으로 채점해주세요.
+
+    1. 친절도
+    2. 문제해결능력
+    3. 소통능력
+    4. 전문성
+    5. 감정조절
+    6. 태도
+
+    ※ 각 항목별 점수 옆에 첨언하지 않는다.
+
+    [예시 출력 형식]
+    - 친절도: 4.5
+    - 문제해결능력: 4.0
+    ...
+    - 총평: 전반적으로 침착했으나, 소통의 명확성이 조금 더 필요합니다.
+
+    [주의 사항]
+    - 정면을 잘 응시했다면 '소통능력'과 '태도' 항목의 점수를 높게 주세요.
+    - 고개 움직임이 안정적이라면 '감정조절'과 '전문성' 점수도 높게 평가해 주세요.
+    - 반대로 시선을 회피하거나, 고개를 자주 움직이면 해당 항목 점수를 낮춰 주세요.
+    """,
+    context="""
+    [메뉴얼]
+    {manual}
+
+    [평가 기준]
+    {criteria}
+    """,
+    request="""
+    [문제]
+    {question}
+
+    [답변]
+    {answer}
 
-## 최신버전은 이 방법을 사용해야 한다 ##
-load_dotenv()  # .env 파일에서 환경변수 로드
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))  # 명시적으로 전달
+    [시선/고개 움직임 분석 결과]
+    - 시선 방향: {gaze}
+    - 고개 움직임: {head}{angle_line}{emotion_line}
+
+    {additional_notes}
+    """,
+)
 
 
 # 메뉴얼 받아오기 함수
 async def fetch_manual(manual_id: int) -> str:
-    url = f"http://localhost:9000/api/manuals/{manual_id}"
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url)
+    url = f"{BACKEND_BASE_URL}/api/manuals/{manual_id}"
+    with stage_timer("backend_manual"):
+        async with httpx.AsyncClient() as client:
+            res = await client.get(url)
 
     if res.status_code != 200:
         raise ValueError(f"메뉴얼 ID {manual_id}에 해당하는 데이터를 찾을 수 없습니다.")
@@ -36,53 +130,24 @@ async def generate_question_with_manual(manual_id: int):
     try:
         manual = await fetch_manual(manual_id)
     except ValueError as e:
-        print("❌ 메뉴얼 없음 예외 발생:", e)
+        logger.warning("❌ 메뉴얼 없음 예외 발생: %s", e)
         raise HTTPException(status_code=404, detail=str(e))
 
     # 메뉴얼 내용이 비어있을 경우 예외 처리
     if not manual.strip():
-        print("⚠️ 메뉴얼 내용이 공백이거나 없음")
+        logger.warning("⚠️ 메뉴얼 내용이 공백이거나 없음")
         raise HTTPException(status_code=400, detail="매뉴얼 내용이 비어 있어 문항을 생성할 수 없습니다.")
 
-    print("메뉴얼 내용:", manual)
-
-    prompt = f"""
-    너는 지금 서비스직 평가를 위한 시뮬레이션 문제를 하나 생성하는 역할이야.
-    스타벅스 매장에서 실제 발생할 수 있는 단 하나의 상황을 설정해 줘.
-
-    [교육 매뉴얼]
-    {manual}
-
-    [조건]
-    - 메뉴얼을 참고하여, 서비스직원이 실제 겪을 수 있는 상황 한 가지를 작성해. 
-    - 너무 매뉴얼에 갇히지 말고 창의성을 발휘해서 너가 생각하는 카페에서 일어날 수 있는 다양한 상황 중에 하나를 골라서 제시해. (예시: 진상 손님, 나이가 많은 노인, 메뉴 추천 요청하는 손님, 무리한 요청을 하는 손님 등)
-    - 절대 예시, 번호, 유형 등을 넣지 마.
-    - 무조건 하나의 상황만 작성해.
-    - 출력은 단 한 문장만. 다른 말, 설명, 앞말 없이 바로 "상황 설명 : ..." 형식으로만 출력.
-    - 혹시나 대화 응답을 해야하는 상황이라면 상황 설명 이후 대화를 추가로 출력해줘. 대화 상황이 아니라면 상황 설명만 출력해.
-
-    [출력 예시]
-    상황 설명 : 한 고객이 주문한 음료를 받고 나서, 맛이 다르다며 불만을 제기하고 있습니다.
-    대화 : "아니 제가 분명 바닐라 라떼를 시켰는데, 그냥 카페라떼가 나온거 아니에요?"
-    
-    or
-    
-    상황 설명 : 현재 예상하지 못한 지진이 발생하여 매장 내부가 패닉에 빠졌습니다. 이 상황을 대처하기 위한 행동을 말하세요.
+    logger.debug("메뉴얼 내용: %s", manual)
 
-    ※ 절대 여러 상황을 나열하지 말 것.
-    ※ 절대 문제 번호, 예시, 유형 등의 문구를 포함하지 말 것.
-    ※ 반드시 아래 형식처럼 시작할 것: 상황 설명 :
-    """
+    # 매뉴얼이 길면 입력 토큰 예산에 맞춰 뒤쪽을 잘라냄 (지시문은 그대로 유지)
+    messages = QUESTION_PROMPT.render_fitted({"manual": manual}, trim_order=("manual",))
 
-    print("GPT 요청 프롬프트:", prompt)
+    logger.debug("GPT 요청 메시지: %s", messages)
 
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[
-            # {"role": "system",
-            #  "content": "절대 과거 대화, 형식, 문장을 기억하지 마. 지금 이 요청만 완전히 처음 보는 것처럼 처리해. 이전 대화와 관련된 추론은 금지야. 이건 완전히 새로운 대화야."},
-            {"role": "user", "content": prompt}
-        ],
+    response = await chat_completion_async(
+        "question_generation",
+        messages=messages,
         temperature=0.7
     )
     return response.choices[0].message.content
@@ -113,9 +178,8 @@ async def generate_question_with_manual(manual_id: int):
 
 def extract_scores_from_text(feedback_text: str) -> dict:
     """GPT 출력에서 항목별 점수를 파싱"""
-    criteria = ["친절도", "문제해결능력", "소통능력", "전문성", "감정조절", "태도"]
     scores = {}
-    for criterion in criteria:
+    for criterion in SCORE_CRITERIA:
         match = re.search(rf"{criterion}\s*[:：]\s*(\d+(\.\d+)?)", feedback_text)
         if match:
             scores[criterion] = round(float(match.group(1)))
@@ -126,27 +190,25 @@ def extract_scores_from_text(feedback_text: str) -> dict:
 # end def
 
 def is_meaningless(text: str) -> bool:
-    stripped = text.strip()
-    if len(stripped) < 5:
-        return True
-    if re.fullmatch(r"[ㄱ-ㅎㅏ-ㅣ]+", stripped):
-        return True
-    if stripped in {"ㄷㄷㄷ", "ㅋㅋㅋ", "ㅎㅎㅎ", "ㅁㅁㅁ", "ㅠㅠㅠ", "...", "....."}:
-        return True
-    return False
+    """규칙으로 확실히 채점 불가인지 (분류기까지 쓰려면 core.answer_screen.screen_answer)
+    core.answer_screen.rule_reason과 같은 규칙: 예전 규칙(5자 미만, 자음/모음만, ㅋㅋㅋ 등) 외에
+    반복 문자, 숫자/특수문자만, Whisper 환각 문구(40자 미만), 같은 단어 반복(STT 루프)도 채점 불가로 봄"""
+    return rule_reason(text) is not None
 # end def
 
 # 평가 기준 받아오기 함수
 async def fetch_criteria(criteria_id: int) -> str:
-    url = f"http://localhost:9000/api/criteria/{criteria_id}"
-    async with httpx.AsyncClient() as client:
-        res = await client.get(url)
+    url = f"{BACKEND_BASE_URL}/api/criteria/{criteria_id}"
+    with stage_timer("backend_criteria"):
+        async with httpx.AsyncClient() as client:
+            res = await client.get(url)
     if res.status_code != 200:
         raise ValueError("평가 기준 없음")
     return res.json().get("guideline", "")
 
 
-def generate_feedback_with_criteria(question, answer, emotion, manual, criteria):
+async def generate_feedback_with_criteria(question, answer, emotion, manual, criteria):
+    """선별을 통과한 답변을 GPT로 채점 (채점 불가 판정은 호출 전에 core.answer_screen.screen_answer로)"""
     # 기본 반환 형식
     result = {
         "question": question,
@@ -155,15 +217,14 @@ def generate_feedback_with_criteria(question, answer, emotion, manual, criteria)
         "score": {}
     }
 
-    # 1. 답변 무효 조건 처리
-    if is_meaningless(answer):
-        result["feedback"] = "⚠️ 답변이 정상적으로 인식되지 않아 평가가 불가능합니다. 문의 후 재평가 요청을 진행해 주세요."
-        result["score"] = {}
-        return result
-
-    # 2. 정상 분석 수행
+    # 답변 선별(screen_answer)은 호출하는 쪽에서 한 번만 (채점 불가 답변은 여기까지 오지 않음)
     gaze = emotion.get("gaze", "알 수 없음")
     head = emotion.get("head", "알 수 없음")
+    yaw = emotion.get("yaw")
+    pitch = emotion.get("pitch")
+    angle_line = f"\n- 고개 각도(중앙값): 좌우 {yaw}°, 상하 {pitch}°" if yaw is not None and pitch is not None else ""
+    emotions = emotion.get("emotions") or {}
+    emotion_line = f"\n- 표정(평균 상위 감정): {describe_emotions(emotions)}" if emotions else ""
 
     additional_notes = ""
     if gaze == "알 수 없음":
@@ -171,60 +232,19 @@ def generate_feedback_with_criteria(question, answer, emotion, manual, criteria)
     if head == "알 수 없음":
         additional_notes += "- 고개 움직임 정보가 없으므로 '감정조절'과 '전문성' 평가에는 반영하지 마세요.\n"
 
-    prompt = f"""    
-너는 지금 스타벅스 직원의 모의 시뮬레이션 평가를 담당하고 있어.
-   
-[요청 사항]
-- 메뉴얼을 참고해서 응시자의 답변을 채점 해주세요.
-- 점수 채점을 진행할 때 평가 기준을 참고 해주세요.
-- 각 항목을 5점 만점으로 채점하고, 아래 형식으로 마지막에는 총평을 출력해 주세요.
-- 총평에는 평과 결과와 피드백으로 구성해 주세요.
-- 점수가 낮은 항목(3.5 이하)은 반드시 개선 방향도 함께 제시할 것.
-
-
-위 내용을 참고하여, 다음 6가지 항목에 대해 각각 5점 만점 기준으로 채점해주세요.
-
-1. 친절도
-2. 문제해결능력
-3. 소통능력
-4. 전문성
-5. 감정조절
-6. 태도
-
-※ 각 항목별 점수 옆에 첨언하지 않는다.
-
-[예시 출력 형식]
-- 친절도: 4.5
-- 문제해결능력: 4.0
-...
-- 총평: 전반적으로 침착했으나, 소통의 명확성이 조금 더 필요합니다.
-               
-[문제]
-{question}
-
-[답변]
-{answer}
-
-[시선/고개 움직임 분석 결과]
-- 시선 방향: {gaze}
-- 고개 움직임: {head}
-
-[메뉴얼]
-{manual}
-
-[평가 기준]
-{criteria} 
-
-[주의 사항]
-- 정면을 잘 응시했다면 '소통능력'과 '태도' 항목의 점수를 높게 주세요.
-- 고개 움직임이 안정적이라면 '감정조절'과 '전문성' 점수도 높게 평가해 주세요.
-- 반대로 시선을 회피하거나, 고개를 자주 움직이면 해당 항목 점수를 낮춰 주세요.
-{additional_notes}
-"""
-
-    response = client.chat.completions.create(
-        model="gpt-4",
-        messages=[{"role": "user", "content": prompt}],
+    # 고정 지시문 → 매뉴얼/평가 기준 → 요청별 내용 순서 (입력 예산 초과 시 매뉴얼 → 평가 기준 → 문제 → 답변 순으로 잘라냄)
+    messages = FEEDBACK_PROMPT.render_fitted(
+        {
+            "manual": manual, "criteria": criteria, "question": question, "answer": answer,
+            "gaze": gaze, "head": head, "angle_line": angle_line, "emotion_line": emotion_line,
+            "additional_notes": additional_notes,
+        },
+        trim_order=("manual", "criteria", "question", "answer"),
+    )
+
+    response = await chat_completion_async(
+        "feedback",
+        messages=messages,
         temperature=0.7
     )
 
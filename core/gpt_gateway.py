@@ -0,0 +1,228 @@
+# core/gpt_gateway.py
+# 모든 GPT 호출이 거쳐가는 공통 게이트웨이
+# 호출 지점(route)마다 설정된 모델 티어로 보내고, 모델별 지연/오류율을 관측해
+# 주 모델이 지연 SLO를 넘기면 더 빠른 티어로 자동 우회한다.
+# 호출마다 데드라인(타임아웃)을 걸고, 모든 호출 지점이 하나의 서킷 브레이커를 공유한다.
+# 요청 처리 중에는 chat_completion_async로 테넌트별 공정 스케줄러를 거쳐 스레드에서 호출한다.
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List
+
+from openai import OpenAI, APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from core import profiler
+from core.fair_scheduler import FairScheduler
+from core.token_budget import fit_messages, output_budget
+from core.metrics import GPT_CACHED_RATIO, GPT_IN_FLIGHT, GPT_LATENCY, GPT_TOKENS, current_route
+from config.settings import (
+    OPENAI_API_KEY,
+    OPENAI_BASE_URL,
+    GPT_MODEL_TIERS,
+    GPT_TIER_ORDER,
+    GPT_ROUTE_TIERS,
+    GPT_DEFAULT_TIER,
+    GPT_LATENCY_SLO_SECONDS,
+    GPT_ROUTE_LATENCY_SLO,
+    GPT_MAX_ERROR_RATE,
+    GPT_STATS_WINDOW,
+    GPT_STATS_MIN_SAMPLES,
+    GPT_PRIMARY_PROBE_EVERY,
+    GPT_TIMEOUT_SECONDS,
+    GPT_ROUTE_TIMEOUT_SECONDS,
+    GPT_MAX_RETRIES,
+    GPT_BREAKER_FAILURE_THRESHOLD,
+    GPT_BREAKER_RESET_SECONDS,
+    GPT_MAX_CONCURRENCY,
+    GPT_TENANT_MAX_CONCURRENCY,
+)
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+# OpenAI 클라이언트 (키가 없으면 None → 호출 지점에서 기본값 사용)
+def _create_client():
+    if not OPENAI_API_KEY:
+        logger.warning("경고: OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
+        return None
+    try:
+        return OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL)
+    except Exception as e:
+        logger.warning("OpenAI 클라이언트 초기화 실패: %s", e)
+        return None
+
+
+def _reset_client_after_fork():
+    """fork된 워커가 부모의 HTTP 연결 풀을 공유하지 않도록 클라이언트 재생성"""
+    global client
+    client = _create_client()
+
+
+client = _create_client()
+os.register_at_fork(after_in_child=_reset_client_after_fork)
+
+
+class ModelStats:
+    """모델별 최근 N회 호출의 지연/성공 여부"""
+
+    def __init__(self, window: int = GPT_STATS_WINDOW):
+        self._samples = deque(maxlen=window)  # (지연 초, 성공 여부)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float, ok: bool):
+        with self._lock:
+            self._samples.append((latency, ok))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = list(self._samples)
+        if not samples:
+            return {"count": 0, "p90_latency": 0.0, "error_rate": 0.0}
+        latencies = sorted(latency for latency, _ in samples)
+        errors = sum(1 for _, ok in samples if not ok)
+        return {
+            "count": len(samples),
+            "p90_latency": latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))],
+            "error_rate": errors / len(samples),
+        }
+
+
+class ModelRouter:
+    """호출 지점 → 모델 선택 (관측 지표 기반 자동 우회)"""
+
+    def __init__(self):
+        self.stats: Dict[str, ModelStats] = {model: ModelStats() for model in GPT_MODEL_TIERS.values()}
+        self._calls: Dict[str, int] = {}
+        self._selected: Dict[str, str] = {}  # 호출 지점별 직전 선택 (우회 시작/회복 때만 로그)
+        self._lock = threading.Lock()
+
+    def _is_healthy(self, model: str, slo: float) -> bool:
+        snapshot = self.stats[model].snapshot()
+        if snapshot["count"] < GPT_STATS_MIN_SAMPLES:
+            return True
+        return snapshot["p90_latency"] <= slo and snapshot["error_rate"] <= GPT_MAX_ERROR_RATE
+
+    def candidates(self, route: str) -> List[str]:
+        """설정된 티어부터 더 빠른 티어 순서로 모델 목록"""
+        tier = GPT_ROUTE_TIERS.get(route, GPT_DEFAULT_TIER)
+        start = GPT_TIER_ORDER.index(tier) if tier in GPT_TIER_ORDER else 0
+        return [GPT_MODEL_TIERS[t] for t in GPT_TIER_ORDER[start:]]
+
+    def select(self, route: str) -> str:
+        models = self.candidates(route)
+        slo = GPT_ROUTE_LATENCY_SLO.get(route, GPT_LATENCY_SLO_SECONDS)
+
+        with self._lock:
+            self._calls[route] = self._calls.get(route, 0) + 1
+            probe = self._calls[route] % GPT_PRIMARY_PROBE_EVERY == 0
+
+        # 우회 중에도 주기적으로 주 모델을 호출해 회복 여부를 관측
+        if probe:
+            return models[0]
+        model = next((m for m in models if self._is_healthy(m, slo)), models[-1])
+        with self._lock:
+            previous = self._selected.get(route, models[0])
+            self._selected[route] = model
+        if model != previous:
+            if model == models[0]:
+                logger.info("✅ [%s] %s 회복 → 우회 종료", route, model)
+            else:
+                logger.warning("⚠️ [%s] %s 지연/오류 초과 → %s로 우회", route, models[0], model)
+        return model
+
+    def record(self, model: str, latency: float, ok: bool):
+        if model not in self.stats:
+            self.stats[model] = ModelStats()
+        self.stats[model].record(latency, ok)
+
+    def report(self) -> dict:
+        return {model: stats.snapshot() for model, stats in self.stats.items()}
+
+
+model_router = ModelRouter()
+breaker = CircuitBreaker("GPT", GPT_BREAKER_FAILURE_THRESHOLD, GPT_BREAKER_RESET_SECONDS)
+gpt_scheduler = FairScheduler("gpt", GPT_MAX_CONCURRENCY, GPT_TENANT_MAX_CONCURRENCY)
+
+
+class GPTUnavailableError(Exception):
+    """클라이언트가 없거나 브레이커가 열려 GPT를 호출할 수 없음"""
+
+
+def is_available() -> bool:
+    """지금 GPT를 호출할 가치가 있는지 (False면 호출 지점에서 바로 기본값 사용)"""
+    return client is not None and not breaker.is_open()
+
+
+def _is_outage(error: Exception) -> bool:
+    """서킷 브레이커 실패로 셀 오류인지 (타임아웃/연결/429/5xx)"""
+    if isinstance(error, (APITimeoutError, APIConnectionError, RateLimitError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def chat_completion(route: str, messages: list, **kwargs):
+    """호출 지점 이름으로 GPT 호출 (모델은 라우터가 선택, 데드라인 초과 시 APITimeoutError)"""
+    if client is None:
+        raise GPTUnavailableError("OpenAI 클라이언트가 없음")
+    model = model_router.select(route)
+    # 토큰 예산: 입력은 넘으면 잘라내고, 출력은 호출 지점 예산을 넘지 않도록 max_tokens 강제
+    # (브레이커 probe를 받기 전에 준비: 여기서 예외가 나도 probe가 잡힌 채로 남지 않도록)
+    messages = fit_messages(route, messages, model)
+    kwargs["max_tokens"] = min(kwargs.get("max_tokens") or output_budget(route), output_budget(route))
+    try:
+        breaker.before_call()
+    except CircuitOpenError as e:
+        raise GPTUnavailableError(str(e)) from e
+
+    timeout = GPT_ROUTE_TIMEOUT_SECONDS.get(route, GPT_TIMEOUT_SECONDS)
+    http_route = current_route.get()
+    in_flight = GPT_IN_FLIGHT.labels(route)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        response = client.with_options(timeout=timeout, max_retries=GPT_MAX_RETRIES).chat.completions.create(
+            model=model, messages=messages, **kwargs
+        )
+    except Exception as e:
+        elapsed = time.perf_counter() - started
+        model_router.record(model, elapsed, ok=False)
+        GPT_LATENCY.labels(route, model, http_route, "timeout" if isinstance(e, APITimeoutError) else "error").observe(elapsed)
+        if _is_outage(e):
+            breaker.record_failure()
+        else:
+            breaker.release_probe()
+        raise
+    finally:
+        in_flight.dec()
+    elapsed = time.perf_counter() - started
+    model_router.record(model, elapsed, ok=True)
+    GPT_LATENCY.labels(route, model, http_route, "ok").observe(elapsed)
+    _record_usage(route, model, http_route, response)
+    breaker.record_success()
+    return response
+
+
+async def chat_completion_async(route: str, messages: list, **kwargs):
+    """이벤트 루프용: 테넌트 차례를 기다린 뒤 스레드에서 chat_completion 실행 (루프를 막지 않음)"""
+    if client is None:
+        raise GPTUnavailableError("OpenAI 클라이언트가 없음")
+    async with gpt_scheduler.slot():
+        return await asyncio.to_thread(profiler.call, "gpt", chat_completion, route, messages, **kwargs)
+
+
+def _record_usage(route: str, model: str, http_route: str, response):
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    GPT_TOKENS.labels(route, model, http_route, "prompt").inc(usage.prompt_tokens or 0)
+    GPT_TOKENS.labels(route, model, http_route, "completion").inc(usage.completion_tokens or 0)
+    # 프롬프트 prefix 캐시 적중분 (1024 토큰 이상 프롬프트에서만 적용됨)
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = (getattr(details, "cached_tokens", None) or 0) if details is not None else 0
+    GPT_TOKENS.labels(route, model, http_route, "cached").inc(cached)
+    if usage.prompt_tokens:
+        GPT_CACHED_RATIO.labels(route, model).observe(cached / usage.prompt_tokens)
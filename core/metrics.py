@@ -0,0 +1,137 @@
+# core/metrics.py
+# Prometheus 지표 정의 + 단계별 시간 측정 도우미
+# 모든 지표에 route 라벨을 붙여 라우트별 병목 구간을 찾을 수 있게 한다.
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# 현재 요청의 라우트 경로 (미들웨어에서 설정, 스레드로 넘길 때는 컨텍스트 복사)
+current_route: ContextVar[str] = ContextVar("current_route", default="background")
+
+_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+REQUEST_LATENCY = Histogram(
+    "growkit_request_seconds", "HTTP 요청 처리 시간",
+    ["route", "method", "status"], buckets=_LATENCY_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "growkit_requests_in_flight", "처리 중인 HTTP 요청 수", ["route"],
+)
+STAGE_LATENCY = Histogram(
+    "growkit_stage_seconds", "파이프라인 단계별 처리 시간",
+    ["stage", "route"], buckets=_LATENCY_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "growkit_stage_errors_total", "파이프라인 단계별 실패 수", ["stage", "route"],
+)
+QUEUE_DEPTH = Gauge(
+    "growkit_queue_depth", "작업 풀에서 실행을 기다리는 작업 수", ["queue"],
+)
+TASKS_IN_FLIGHT = Gauge(
+    "growkit_tasks_in_flight", "작업 풀에서 실행 중인 작업 수", ["queue"],
+)
+GPT_LATENCY = Histogram(
+    "growkit_gpt_call_seconds", "GPT 호출 지점별 응답 시간",
+    ["call_site", "model", "route", "outcome"], buckets=_LATENCY_BUCKETS,
+)
+GPT_IN_FLIGHT = Gauge(
+    "growkit_gpt_calls_in_flight", "진행 중인 GPT 호출 수", ["call_site"],
+)
+GPT_TOKENS = Counter(
+    "growkit_gpt_tokens_total", "GPT 토큰 사용량",
+    ["call_site", "model", "route", "kind"],  # kind: prompt / completion / cached (prompt 중 prefix 캐시 적중분)
+)
+CACHE_REQUESTS = Counter(
+    "growkit_cache_requests_total", "캐시 조회 수 (적중률 = hit / (hit + miss))",
+    ["cache", "result"],  # result: hit / miss
+)
+SCRATCH_RESERVED_BYTES = Gauge(
+    "growkit_scratch_reserved_bytes", "예약된 임시 작업 공간 크기",
+)
+SCRATCH_WAIT = Histogram(
+    "growkit_scratch_wait_seconds", "임시 작업 공간 예약 대기 시간", buckets=_LATENCY_BUCKETS,
+)
+SCRATCH_SWEPT = Counter(
+    "growkit_scratch_swept_total", "정리된 누수 작업 디렉터리 수",
+)
+TENANT_QUEUE_WAIT = Histogram(
+    "growkit_tenant_queue_wait_seconds", "테넌트별 스케줄러 대기 시간",
+    ["scheduler", "tenant"], buckets=_LATENCY_BUCKETS,
+)
+TENANT_QUEUE_DEPTH = Gauge(
+    "growkit_tenant_queue_depth", "테넌트별 스케줄러 대기 작업 수", ["scheduler", "tenant"],
+)
+TENANT_REJECTED = Counter(
+    "growkit_tenant_rejected_total", "테넌트별 거절된 작업 수",
+    ["scheduler", "tenant", "reason"],  # reason: queue_full / timeout
+)
+GPT_CACHED_RATIO = Histogram(
+    "growkit_gpt_cached_prompt_ratio", "호출별 프롬프트 토큰 중 prefix 캐시 적중 비율",
+    ["call_site", "model"], buckets=(0, 0.1, 0.25, 0.5, 0.75, 0.9, 1),
+)
+GPT_PROMPT_TOKENS = Histogram(
+    "growkit_gpt_prompt_tokens", "보내기 전에 측정한 프롬프트 토큰 수 (잘라내기 전)",
+    ["call_site"], buckets=(250, 500, 1000, 2000, 4000, 6000, 8000, 16000, 32000),
+)
+GPT_TRUNCATED_TOKENS = Counter(
+    "growkit_gpt_truncated_tokens_total", "입력 예산 때문에 잘라낸 토큰 수",
+    ["call_site", "part"],
+)
+SCREEN_DECISIONS = Counter(
+    "growkit_answer_screen_total", "답변 사전 선별 결과 (invalid는 GPT 호출 생략)",
+    ["verdict", "reason"],
+)
+
+REQUEST_CPU_SECONDS = Histogram(
+    "growkit_request_cpu_seconds", "요청별 분석 작업 CPU 시간", ["route"], buckets=_LATENCY_BUCKETS,
+)
+REQUEST_PEAK_RSS_BYTES = Histogram(
+    "growkit_request_peak_rss_bytes", "요청별 분석 중 RSS 최대 증가량 (동시 요청 몫이 섞인 근사치)",
+    ["route"], buckets=tuple(2 ** n * 2 ** 20 for n in range(0, 13)),  # 1MB ~ 4GB
+)
+REQUEST_SCRATCH_BYTES = Histogram(
+    "growkit_request_scratch_bytes", "요청별 임시 작업 공간에 쓴 바이트",
+    ["route"], buckets=tuple(2 ** n * 2 ** 20 for n in range(0, 13)),
+)
+REQUEST_FRAMES = Counter(
+    "growkit_request_frames_decoded_total", "디코딩한 영상 프레임 수", ["route"],
+)
+REQUEST_AUDIO_SECONDS = Counter(
+    "growkit_request_audio_seconds_total", "STT에 넣은 오디오 길이(초)", ["route"],
+)
+REQUEST_LIMIT_EXCEEDED = Counter(
+    "growkit_request_limit_exceeded_total", "자원 상한 초과로 중단한 요청 수",
+    ["route", "limit"],  # limit: video_seconds / frames / audio_seconds
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "growkit_log_records_dropped_total", "로그 큐가 가득 차 버린 로그 레코드 수", ["level"],
+)
+
+STT_BATCH_REQUESTS = Histogram(
+    "growkit_stt_batch_requests", "STT 배치 하나에 묶인 요청 수", buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """with stage_timer("whisper"): ... 형태로 단계 시간을 현재 라우트 라벨과 함께 기록"""
+    route = current_route.get()
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage, route).inc()
+        raise
+    finally:
+        STAGE_LATENCY.labels(stage, route).observe(time.perf_counter() - started)
+
+
+def record_cache(cache: str, hits: int, misses: int):
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
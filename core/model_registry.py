@@ -0,0 +1,168 @@
+# core/model_registry.py
+# 무거운 모델(Whisper, Haar Cascade, FaceMesh, MTCNN+FER)을 import 시점이 아니라 필요할 때/서버 시작 단계에서 로드
+# - get_*() : 처음 호출될 때 1번만 로드 (스레드 안전)
+# - load_models() : 서버 시작 단계에서 미리 로드 + 선택적으로 더미 추론(워밍업)
+# - is_ready() : 준비 완료 여부 (/readyz)
+
+import os
+import threading
+import time
+
+from config.settings import (
+    STT_MODEL_SIZE,
+    WHISPER_ENGINE_MODEL_SIZE,
+    PRELOAD_MODELS,
+    MODEL_WARMUP_INFERENCE,
+    ANSWER_SCREEN_MODEL_PATH,
+    SCORE_MODEL_PATH,
+)
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+_models = {}
+_lock = threading.Lock()
+_ready = threading.Event()
+_load_error = None
+
+
+def _get_or_load(name: str, loader):
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _lock:
+        if name not in _models:
+            started = time.perf_counter()
+            _models[name] = loader()
+            logger.info("모델 로드 완료: %s (%.2fs)", name, time.perf_counter() - started)
+        return _models[name]
+
+
+def get_stt_model():
+    """영상 STT용 Whisper 모델 (빠른 버전)"""
+    def _load():
+        from faster_whisper import WhisperModel
+        return WhisperModel(STT_MODEL_SIZE, device="cpu", compute_type="int8")
+    return _get_or_load("stt", _load)
+
+
+def get_whisper_engine_model():
+    """core/whisper_engine 용 Whisper 모델 (CPU: compute_type="int8", GPU: "float16" 또는 "int8_float16")"""
+    def _load():
+        from faster_whisper import WhisperModel
+        return WhisperModel(WHISPER_ENGINE_MODEL_SIZE, device="cpu", compute_type="int8")
+    return _get_or_load("whisper_engine", _load)
+
+
+def get_face_cascades():
+    """(얼굴, 눈) Haar Cascade"""
+    def _load():
+        import cv2
+        return (
+            cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml"),
+            cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_eye.xml"),
+        )
+    return _get_or_load("cascades", _load)
+
+
+def get_face_mesh_class():
+    """mediapipe FaceMesh 클래스 (import가 무거워 필요할 때 로드, 인스턴스는 영상마다 생성)"""
+    def _load():
+        import mediapipe as mp
+        return mp.solutions.face_mesh.FaceMesh
+    return _get_or_load("face_mesh", _load)
+
+
+def get_emotion_detector():
+    """(MTCNN 얼굴 검출기, FER 감정 분류기) (TensorFlow/torch 로드가 무거워 기본 미리 로드 대상 아님)
+    얼굴 검출은 MTCNN으로 여러 프레임을 한 번에 하고, FER에는 검출된 얼굴 박스만 넘겨 분류만 시킴
+    """
+    def _load():
+        from facenet_pytorch import MTCNN
+        from fer import FER
+        return MTCNN(keep_all=False, device="cpu"), FER()
+    return _get_or_load("emotion", _load)
+
+
+def get_answer_screen_model():
+    """답변 사전 선별 분류기 (scikit-learn 파이프라인, 학습된 파일이 없으면 None → 규칙만 사용)"""
+    def _load():
+        if not os.path.exists(ANSWER_SCREEN_MODEL_PATH):
+            logger.info("답변 선별 모델 파일 없음 (%s) - 규칙만 사용", ANSWER_SCREEN_MODEL_PATH)
+            return None
+        import joblib
+        return joblib.load(ANSWER_SCREEN_MODEL_PATH)
+    return _get_or_load("answer_screen", _load)
+
+
+def get_score_model():
+    """잠정 점수 회귀 모델 (학습된 파일이 없으면 None → 잠정 점수 없이 GPT 점수만)"""
+    def _load():
+        if not os.path.exists(SCORE_MODEL_PATH):
+            logger.info("잠정 점수 모델 파일 없음 (%s) - 잠정 점수 생략", SCORE_MODEL_PATH)
+            return None
+        import joblib
+        return joblib.load(SCORE_MODEL_PATH)
+    return _get_or_load("score", _load)
+
+
+_LOADERS = {
+    "stt": get_stt_model,
+    "whisper_engine": get_whisper_engine_model,
+    "cascades": get_face_cascades,
+    "face_mesh": get_face_mesh_class,
+    "emotion": get_emotion_detector,
+    "answer_screen": get_answer_screen_model,
+    "score": get_score_model,
+}
+
+
+def _warm_up(name: str):
+    """더미 입력으로 1번 추론해 지연 초기화(스레드 풀, 커널 등)를 미리 끝냄"""
+    import numpy as np
+
+    if name in ("stt", "whisper_engine"):
+        segments, _ = _models[name].transcribe(np.zeros(16000, dtype=np.float32), language="ko")
+        list(segments)
+    elif name == "cascades":
+        face_cascade, _ = _models[name]
+        face_cascade.detectMultiScale(np.zeros((240, 320), dtype=np.uint8), 1.1, 4)
+    elif name == "face_mesh":
+        with _models[name](static_image_mode=True, max_num_faces=1) as mesh:
+            mesh.process(np.zeros((240, 320, 3), dtype=np.uint8))
+    elif name == "emotion":
+        mtcnn, fer = _models[name]
+        blank = np.zeros((240, 320, 3), dtype=np.uint8)
+        mtcnn.detect([blank])
+        fer.detect_emotions(blank, face_rectangles=[(100, 60, 120, 120)])
+    elif name == "answer_screen" and _models[name] is not None:
+        _models[name].predict_proba(["안녕하세요 고객님"])
+    elif name == "score" and _models[name] is not None:
+        from core.score_model import predict_scores
+        predict_scores("문의드립니다", "안녕하세요 고객님", {})
+
+
+def load_models(names=None, warmup: bool = MODEL_WARMUP_INFERENCE):
+    """서버 시작 단계에서 모델 미리 로드 (완료되면 준비 상태로 전환)"""
+    global _load_error
+    names = PRELOAD_MODELS if names is None else names
+    started = time.perf_counter()
+    try:
+        for name in names:
+            _LOADERS[name]()
+            if warmup:
+                _warm_up(name)
+    except Exception as e:
+        _load_error = e
+        logger.exception("❌ 모델 로드 실패: %s", e)
+        raise
+    _ready.set()
+    logger.info("✅ 모델 준비 완료: %s (%.2fs, 워밍업=%s)", names, time.perf_counter() - started, warmup)
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def load_error():
+    return _load_error
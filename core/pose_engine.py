@@ -0,0 +1,178 @@
+# core/pose_engine.py
+# 시선/고개 분석 엔진 (교체 가능)
+# - LandmarkPoseEngine: mediapipe 얼굴 랜드마크(3D)로 프레임별 실제 yaw/pitch(도) 계산
+# - HaarPoseEngine: 기존 Haar Cascade 눈 위치 방식 (비교용)
+#
+# 공통 흐름: 공용 디코더(core.video_frames)에서 샘플링한 프레임을 배치로 넣고,
+# 배치별 결과를 누적한 뒤 summarize()로 라벨(정면/왼쪽/오른쪽, 안정적/움직임 있음)과 수치를 만든다.
+
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+import cv2
+import numpy as np
+
+from config.settings import POSE_ENGINE, POSE_GAZE_YAW_DEG, POSE_MOTION_STD_DEG
+from core.model_registry import get_face_cascades, get_face_mesh_class
+
+UNKNOWN = "알 수 없음"
+
+# mediapipe FaceMesh 랜드마크 번호
+_RIGHT_EYE_OUTER = 33  # 화면 왼쪽 눈 바깥 꼬리
+_LEFT_EYE_OUTER = 263  # 화면 오른쪽 눈 바깥 꼬리
+_FOREHEAD = 10
+_CHIN = 152
+
+
+class PoseEngine(ABC):
+    """엔진 인터페이스: add_batch()로 프레임을 넣고 summarize()로 결과를 받음"""
+
+    name = "base"
+
+    @abstractmethod
+    def add_batch(self, frames: List[np.ndarray]):
+        ...
+
+    @abstractmethod
+    def summarize(self) -> Dict:
+        ...
+
+    def close(self):
+        pass
+
+
+class LandmarkPoseEngine(PoseEngine):
+    """얼굴 3D 랜드마크 기반 yaw/pitch
+    yaw  > 0: 얼굴이 화면 오른쪽으로 돌아감 / < 0: 화면 왼쪽
+    pitch > 0: 고개를 듦 / < 0: 고개를 숙임
+    """
+
+    name = "landmark"
+
+    def __init__(self):
+        face_mesh_class = get_face_mesh_class()
+        # 같은 영상의 연속 샘플이므로 추적 모드(static_image_mode=False)로 검출 비용을 줄임
+        self._mesh = face_mesh_class(static_image_mode=False, max_num_faces=1, refine_landmarks=False)
+        self._yaws: List[np.ndarray] = []
+        self._pitches: List[np.ndarray] = []
+        self.frames_seen = 0
+
+    def add_batch(self, frames: List[np.ndarray]):
+        """mediapipe FaceMesh는 배치 입력이 없어 랜드마크 검출은 프레임마다 한 번씩 실행됨
+        (추적 모드라 연속 프레임 순서가 중요) — 배치로 묶는 이점은 공용 디코더 공유와
+        랜드마크 → 각도 변환을 배치 전체에 대해 한 번에 계산하는 부분뿐
+        """
+        self.frames_seen += len(frames)
+        points = []
+        for frame in frames:
+            h, w = frame.shape[:2]
+            result = self._mesh.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if not result.multi_face_landmarks:
+                continue
+            lm = result.multi_face_landmarks[0].landmark
+            # z는 x와 같은 스케일(가로 기준)이므로 x, z 모두 가로 픽셀로 환산
+            points.append([
+                (lm[i].x * w, lm[i].y * h, lm[i].z * w)
+                for i in (_RIGHT_EYE_OUTER, _LEFT_EYE_OUTER, _FOREHEAD, _CHIN)
+            ])
+        if not points:
+            return
+
+        # 배치 전체를 한 번에 각도로 변환 (N, 4, 3)
+        p = np.asarray(points, dtype=np.float32)
+        eye_axis = p[:, 1] - p[:, 0]
+        face_axis = p[:, 3] - p[:, 2]
+        self._yaws.append(np.degrees(np.arctan2(eye_axis[:, 2], eye_axis[:, 0])))
+        self._pitches.append(np.degrees(np.arctan2(-face_axis[:, 2], face_axis[:, 1])))
+
+    def summarize(self) -> Dict:
+        if not self._yaws:
+            return {
+                "gaze_direction": UNKNOWN, "head_stability": UNKNOWN,
+                "head_yaw": None, "head_pitch": None, "frames_analyzed": self.frames_seen, "faces_detected": 0,
+            }
+        yaws = np.concatenate(self._yaws)
+        pitches = np.concatenate(self._pitches)
+
+        labels = np.where(yaws < -POSE_GAZE_YAW_DEG, 0, np.where(yaws > POSE_GAZE_YAW_DEG, 2, 1))
+        gaze = ("왼쪽", "정면", "오른쪽")[int(np.bincount(labels, minlength=3).argmax())]
+        moving = max(float(yaws.std()), float(pitches.std())) > POSE_MOTION_STD_DEG
+
+        return {
+            "gaze_direction": gaze,
+            "head_stability": "움직임 있음" if moving else "안정적",
+            "head_yaw": round(float(np.median(yaws)), 1),
+            "head_pitch": round(float(np.median(pitches)), 1),
+            "head_yaw_std": round(float(yaws.std()), 1),
+            "head_pitch_std": round(float(pitches.std()), 1),
+            "frames_analyzed": self.frames_seen,
+            "faces_detected": int(len(yaws)),
+        }
+
+    def close(self):
+        self._mesh.close()
+
+
+class HaarPoseEngine(PoseEngine):
+    """기존 방식: Haar 얼굴/눈 박스 중심으로 시선, 눈 사이 거리 변화로 고개 움직임 추정 (각도 없음)"""
+
+    name = "haar"
+
+    def __init__(self):
+        self._face_cascade, self._eye_cascade = get_face_cascades()
+        self._gaze_directions: List[str] = []
+        self._yaw_distances: List[int] = []
+        self.frames_seen = 0
+
+    def add_batch(self, frames: List[np.ndarray]):
+        self.frames_seen += len(frames)
+        for frame in frames:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            faces = self._face_cascade.detectMultiScale(gray, 1.1, 4)
+
+            for (x, y, w, h) in faces:
+                roi = gray[y:y + h, x:x + w]
+                eyes = self._eye_cascade.detectMultiScale(roi)
+
+                if len(eyes) >= 2:
+                    centers = [(ex + ew // 2) for (ex, ey, ew, eh) in eyes]
+                    avg_x = sum(centers) / len(centers)
+
+                    if avg_x < w // 2 - 10:
+                        self._gaze_directions.append("왼쪽")
+                    elif avg_x > w // 2 + 10:
+                        self._gaze_directions.append("오른쪽")
+                    else:
+                        self._gaze_directions.append("정면")
+
+                    self._yaw_distances.append(abs(centers[0] - centers[1]))
+
+    def summarize(self) -> Dict:
+        gaze_directions = self._gaze_directions
+        yaw_distances = self._yaw_distances
+        gaze_result = max(set(gaze_directions), key=gaze_directions.count) if gaze_directions else UNKNOWN
+        head_motion = (
+            "움직임 있음" if max(yaw_distances, default=0) - min(yaw_distances, default=0) > 10 else "안정적"
+        )
+        return {
+            "gaze_direction": gaze_result,
+            "head_stability": head_motion,
+            "head_yaw": None,
+            "head_pitch": None,
+            "frames_analyzed": self.frames_seen,
+            "faces_detected": len(gaze_directions),
+        }
+
+
+_ENGINES = {
+    LandmarkPoseEngine.name: LandmarkPoseEngine,
+    HaarPoseEngine.name: HaarPoseEngine,
+}
+
+
+def create_pose_engine(name: Optional[str] = None) -> PoseEngine:
+    """설정(POSE_ENGINE) 또는 지정한 이름의 엔진 생성 (영상 1개당 1개)"""
+    name = name or POSE_ENGINE
+    if name not in _ENGINES:
+        raise ValueError(f"지원하지 않는 pose 엔진: {name} (가능: {', '.join(_ENGINES)})")
+    return _ENGINES[name]()
@@ -0,0 +1,170 @@
+# core/profiler.py
+# 요청 단위 샘플링 프로파일러 (선택적으로 켜는 운영 진단 도구)
+# - X-Profile: 1 헤더 또는 PROFILE_SAMPLE_RATE 비율로 선택된 요청만 프로파일링
+# - 샘플러 스레드가 PROFILE_INTERVAL_SECONDS마다 sys._current_frames()로 스택을 모음
+#   대상: 이벤트 루프 스레드(다른 요청과 공유) + 이 요청이 분석 풀/GPT 스레드로 넘긴 작업
+#   (profiler.call()로 실행된 작업이 실행 중인 스레드만 등록되므로 다른 요청의 작업은 섞이지 않음)
+# - 결과는 {PROFILE_DIR}/{요청 ID}.folded (collapsed stack 형식, speedscope / flamegraph.pl 에서 열림)
+# - 프로파일링 중인 요청이 없으면 샘플러 스레드도 멈춤 → 꺼져 있을 때 비용은 ContextVar 조회 한 번
+#
+#   ctx.run(profiler.call, "analysis", fn, *args)   # 스레드로 넘기는 작업을 현재 요청 프로파일에 포함
+
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from config.settings import (
+    PROFILE_DIR,
+    PROFILE_HEADER_ENABLED,
+    PROFILE_INTERVAL_SECONDS,
+    PROFILE_MAX_CONCURRENT,
+    PROFILE_MAX_FILES,
+    PROFILE_SAMPLE_RATE,
+)
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_-]")
+_MAX_DEPTH = 128
+
+
+class RequestProfile:
+    def __init__(self, request_id: str, route: str):
+        self.request_id = request_id
+        self.route = route
+        self.started = time.perf_counter()
+        self.threads: Dict[int, str] = {}  # 스레드 ident → 라벨 (event-loop / analysis / gpt ...)
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def attach(self, label: str):
+        """with 블록 동안 현재 스레드를 이 요청의 샘플링 대상으로 등록"""
+        ident = threading.get_ident()
+        with self._lock:
+            self.threads[ident] = label
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.threads.pop(ident, None)
+
+    def _sample(self, frames):
+        with self._lock:
+            threads = list(self.threads.items())
+        for ident, label in threads:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack: List[str] = []
+            while frame is not None and len(stack) < _MAX_DEPTH:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            stack.append(label)
+            with self._lock:
+                self.stacks[";".join(reversed(stack))] += 1
+        with self._lock:
+            self.samples += 1
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+_active: List[RequestProfile] = []
+_active_lock = threading.Lock()
+_sampler: Optional[threading.Thread] = None
+
+
+def _sample_loop():
+    global _sampler
+    while True:
+        time.sleep(PROFILE_INTERVAL_SECONDS)
+        with _active_lock:
+            profiles = list(_active)
+            if not profiles:
+                _sampler = None  # 프로파일링 중인 요청이 없으면 스레드 종료
+                return
+        frames = sys._current_frames()
+        for profile in profiles:
+            profile._sample(frames)
+
+
+def should_profile(headers) -> bool:
+    if PROFILE_HEADER_ENABLED and headers.get("X-Profile", "").lower() in ("1", "true", "yes"):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def start(request_id: str, route: str) -> Optional[RequestProfile]:
+    """현재 스레드(이벤트 루프)를 등록하고 샘플링 시작, 동시 프로파일 수가 가득 차면 None"""
+    global _sampler
+    profile = RequestProfile(request_id, route)
+    with _active_lock:
+        if len(_active) >= PROFILE_MAX_CONCURRENT:
+            logger.info("동시 프로파일링 수 초과로 건너뜀: %s", request_id)
+            return None
+        _active.append(profile)
+        if _sampler is None:
+            _sampler = threading.Thread(target=_sample_loop, name="request-profiler", daemon=True)
+            _sampler.start()
+    profile.threads[threading.get_ident()] = "event-loop"
+    return profile
+
+
+def finish(profile: RequestProfile) -> str:
+    """샘플링을 멈추고 collapsed stack 파일로 저장, 경로 반환"""
+    with _active_lock:
+        if profile in _active:
+            _active.remove(profile)
+    elapsed = time.perf_counter() - profile.started
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = path_for(profile.request_id)
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in profile.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+    logger.info("🔬 프로파일 저장: %s %.2fs, 샘플 %s개 → %s", profile.route, elapsed, profile.samples, path)
+    _prune()
+    return path
+
+
+def call(label: str, fn, *args, **kwargs):
+    """fn을 실행하는 동안 현재 요청 프로파일에 이 스레드를 포함 (프로파일링 중이 아니면 그냥 실행)"""
+    profile = current_profile.get()
+    if profile is None:
+        return fn(*args, **kwargs)
+    with profile.attach(label):
+        return fn(*args, **kwargs)
+
+
+def path_for(request_id: str) -> str:
+    # 요청 ID는 클라이언트가 보낼 수 있으므로 파일 이름에 쓸 수 있는 문자만 남김
+    return os.path.join(PROFILE_DIR, _UNSAFE.sub("_", request_id)[:64] + ".folded")
+
+
+def list_profiles() -> List[Dict]:
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = []
+    for entry in os.scandir(PROFILE_DIR):
+        if entry.name.endswith(".folded"):
+            stat = entry.stat()
+            profiles.append({"request_id": entry.name[:-len(".folded")], "bytes": stat.st_size, "created_at": stat.st_mtime})
+    return sorted(profiles, key=lambda p: p["created_at"], reverse=True)
+
+
+def _prune():
+    """오래된 프로파일부터 지워 PROFILE_MAX_FILES개만 유지"""
+    for stale in list_profiles()[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(path_for(stale["request_id"]))
+        except FileNotFoundError:
+            pass  # 다른 워커가 먼저 지움
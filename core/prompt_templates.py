@@ -0,0 +1,44 @@
+# core/prompt_templates.py
+# GPT 프롬프트 템플릿: 모듈 import 시 한 번만 만들어 두고 요청마다 값만 채움
+# 메시지 순서를 "고정 지시문(system) → 자주 바뀌지 않는 자료(매뉴얼/평가 기준) → 요청별 내용"으로 고정해
+# 같은 호출 지점의 요청들이 앞부분을 그대로 공유하도록 한다 (OpenAI 프롬프트 prefix 캐시 적중).
+# 적중률은 gpt_gateway가 응답 usage의 cached_tokens로 기록한다.
+#
+#   FEEDBACK = PromptTemplate("feedback", system="...", context="[메뉴얼]\n{manual}", request="[답변]\n{answer}")
+#   messages = FEEDBACK.render_fitted({"manual": ..., "answer": ...}, trim_order=("manual",))
+
+from string import Formatter
+from textwrap import dedent
+from typing import Dict, List, Sequence, Tuple
+
+from core.token_budget import fit_parts
+
+
+def _compile(text: str) -> Tuple[str, Tuple[str, ...]]:
+    text = dedent(text).strip()
+    fields = tuple(name for _, name, _, _ in Formatter().parse(text) if name)
+    return text, fields
+
+
+class PromptTemplate:
+    def __init__(self, route: str, system: str, context: str = "", request: str = ""):
+        self.route = route
+        self.system, _ = _compile(system)  # 고정 지시문에는 자리표시자를 넣지 않음
+        self.context, self.context_fields = _compile(context)
+        self.request, self.request_fields = _compile(request)
+
+    def render(self, **values) -> List[Dict[str, str]]:
+        messages = [{"role": "system", "content": self.system}]
+        if self.context:
+            messages.append({"role": "user", "content": self.context.format(**values).strip()})
+        if self.request:
+            messages.append({"role": "user", "content": self.request.format(**values).strip()})
+        return messages
+
+    def render_fitted(self, values: Dict[str, str], trim_order: Sequence[str] = ()) -> List[Dict[str, str]]:
+        """입력 토큰 예산을 넘으면 trim_order 순서대로 값의 뒤쪽을 잘라낸 뒤 렌더링"""
+        def build(**parts):
+            return "\n".join(message["content"] for message in self.render(**{**values, **parts}))
+
+        parts = fit_parts(self.route, build, {name: values[name] for name in trim_order}, trim_order)
+        return self.render(**{**values, **parts})
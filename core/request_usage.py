@@ -0,0 +1,197 @@
+# core/request_usage.py
+# 요청 단위 자원 사용량 집계 + 요청별 상한
+# - wall: 요청 전체 처리 시간
+# - cpu: 이 요청 몫의 CPU 시간 = 분석 풀 스레드의 파이썬 스레드 CPU + STT 배치 스레드에서 나눠 받은 몫
+#        + run_process로 실행한 자식 프로세스(ffmpeg)의 user+sys
+#   제외: 이벤트 루프 스레드 몫(요청별로 나눌 수 없음), 네이티브 라이브러리가 내부에서 띄운 스레드
+#   (ctranslate2 intra-op, OpenCV 등 — 어느 요청 몫인지 알 수 없음) → 실제보다 작게 잡히는 하한값
+# - peak_rss: 분석 작업 중 프로세스 RSS 최대 증가량 (동시에 도는 다른 요청의 몫이 섞일 수 있는 근사치)
+# - scratch: 임시 작업 공간에 쓴 바이트, frames: 디코딩한 프레임 수, audio: STT에 넣은 오디오 길이(초)
+# 미들웨어가 응답 헤더(X-Usage-*)와 지표로 내보내고,
+# 영상 길이/프레임 수/오디오 길이가 상한을 넘으면 RequestLimitExceeded (413)로 즉시 중단한다.
+
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+import psutil
+
+from config.settings import REQUEST_MAX_AUDIO_SECONDS, REQUEST_MAX_FRAMES, REQUEST_MAX_VIDEO_SECONDS
+from core.metrics import (
+    REQUEST_AUDIO_SECONDS,
+    REQUEST_CPU_SECONDS,
+    REQUEST_FRAMES,
+    REQUEST_LIMIT_EXCEEDED,
+    REQUEST_PEAK_RSS_BYTES,
+    REQUEST_SCRATCH_BYTES,
+    current_route,
+)
+
+_process = psutil.Process()
+_RSS_INTERVAL = 0.05
+
+
+class RequestLimitExceeded(RuntimeError):
+    """요청 하나가 허용된 자원 상한을 넘음 (라우터에서 413으로 변환)"""
+
+    def __init__(self, limit: str, value: float, maximum: float):
+        super().__init__(f"{limit} 상한 초과: {value:.0f} > {maximum:.0f}")
+        self.limit = limit
+        self.value = value
+        self.maximum = maximum
+
+    def __reduce__(self):
+        # 분석 노드 → API 노드로 pickle해서 전달할 수 있도록
+        return type(self), (self.limit, self.value, self.maximum)
+
+
+class RequestUsage:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes = 0
+        self.scratch_bytes = 0
+        self.frames = 0
+        self.audio_seconds = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def wall_seconds(self) -> float:
+        return time.perf_counter() - self.started
+
+    def fields(self) -> Dict[str, float]:
+        return {
+            "cpu_seconds": self.cpu_seconds,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "scratch_bytes": self.scratch_bytes,
+            "frames": self.frames,
+            "audio_seconds": self.audio_seconds,
+        }
+
+    def merge(self, fields: Dict[str, float]):
+        """분석 노드에서 잰 사용량을 더함 (RSS는 최대값)"""
+        with self._lock:
+            self.cpu_seconds += fields.get("cpu_seconds", 0.0)
+            self.peak_rss_bytes = max(self.peak_rss_bytes, fields.get("peak_rss_bytes", 0))
+            self.scratch_bytes += fields.get("scratch_bytes", 0)
+            self.frames += fields.get("frames", 0)
+            self.audio_seconds += fields.get("audio_seconds", 0.0)
+
+    def headers(self) -> Dict[str, str]:
+        return {
+            "X-Usage-Wall-Ms": str(round(self.wall_seconds * 1000)),
+            "X-Usage-CPU-Ms": str(round(self.cpu_seconds * 1000)),
+            "X-Usage-Peak-RSS-Bytes": str(self.peak_rss_bytes),
+            "X-Usage-Scratch-Bytes": str(self.scratch_bytes),
+            "X-Usage-Frames": str(self.frames),
+            "X-Usage-Audio-Seconds": f"{self.audio_seconds:.1f}",
+        }
+
+    def observe(self, route: str):
+        """요청이 끝날 때 라우트별 지표로 기록 (분석 작업이 없던 요청은 CPU/RSS 분포에서 제외)"""
+        if self.cpu_seconds:
+            REQUEST_CPU_SECONDS.labels(route).observe(self.cpu_seconds)
+            REQUEST_PEAK_RSS_BYTES.labels(route).observe(self.peak_rss_bytes)
+        if self.scratch_bytes:
+            REQUEST_SCRATCH_BYTES.labels(route).observe(self.scratch_bytes)
+        if self.frames:
+            REQUEST_FRAMES.labels(route).inc(self.frames)
+        if self.audio_seconds:
+            REQUEST_AUDIO_SECONDS.labels(route).inc(self.audio_seconds)
+
+
+current_usage: ContextVar[Optional[RequestUsage]] = ContextVar("current_usage", default=None)
+
+
+def _exceeded(limit: str, value: float, maximum: float):
+    REQUEST_LIMIT_EXCEEDED.labels(current_route.get(), limit).inc()
+    raise RequestLimitExceeded(limit, value, maximum)
+
+
+@contextmanager
+def measure():
+    """블록(분석 풀 스레드) 동안의 스레드 CPU 시간과 RSS 최대 증가량을 현재 요청에 더함"""
+    usage = current_usage.get()
+    if usage is None:
+        yield
+        return
+    cpu_started = time.thread_time()
+    rss_started = _process.memory_info().rss
+    peak = [rss_started]
+    stop = threading.Event()
+
+    def _sample():
+        while not stop.wait(_RSS_INTERVAL):
+            peak[0] = max(peak[0], _process.memory_info().rss)
+
+    sampler = threading.Thread(target=_sample, name="rss-sampler", daemon=True)
+    sampler.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        sampler.join()
+        peak[0] = max(peak[0], _process.memory_info().rss)
+        with usage._lock:
+            usage.cpu_seconds += time.thread_time() - cpu_started
+            usage.peak_rss_bytes = max(usage.peak_rss_bytes, peak[0] - rss_started)
+
+
+def add_cpu(usage: Optional[RequestUsage], seconds: float):
+    """다른 스레드(STT 배치 스레드 등)에서 이 요청 몫으로 쓴 CPU 시간을 더함"""
+    if usage is not None:
+        with usage._lock:
+            usage.cpu_seconds += seconds
+
+
+def run_process(cmd) -> int:
+    """외부 프로그램(ffmpeg 등)을 실행하고 그 프로세스가 쓴 CPU 시간(user+sys)을 현재 요청에 더함, 종료 코드 반환"""
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    # wait4: 이 자식 하나의 rusage (RUSAGE_CHILDREN은 동시에 도는 다른 요청의 자식까지 섞임)
+    _, status, rusage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    add_cpu(current_usage.get(), rusage.ru_utime + rusage.ru_stime)
+    return proc.returncode
+
+
+def check_video_seconds(seconds: float):
+    if REQUEST_MAX_VIDEO_SECONDS and seconds > REQUEST_MAX_VIDEO_SECONDS:
+        _exceeded("video_seconds", seconds, REQUEST_MAX_VIDEO_SECONDS)
+
+
+def check_frames(frames: int):
+    if REQUEST_MAX_FRAMES and frames > REQUEST_MAX_FRAMES:
+        _exceeded("frames", frames, REQUEST_MAX_FRAMES)
+
+
+def add_frames(frames: int):
+    usage = current_usage.get()
+    if usage is not None:
+        with usage._lock:
+            usage.frames += frames
+
+
+def check_audio_seconds(seconds: float):
+    if REQUEST_MAX_AUDIO_SECONDS and seconds > REQUEST_MAX_AUDIO_SECONDS:
+        _exceeded("audio_seconds", seconds, REQUEST_MAX_AUDIO_SECONDS)
+
+
+def add_audio_seconds(seconds: float):
+    """STT에 넣기 전에 호출: 상한을 넘으면 Whisper를 돌리지 않고 중단"""
+    check_audio_seconds(seconds)
+    usage = current_usage.get()
+    if usage is not None:
+        with usage._lock:
+            usage.audio_seconds += seconds
+
+
+def add_scratch_file(path: str):
+    """임시 작업 공간에 만들어진 파일 크기를 더함 (지우기 직전에 호출)"""
+    usage = current_usage.get()
+    if usage is not None and os.path.exists(path):
+        with usage._lock:
+            usage.scratch_bytes += os.path.getsize(path)
@@ -0,0 +1,126 @@
+# core/score_model.py
+# 잠정 점수 모델: GPT 피드백을 기다리는 동안 바로 보여줄 항목별 점수를 CPU에서 수 ms 안에 예측
+# - 입력: 답변 텍스트(글자 n-gram 해싱 + 길이/존댓말/사과 표현 등), 질문과의 겹침, 시선/고개/표정 신호
+# - 모델: Ridge 회귀 (6개 항목을 한 번에 예측), 학습 파일이 없으면 잠정 점수 없음
+# - 학습 데이터: GPT가 채점한 결과를 SCORE_LOG_PATH(JSONL)에 쌓아 두고 다시 학습
+#
+# 학습: python -m core.score_model train [data/score_log.jsonl]
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import SCORE_LOG_PATH, SCORE_MODEL_MIN_SAMPLES, SCORE_MODEL_PATH
+from core.model_registry import get_score_model
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+SCORE_CRITERIA = ("친절도", "문제해결능력", "소통능력", "전문성", "감정조절", "태도")
+
+_HASH_FEATURES = 2 ** 12
+_POLITE = re.compile(r"(습니다|세요|드리|드릴|드렸)")
+_APOLOGY = re.compile(r"(죄송|미안|양해|불편)")
+_GAZE = ("정면", "왼쪽", "오른쪽")
+_HEAD = ("안정적", "움직임 있음")
+_log_lock = threading.Lock()
+
+
+def _bigrams(text: str) -> set:
+    compact = re.sub(r"\s+", "", text)
+    return {compact[i:i + 2] for i in range(len(compact) - 1)}
+
+
+def _signal_features(question: str, answer: str, emotion: Dict) -> List[float]:
+    """텍스트 길이/표현 + 질문 겹침 + 시선/고개/표정 (n-gram 외의 수치 특징)"""
+    answer = answer.strip()
+    words = answer.split()
+    hangul = sum(1 for ch in answer if "가" <= ch <= "힣")
+    q, a = _bigrams(question), _bigrams(answer)
+    overlap = len(q & a) / len(q | a) if q and a else 0.0
+    gaze = emotion.get("gaze", "알 수 없음")
+    head = emotion.get("head", "알 수 없음")
+    yaw, pitch = emotion.get("yaw"), emotion.get("pitch")
+    emotions = emotion.get("emotions") or {}
+    return [
+        min(len(answer), 1000) / 1000,
+        min(len(words), 200) / 200,
+        hangul / len(answer) if answer else 0.0,
+        len(set(words)) / len(words) if words else 0.0,
+        len(_POLITE.findall(answer)) / max(1, len(words)),
+        float(bool(_APOLOGY.search(answer))),
+        overlap,
+        *[float(gaze == label) for label in _GAZE],
+        *[float(head == label) for label in _HEAD],
+        min(abs(yaw), 45) / 45 if yaw is not None else 0.0,
+        min(abs(pitch), 45) / 45 if pitch is not None else 0.0,
+        float(emotions.get("neutral", 0.0)),
+        float(emotions.get("happy", 0.0)),
+    ]
+
+
+def _vectorize(rows: List[Dict]):
+    from scipy.sparse import csr_matrix, hstack
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # 해싱이라 어휘 사전 학습이 필요 없음 → 학습/예측 모두 같은 변환
+    hasher = HashingVectorizer(analyzer="char_wb", ngram_range=(2, 3), n_features=_HASH_FEATURES, alternate_sign=False)
+    text = hasher.transform([row["answer"] for row in rows])
+    signals = csr_matrix([_signal_features(row["question"], row["answer"], row["emotion"]) for row in rows])
+    return hstack([text, signals]).tocsr()
+
+
+def predict_scores(question: str, answer: str, emotion: Dict) -> Optional[Dict[str, float]]:
+    """항목별 잠정 점수 (1~5, 0.1 단위), 학습된 모델이 없으면 None"""
+    model = get_score_model()
+    if model is None:
+        return None
+    features = _vectorize([{"question": question, "answer": answer, "emotion": emotion}])
+    predicted = model.predict(features)[0]
+    return {criterion: round(min(5.0, max(1.0, float(value))), 1) for criterion, value in zip(SCORE_CRITERIA, predicted)}
+
+
+def log_scored_answer(question: str, answer: str, emotion: Dict, scores: Dict[str, float]):
+    """GPT가 채점한 결과를 재학습용으로 기록 (점수 인식 실패(0점)가 섞인 결과는 제외)"""
+    if not scores or any(not scores.get(criterion) for criterion in SCORE_CRITERIA):
+        return
+    record = {
+        "question": question,
+        "answer": answer,
+        "emotion": {key: emotion.get(key) for key in ("gaze", "head", "yaw", "pitch", "emotions")},
+        "scores": {criterion: scores[criterion] for criterion in SCORE_CRITERIA},
+        "logged_at": time.time(),
+    }
+    with _log_lock:
+        os.makedirs(os.path.dirname(SCORE_LOG_PATH) or ".", exist_ok=True)
+        with open(SCORE_LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def train_score_model(records: Iterable[Dict], path: str = SCORE_MODEL_PATH):
+    """기록된 GPT 채점 결과로 Ridge 회귀를 학습해 저장"""
+    import joblib
+    import numpy as np
+    from sklearn.linear_model import Ridge
+
+    rows = list(records)
+    if len(rows) < SCORE_MODEL_MIN_SAMPLES:
+        raise ValueError(f"학습 샘플이 부족합니다: {len(rows)} < {SCORE_MODEL_MIN_SAMPLES}")
+    targets = np.array([[row["scores"][criterion] for criterion in SCORE_CRITERIA] for row in rows], dtype=float)
+    model = Ridge(alpha=1.0)
+    model.fit(_vectorize(rows), targets)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    joblib.dump(model, path)
+    logger.info("✅ 잠정 점수 모델 저장: %s (샘플 %s개)", path, len(rows))
+    return model
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3) or sys.argv[1] != "train":
+        sys.exit("사용법: python -m core.score_model train [score_log.jsonl]")
+    with open(sys.argv[2] if len(sys.argv) == 3 else SCORE_LOG_PATH, encoding="utf-8") as f:
+        train_score_model(json.loads(line) for line in f if line.strip())
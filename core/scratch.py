@@ -0,0 +1,152 @@
+# core/scratch.py
+# 작업용 임시 파일 관리
+# - 요청마다 전용 작업 디렉터리를 만들고, with 블록이 끝나면(예외가 나도) 통째로 삭제
+# - 예약 용량 합계가 SCRATCH_QUOTA_BYTES를 넘거나 파일시스템 여유가 부족하면 자리가 날 때까지 대기 (backpressure)
+#   SCRATCH_WAIT_SECONDS 안에 자리가 나지 않으면 ScratchQuotaError
+# - sweep(): 죽은 프로세스가 남긴 디렉터리, 오래된 디렉터리를 주기적으로 정리
+#
+#   with scratch.workspace(len(binary) * SCRATCH_VIDEO_EXPANSION) as ws:
+#       video_path = ws.write("input.mp4", binary)
+
+import os
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+from config.settings import (
+    SCRATCH_DIR,
+    SCRATCH_MIN_FREE_BYTES,
+    SCRATCH_ORPHAN_SECONDS,
+    SCRATCH_QUOTA_BYTES,
+    SCRATCH_WAIT_SECONDS,
+)
+from core.metrics import SCRATCH_RESERVED_BYTES, SCRATCH_SWEPT, SCRATCH_WAIT
+from core.request_usage import add_scratch_file
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+_PREFIX = "req-"
+
+
+class ScratchQuotaError(RuntimeError):
+    """임시 저장 공간이 부족해 요청을 받을 수 없음 (라우터에서 503으로 변환)"""
+
+
+class Workspace:
+    """요청 하나의 작업 디렉터리"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def file(self, name: str) -> str:
+        """작업 디렉터리 안의 경로 (클라이언트가 보낸 파일명은 확장자만 써야 함)"""
+        return os.path.join(self.path, os.path.basename(name))
+
+    def write(self, name: str, data: bytes) -> str:
+        path = self.file(name)
+        with open(path, "wb") as f:
+            f.write(data)
+        add_scratch_file(path)
+        return path
+
+
+class ScratchStorage:
+    def __init__(self, root: str = SCRATCH_DIR, quota_bytes: int = SCRATCH_QUOTA_BYTES,
+                 min_free_bytes: int = SCRATCH_MIN_FREE_BYTES):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.min_free_bytes = min_free_bytes
+        self._reserved = 0
+        self._active = set()
+        self._cond = threading.Condition()
+        os.makedirs(root, exist_ok=True)
+
+    def _has_room(self, nbytes: int) -> bool:
+        if self._reserved and self._reserved + nbytes > self.quota_bytes:
+            return False  # 요청 하나가 할당량보다 커도 혼자일 때는 허용
+        # 다른 워커 프로세스가 쓰는 용량까지 반영되도록 실제 파일시스템 여유도 확인
+        return shutil.disk_usage(self.root).free - nbytes >= self.min_free_bytes
+
+    def _reserve(self, nbytes: int, timeout: float):
+        started = time.perf_counter()
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._has_room(nbytes):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise ScratchQuotaError(
+                        f"임시 저장 공간 부족: 요청 {nbytes / 2**20:.0f}MB, 사용 중 {self._reserved / 2**20:.0f}MB"
+                    )
+                # 다른 워커가 공간을 비운 것은 알림이 오지 않으므로 주기적으로 다시 확인
+                self._cond.wait(min(remaining, 1.0))
+            self._reserved += nbytes
+            SCRATCH_RESERVED_BYTES.set(self._reserved)
+        SCRATCH_WAIT.observe(time.perf_counter() - started)
+
+    def _release(self, nbytes: int):
+        with self._cond:
+            self._reserved -= nbytes
+            SCRATCH_RESERVED_BYTES.set(self._reserved)
+            self._cond.notify_all()
+
+    @contextmanager
+    def workspace(self, reserve_bytes: float = 0, timeout: float = SCRATCH_WAIT_SECONDS) -> Iterator[Workspace]:
+        """용량을 예약하고 작업 디렉터리를 만들어 넘김, 블록이 끝나면 삭제 + 예약 해제"""
+        nbytes = int(reserve_bytes)
+        self._reserve(nbytes, timeout)
+        # 디렉터리 이름에 pid를 넣어 두면 워커가 죽어서 남긴 디렉터리를 sweep()에서 바로 알아볼 수 있음
+        path = os.path.join(self.root, f"{_PREFIX}{os.getpid()}-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(path)
+            self._active.add(path)
+            yield Workspace(path)
+        finally:
+            self._active.discard(path)
+            shutil.rmtree(path, ignore_errors=True)
+            self._release(nbytes)
+
+    def sweep(self, max_age: float = SCRATCH_ORPHAN_SECONDS) -> int:
+        """남아 있는 작업 디렉터리 정리: 만든 프로세스가 없거나, 사용 중이 아닌데 max_age보다 오래된 것"""
+        removed = 0
+        now = time.time()
+        try:
+            entries = list(os.scandir(self.root))
+        except FileNotFoundError:
+            os.makedirs(self.root, exist_ok=True)
+            return 0
+        for entry in entries:
+            if not entry.name.startswith(_PREFIX) or entry.path in self._active:
+                continue
+            try:
+                age = now - entry.stat().st_mtime
+            except FileNotFoundError:
+                continue  # 방금 정상 삭제됨
+            if _owner_alive(entry.name) and age < max_age:
+                continue
+            shutil.rmtree(entry.path, ignore_errors=True)
+            removed += 1
+        if removed:
+            SCRATCH_SWEPT.inc(removed)
+            logger.warning("🧹 남아 있던 임시 작업 디렉터리 %s개 정리", removed)
+        return removed
+
+
+def _owner_alive(dirname: str) -> bool:
+    try:
+        pid = int(dirname[len(_PREFIX):].split("-", 1)[0])
+    except ValueError:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+scratch = ScratchStorage()
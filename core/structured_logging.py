@@ -0,0 +1,115 @@
+# core/structured_logging.py
+# 큐 기반 구조화(JSON) 로깅
+# - 핸들러 스레드에서는 레코드를 큐에 넣기만 하고, 실제 stdout 쓰기는 별도 리스너 스레드가 담당
+# - 요청 ID / 라우트를 모든 로그에 자동으로 붙임
+# - 레벨별 샘플링, 긴 값(메뉴얼, GPT 응답 등) 잘라내기
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+
+from config.settings import LOG_LEVEL, LOG_QUEUE_SIZE, LOG_MAX_FIELD_CHARS, LOG_SAMPLE_RATES
+from core.metrics import LOG_RECORDS_DROPPED, current_route
+
+request_id: ContextVar[str] = ContextVar("request_id", default="-")
+
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "request_id", "route"}
+_listener = None
+
+
+def truncate(value, limit: int = LOG_MAX_FIELD_CHARS) -> str:
+    """긴 값은 앞부분만 남기고 원래 길이를 표시"""
+    text = value if isinstance(value, str) else str(value)
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}…(+{len(text) - limit}자)"
+
+
+class _ContextFilter(logging.Filter):
+    """호출 스레드에서 요청 컨텍스트를 레코드에 복사하고 레벨별 샘플링"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = LOG_SAMPLE_RATES.get(record.levelname, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return False
+        record.request_id = request_id.get()
+        record.route = current_route.get()
+        return True
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 버림 (로그 때문에 요청이 막히지 않도록), 버린 수는 지표로 남김"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 무거운 JSON 직렬화는 리스너 스레드에서, 여기서는 메시지 합치기+자르기만
+        record.msg = truncate(record.getMessage())
+        record.args = None
+        record.exc_text = logging.Formatter().formatException(record.exc_info) if record.exc_info else None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.labels(record.levelname).inc()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)) + f".{int(record.msecs):03d}",
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "route": getattr(record, "route", "-"),
+            "msg": record.getMessage(),
+        }
+        # logger.info("...", extra={"manual_id": 3}) 형태의 추가 필드
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS:
+                payload[key] = value if isinstance(value, (int, float, bool)) or value is None else truncate(value)
+        if record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def _start_listener(queue_handler: logging.handlers.QueueHandler, stream_handler: logging.Handler):
+    global _listener
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler.queue = log_queue
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+
+
+def setup_logging():
+    """루트 로거를 큐 핸들러로 교체하고 리스너 스레드 시작 (여러 번 호출해도 1번만 적용)"""
+    if _listener is not None:
+        return
+
+    queue_handler = _NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+    queue_handler.addFilter(_ContextFilter())
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(LOG_LEVEL)
+
+    _start_listener(queue_handler, stream_handler)
+    atexit.register(lambda: _listener.stop())
+
+    # fork된 워커(serve.py)에는 리스너 스레드가 복제되지 않으므로 새 큐/리스너로 다시 시작
+    os.register_at_fork(after_in_child=lambda: _start_listener(queue_handler, stream_handler))
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(name)
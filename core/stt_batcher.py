@@ -0,0 +1,187 @@
+# core/stt_batcher.py
+# 요청 간 STT 동적 배칭
+# - 동시에 들어온 요청들의 오디오를 STT_BATCH_MAX_WAIT_SECONDS 동안 모아 한 번의 Whisper 배치 추론으로 처리
+#   (요청마다 따로 transcribe하면 여러 스레드가 같은 코어를 두고 경쟁 → 과다 구독)
+# - 요청마다 VAD(silero)로 발화 구간(최대 30초)을 나누고, 모인 요청들의 구간을 faster-whisper
+#   BatchedInferencePipeline에 clip_timestamps로 넘김 → 구간끼리는 서로 독립적으로 디코딩되므로
+#   같은 오디오는 혼자 처리되든 다른 요청과 묶이든 결과가 같다 (요청 하나뿐일 때도 같은 경로)
+# - 한 배치의 발화 구간 수는 STT_BATCH_MAX_SIZE 이하
+# - 추론은 전용 스레드 하나에서만 실행, 배치의 CPU 시간은 구간 수 비율로 각 요청 사용량에 나눠 더하고
+#   프로파일링 중인 요청이 있으면 추론 동안 이 스레드도 그 요청 프로파일에 포함
+#
+#   text = stt_batcher.transcribe(audio)   # 16kHz mono float32, 분석 풀 스레드에서 호출 (결과가 나올 때까지 대기)
+
+import os
+import threading
+import time
+from bisect import bisect_right
+from collections import deque
+from contextlib import ExitStack
+from typing import Callable, Deque, List, Optional
+
+import numpy as np
+
+from config.settings import (
+    STT_BATCH_MAX_SIZE,
+    STT_BATCH_MAX_WAIT_SECONDS,
+    STT_BATCH_TIMEOUT_SECONDS,
+    STT_BATCHING_ENABLED,
+)
+from core import profiler, request_usage
+from core.metrics import STT_BATCH_REQUESTS
+from core.model_registry import get_stt_model
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+_SAMPLE_RATE = 16000
+_HOP = 160  # mel 프레임 하나의 샘플 수 (요청 경계를 프레임 단위로 맞춤)
+_LANGUAGE = "ko"
+
+
+class SttTimeoutError(RuntimeError):
+    """STT_BATCH_TIMEOUT_SECONDS 안에 배치 스레드가 결과를 내지 못함"""
+
+
+def _speech_clips(audio: np.ndarray) -> List[dict]:
+    """VAD 발화 구간 (BatchedInferencePipeline 기본값과 같은 옵션), 샘플 단위 start/end"""
+    from faster_whisper.vad import VadOptions, get_speech_timestamps, merge_segments
+
+    options = VadOptions(max_speech_duration_s=30, min_silence_duration_ms=160)
+    return [{"start": c["start"], "end": c["end"]} for c in merge_segments(get_speech_timestamps(audio, options), options)]
+
+
+class _Pending:
+    def __init__(self, audio: np.ndarray):
+        # VAD는 호출한 분석 풀 스레드에서 실행 (요청 CPU로 잡히고 배치 스레드를 붙잡지 않음)
+        self.audio = audio
+        self.clips = _speech_clips(audio)
+        self.usage = request_usage.current_usage.get()
+        self.profile = profiler.current_profile.get()
+        self.text: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self.abandoned = False
+        self.done = threading.Event()
+
+
+def _transcribe_batch(pipeline, batch: List[_Pending], batch_size: int):
+    """요청들의 오디오를 이어 붙이고 발화 구간만 clip_timestamps로 넘겨 한 번에 변환, 요청별로 결과를 나눔"""
+    audios, clips, offsets = [], [], []
+    offset = 0
+    for pending in batch:
+        padded = np.pad(pending.audio, (0, -len(pending.audio) % _HOP))  # 요청 경계를 프레임 경계에 맞춤
+        offsets.append(offset)
+        audios.append(padded)
+        clips.extend({"start": c["start"] + offset, "end": c["end"] + offset} for c in pending.clips)
+        offset += len(padded)
+
+    texts = [[] for _ in batch]
+    if clips:
+        segments, _ = pipeline.transcribe(
+            np.concatenate(audios), language=_LANGUAGE, clip_timestamps=clips, batch_size=batch_size,
+        )
+        for segment in segments:
+            # seek = 구간 시작 mel 프레임 → 어느 요청의 구간인지
+            texts[bisect_right(offsets, segment.seek * _HOP) - 1].append(segment.text.strip())
+    for pending, parts in zip(batch, texts):
+        pending.text = " ".join(part for part in parts if part)
+
+
+class SttBatcher:
+    def __init__(self, model_loader: Callable = get_stt_model, max_size: int = STT_BATCH_MAX_SIZE,
+                 max_wait: float = STT_BATCH_MAX_WAIT_SECONDS, timeout: float = STT_BATCH_TIMEOUT_SECONDS,
+                 enabled: bool = STT_BATCHING_ENABLED):
+        self.model_loader = model_loader
+        self.max_size = max_size
+        self.max_wait = max_wait
+        self.timeout = timeout
+        self.enabled = enabled and max_size > 1
+        self._pipeline = None
+        self._queue: Deque[_Pending] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._pid = None
+
+    def _get_pipeline(self):
+        if self._pipeline is None:
+            from faster_whisper import BatchedInferencePipeline
+            self._pipeline = BatchedInferencePipeline(self.model_loader())
+        return self._pipeline
+
+    def transcribe(self, audio: np.ndarray) -> str:
+        pending = _Pending(audio)
+        if not self.enabled:
+            # 배칭을 꺼도 같은 경로(VAD 구간 + 배치 파이프라인)로 처리해 결과가 달라지지 않게
+            _transcribe_batch(self._get_pipeline(), [pending], self.max_size)
+            return pending.text
+        with self._cond:
+            self._ensure_thread()
+            self._queue.append(pending)
+            self._cond.notify()
+        if not pending.done.wait(self.timeout):
+            with self._cond:
+                pending.abandoned = True
+                if pending in self._queue:
+                    self._queue.remove(pending)
+            raise SttTimeoutError(f"STT가 {self.timeout:.0f}초 안에 끝나지 않음")
+        if pending.error is not None:
+            raise pending.error
+        return pending.text
+
+    def _ensure_thread(self):
+        # preload 후 fork한 워커에는 부모의 스레드가 없으므로 프로세스마다 새로 시작
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="stt-batcher", daemon=True)
+            self._thread.start()
+
+    def _take_batch(self) -> List[_Pending]:
+        """첫 요청이 온 뒤 max_wait 동안(또는 구간 수가 max_size에 찰 때까지) 모아서 꺼냄"""
+        with self._cond:
+            while not self._queue:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while sum(len(p.clips) for p in self._queue) < self.max_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = [self._queue.popleft()]
+            clips = len(batch[0].clips)
+            while self._queue and clips + len(self._queue[0].clips) <= self.max_size:
+                clips += len(self._queue[0].clips)
+                batch.append(self._queue.popleft())
+            return batch
+
+    def _run(self):
+        while True:
+            batch = [pending for pending in self._take_batch() if not pending.abandoned]
+            if not batch:
+                continue
+            STT_BATCH_REQUESTS.observe(len(batch))
+            cpu_started = time.thread_time()
+            try:
+                with ExitStack() as stack:
+                    for pending in batch:
+                        if pending.profile is not None:
+                            stack.enter_context(pending.profile.attach("stt-batch"))
+                    _transcribe_batch(self._get_pipeline(), batch, self.max_size)
+            except Exception as e:
+                logger.warning("STT 배치 처리 실패 (%d건): %s", len(batch), e)
+                for pending in batch:
+                    pending.error = e
+            finally:
+                self._charge_cpu(batch, time.thread_time() - cpu_started)
+                for pending in batch:
+                    pending.done.set()
+
+    @staticmethod
+    def _charge_cpu(batch: List[_Pending], cpu_seconds: float):
+        """배치 CPU 시간을 발화 구간 수 비율로 나눠 각 요청 사용량에 더함 (구간이 없으면 균등)"""
+        total = sum(len(pending.clips) for pending in batch)
+        for pending in batch:
+            share = len(pending.clips) / total if total else 1 / len(batch)
+            request_usage.add_cpu(pending.usage, cpu_seconds * share)
+
+
+stt_batcher = SttBatcher()
@@ -0,0 +1,106 @@
+# core/token_budget.py
+# GPT 호출 지점(route)별 토큰 예산
+# - 보내기 전에 tiktoken으로 프롬프트 토큰 수를 측정
+# - 입력 예산을 넘으면 정해 둔 순서대로(예: 매뉴얼 → 평가 기준 → 답변) 가변 부분의 뒤쪽을 잘라냄
+# - 출력 예산은 max_tokens로 강제 (gpt_gateway에서 적용)
+#
+#   parts = fit_parts("feedback", build_prompt, {"manual": manual, "answer": answer}, trim_order=["manual", "answer"])
+#   prompt = build_prompt(**parts)
+
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence
+
+from config.settings import GPT_DEFAULT_TOKEN_BUDGET, GPT_ROUTE_TOKEN_BUDGETS
+from core.metrics import GPT_PROMPT_TOKENS, GPT_TRUNCATED_TOKENS
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+TRUNCATION_MARKER = "\n...(이하 생략)"
+_MESSAGE_OVERHEAD = 4  # 메시지마다 role/구분자에 붙는 토큰
+_REPLY_OVERHEAD = 3
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: Optional[str] = None):
+    import tiktoken  # import와 BPE 파일 로드가 무거워 처음 쓸 때 로드
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    return len(_encoding(model).encode(text or "", disallowed_special=()))
+
+
+def count_message_tokens(messages: List[dict], model: Optional[str] = None) -> int:
+    """chat 형식 메시지 전체의 입력 토큰 수 (역할/구분자 오버헤드 포함 근사치)"""
+    return _REPLY_OVERHEAD + sum(
+        _MESSAGE_OVERHEAD + count_tokens(message.get("content") or "", model) for message in messages
+    )
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+    """앞에서부터 max_tokens 토큰만 남기고 자른 뒤 생략 표시를 붙임"""
+    encoding = _encoding(model)
+    tokens = encoding.encode(text or "", disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    keep = max(0, max_tokens - count_tokens(TRUNCATION_MARKER, model))
+    return encoding.decode(tokens[:keep]) + TRUNCATION_MARKER
+
+
+def fit_messages(route: str, messages: List[dict], model: Optional[str] = None) -> List[dict]:
+    """호출 지점에서 맞추지 않은 경우를 위한 안전장치: 예산을 넘으면 마지막 user 메시지 뒤쪽을 잘라냄"""
+    limit = input_budget(route)
+    total = count_message_tokens(messages, model)
+    if total <= limit:
+        return messages
+    for i in range(len(messages) - 1, -1, -1):
+        if messages[i].get("role") == "user":
+            content = messages[i].get("content") or ""
+            keep = max(0, count_tokens(content, model) - (total - limit))
+            GPT_TRUNCATED_TOKENS.labels(route, "message").inc(total - limit)
+            logger.warning("⚠️ %s 메시지가 입력 예산 초과 (%s > %s 토큰) - 마지막 user 메시지를 잘라냄", route, total, limit)
+            return messages[:i] + [{**messages[i], "content": truncate_tokens(content, keep, model)}] + messages[i + 1:]
+    return messages
+
+
+def input_budget(route: str) -> int:
+    return int(GPT_ROUTE_TOKEN_BUDGETS.get(route, {}).get("input", GPT_DEFAULT_TOKEN_BUDGET["input"]))
+
+
+def output_budget(route: str) -> int:
+    return int(GPT_ROUTE_TOKEN_BUDGETS.get(route, {}).get("output", GPT_DEFAULT_TOKEN_BUDGET["output"]))
+
+
+def fit_parts(route: str, build: Callable[..., str], parts: Dict[str, str], trim_order: Sequence[str],
+              model: Optional[str] = None) -> Dict[str, str]:
+    """build(**parts)가 route의 입력 예산 안에 들도록 trim_order 앞쪽 부분부터 잘라낸 parts 반환"""
+    limit = input_budget(route)
+    total = count_tokens(build(**parts), model)
+    GPT_PROMPT_TOKENS.labels(route).observe(total)
+    if total <= limit:
+        return parts
+
+    fitted = dict(parts)
+    for name in trim_order:
+        over = total - limit
+        if over <= 0:
+            break
+        current = count_tokens(fitted[name], model)
+        if current == 0:
+            continue
+        fitted[name] = truncate_tokens(fitted[name], max(0, current - over), model)
+        new_total = count_tokens(build(**fitted), model)
+        GPT_TRUNCATED_TOKENS.labels(route, name).inc(max(0, total - new_total))
+        total = new_total
+
+    if total > limit:
+        logger.warning("⚠️ %s 프롬프트가 잘라낸 뒤에도 입력 예산 초과: %s > %s 토큰", route, total, limit)
+    else:
+        logger.info("✂️ %s 프롬프트를 입력 예산(%s 토큰)에 맞춰 잘라냄", route, limit)
+    return fitted
@@ -0,0 +1,67 @@
+# core/video_frames.py
+# 공용 영상 디코더: 한 번 디코딩하면서 일정 간격으로 프레임을 샘플링하고 축소해서 넘겨줌
+# (시선/고개 분석, 감정 분석 등이 같은 프레임을 나눠 쓰도록)
+
+from typing import Iterator, List, NamedTuple
+
+import cv2
+import numpy as np
+
+from core.request_usage import add_frames, check_frames, check_video_seconds
+
+
+class SampledFrame(NamedTuple):
+    index: int  # 원본 프레임 번호
+    timestamp: float  # 초
+    image: np.ndarray  # BGR, 축소된 프레임
+
+
+def _resize(frame: np.ndarray, max_width: int) -> np.ndarray:
+    h, w = frame.shape[:2]
+    if not max_width or w <= max_width:
+        return frame
+    scale = max_width / w
+    return cv2.resize(frame, (max_width, int(h * scale)), interpolation=cv2.INTER_AREA)
+
+
+def iter_sampled_frames(video_path: str, sample_fps: float, max_width: int = 640) -> Iterator[SampledFrame]:
+    """sample_fps 간격으로 프레임을 뽑아 가로 max_width 이하로 축소 (sample_fps<=0 이면 전체 프레임)"""
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    if not fps or fps > 240:  # webm 등 메타데이터가 없거나 이상한 경우
+        fps = 30.0
+    frame_count = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+    if frame_count and frame_count > 0:
+        check_video_seconds(frame_count / fps)  # 메타데이터로 먼저 확인 (없으면 디코딩하면서 확인)
+    interval = 1.0 / sample_fps if sample_fps > 0 else 0.0
+    next_t = 0.0
+    index = 0
+    try:
+        while True:
+            # 건너뛸 프레임은 grab()만 해서 BGR 변환/복사 비용을 줄임
+            if not cap.grab():
+                break
+            timestamp = index / fps
+            check_video_seconds(timestamp)
+            check_frames(index + 1)
+            if timestamp + 1e-6 >= next_t:
+                ok, frame = cap.retrieve()
+                if not ok:
+                    break
+                yield SampledFrame(index, timestamp, _resize(frame, max_width))
+                next_t += interval
+            index += 1
+    finally:
+        cap.release()
+        add_frames(index)
+
+
+def batched(frames: Iterator[SampledFrame], batch_size: int) -> Iterator[List[SampledFrame]]:
+    batch = []
+    for frame in frames:
+        batch.append(frame)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
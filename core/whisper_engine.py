@@ -1,23 +1,62 @@
-from faster_whisper import WhisperModel
-import tempfile
-import os
+import io
+from typing import Optional
+
+from core.metrics import stage_timer
+from core.model_registry import get_whisper_engine_model
+from core.request_usage import add_audio_seconds
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000  # Whisper 입력 샘플레이트
+
+
+def probe_duration(source) -> Optional[float]:
+    """디코딩 없이 컨테이너 메타데이터로 길이(초)를 읽음 (bytes 또는 파일 경로, 알 수 없으면 None)"""
+    import av
+
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    try:
+        with av.open(source, metadata_errors="ignore") as container:
+            if container.duration is not None:
+                return container.duration / av.time_base
+            stream = next(iter(container.streams.audio), None)
+            if stream is not None and stream.duration is not None and stream.time_base is not None:
+                return float(stream.duration * stream.time_base)
+    except Exception as e:
+        logger.debug("길이 확인 실패: %s", e)
+    return None
+
+
+def decode_audio_bytes(binary: bytes):
+    """압축 오디오(opus/webm/mp3/m4a/wav 등)를 임시 파일 없이 메모리에서 16kHz mono float32 배열로 디코딩"""
+    from faster_whisper.audio import decode_audio  # PyAV 기반, 컨테이너 형식은 내용으로 판별
+
+    with stage_timer("audio_decode"):
+        return decode_audio(io.BytesIO(binary), sampling_rate=SAMPLE_RATE)
+
+
+def decode_audio_file(path: str):
+    from faster_whisper.audio import decode_audio
+
+    with stage_timer("audio_decode"):
+        return decode_audio(path, sampling_rate=SAMPLE_RATE)
+
+
+def transcribe_array(audio, model=None) -> str:
+    """디코딩된 16kHz 배열을 바로 Whisper에 넣어 텍스트로 변환"""
+    add_audio_seconds(len(audio) / SAMPLE_RATE)
+    model = model or get_whisper_engine_model()
+    with stage_timer("whisper"):
+        segments, _ = model.transcribe(audio, language="ko")
+        return " ".join([seg.text for seg in segments])
 
-# 모델 로드 (CPU: compute_type="int8", GPU: "float16" 또는 "int8_float16")
-model = WhisperModel("small", device="cpu", compute_type="int8")
 
 def transcribe_audio(binary: bytes, filename: str = "audio.mp3") -> str:
-    ext = os.path.splitext(filename)[-1] or ".mp3"
-
-    with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as temp_file:
-        temp_file.write(binary)
-        temp_file.flush()
-
-        try:
-            segments, _ = model.transcribe(temp_file.name, language="ko")
-            text = " ".join([seg.text for seg in segments])
-            return text
-        except Exception as e:
-            print(f"STT 실패: {e}")
-            return "[오류: STT 실패]"
-        finally:
-            os.remove(temp_file.name)
+    # filename은 호환용 (형식은 파일 내용으로 판별하므로 확장자가 필요 없음)
+    try:
+        return transcribe_array(decode_audio_bytes(binary))
+    except Exception as e:
+        logger.warning("STT 실패 (%s): %s", filename, e)
+        return "[오류: STT 실패]"
@@ -0,0 +1,398 @@
+# core/work_broker.py
+# 분석 작업 프로토콜: API 노드는 작업을 넣고, 분석 노드가 가져가서 실행
+# - 작업 = 등록된 분석 함수 이름 + 인자 (@analysis_task로 등록, 인자/결과는 pickle → 내부망 전용)
+# - 브로커 (ANALYSIS_BROKER):
+#     local    : 브로커 없이 지금처럼 API 프로세스의 분석 풀에서 실행 (기본값)
+#     inprocess: 같은 프로세스 안의 큐 + 분석 노드 스레드 (프로토콜 테스트용)
+#     sqlite   : 파일 하나(WAL)를 공유하는 큐, 같은 장비의 analysis_worker.py 프로세스들이 가져감
+# - 분석 노드는 작업마다 자원 사용량(CPU/RSS/프레임 등)을 재서 결과와 함께 돌려주고,
+#   API 노드가 요청 사용량에 합친다. 상한 초과(RequestLimitExceeded)도 그대로 전달된다.
+# - sqlite: 분석 노드는 실행 중인 작업의 임대(lease)를 주기적으로 연장(heartbeat)하고,
+#   ANALYSIS_JOB_LEASE_SECONDS 동안 연장이 없으면 노드가 죽었다고 보고 다시 대기열로
+#   (다른 노드가 다시 가져간 뒤 원래 노드가 늦게 끝내도 그 결과는 무시 → 결과는 작업당 한 번만)
+# - sqlite: 분석 노드가 ANALYSIS_JOB_RETENTION_SECONDS보다 오래된 작업을 주기적으로 지움
+#   (API 노드가 결과를 가져가기 전에 죽으면 done 행이 영영 남으므로)
+# - pickle payload를 실행하므로 DB 파일에 쓸 수 있으면 분석 노드에서 코드를 실행할 수 있다 →
+#   SqliteBroker는 로컬 파일시스템 + 현재 사용자 소유 + 다른 사용자가 쓸 수 없는 경로만 허용
+#
+#   @analysis_task
+#   def analyze_video_all(binary, emotion=None): ...
+#
+#   job_id = broker.submit("analyze_video_all", encode({"args": (binary, None), "context": {...}}))
+
+import os
+import pickle
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from contextvars import copy_context
+from typing import Callable, Deque, Dict, NamedTuple, Optional
+
+from config.settings import (
+    ANALYSIS_BROKER,
+    ANALYSIS_BROKER_POLL_SECONDS,
+    ANALYSIS_BROKER_SQLITE_PATH,
+    ANALYSIS_JOB_LEASE_SECONDS,
+    ANALYSIS_JOB_RETENTION_SECONDS,
+    ANALYSIS_NODE_THREADS,
+)
+from core import request_usage
+from core.fair_scheduler import current_tenant
+from core.metrics import TASKS_IN_FLIGHT, current_route
+from core.structured_logging import get_logger, request_id
+
+logger = get_logger(__name__)
+
+TASKS: Dict[str, Callable] = {}
+
+
+def analysis_task(fn: Callable) -> Callable:
+    """분석 노드에서 실행할 수 있는 함수로 등록 (이름 = 함수 이름)"""
+    TASKS[fn.__name__] = fn
+    fn.task_name = fn.__name__
+    return fn
+
+
+class AnalysisJobError(RuntimeError):
+    """분석 노드에서 실패했지만 원래 예외를 그대로 전달할 수 없는 경우"""
+
+
+class AnalysisTimeoutError(AnalysisJobError):
+    """ANALYSIS_JOB_TIMEOUT_SECONDS 안에 분석 노드가 결과를 내지 못함 (라우터에서 503으로 변환)"""
+
+
+class Job(NamedTuple):
+    job_id: str
+    task: str
+    payload: bytes
+
+
+def encode(obj) -> bytes:
+    return pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def decode(data: bytes):
+    return pickle.loads(data)
+
+
+# ---------- 브로커 ----------
+class Broker(ABC):
+    """submit/result/cancel은 API 노드, claim/complete는 분석 노드가 호출"""
+
+    @abstractmethod
+    def submit(self, task: str, payload: bytes) -> str:
+        ...
+
+    @abstractmethod
+    def claim(self, node: str, timeout: float) -> Optional[Job]:
+        """대기 중인 작업 하나를 가져감 (timeout 동안 없으면 None)"""
+
+    def heartbeat(self, node: str, job_ids):
+        """node가 실행 중인 작업들의 임대 연장 (임대가 없는 브로커는 아무것도 하지 않음)"""
+
+    def purge(self, max_age: float) -> int:
+        """max_age보다 오래된 작업을 지우고 지운 수 반환 (프로세스와 함께 사라지는 브로커는 아무것도 하지 않음)"""
+        return 0
+
+    @abstractmethod
+    def complete(self, job_id: str, node: str, outcome: bytes):
+        """node가 지금도 이 작업을 맡고 있을 때만 결과 저장 (취소/재할당된 작업이면 버림)"""
+
+    @abstractmethod
+    def result(self, job_id: str) -> Optional[bytes]:
+        """끝난 작업의 결과를 꺼내고 지움, 아직이면 None"""
+
+    @abstractmethod
+    def cancel(self, job_id: str):
+        """결과를 더 기다리지 않음 (대기 중이면 실행하지 않음)"""
+
+
+class InProcessBroker(Broker):
+    def __init__(self):
+        self._queue: Deque[Job] = deque()
+        self._outcomes: Dict[str, bytes] = {}
+        self._cancelled = set()
+        self._cond = threading.Condition()
+
+    def submit(self, task: str, payload: bytes) -> str:
+        job = Job(uuid.uuid4().hex, task, payload)
+        with self._cond:
+            self._queue.append(job)
+            self._cond.notify()
+        return job.job_id
+
+    def claim(self, node: str, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._queue:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+            return self._queue.popleft()
+
+    def complete(self, job_id: str, node: str, outcome: bytes):
+        with self._cond:
+            if job_id in self._cancelled:
+                self._cancelled.discard(job_id)
+                return
+            self._outcomes[job_id] = outcome
+
+    def result(self, job_id: str) -> Optional[bytes]:
+        with self._cond:
+            return self._outcomes.pop(job_id, None)
+
+    def cancel(self, job_id: str):
+        with self._cond:
+            queued = [job for job in self._queue if job.job_id == job_id]
+            if queued:
+                self._queue.remove(queued[0])
+            elif self._outcomes.pop(job_id, None) is None:
+                self._cancelled.add(job_id)  # 실행 중 → 끝나면 결과를 버림
+
+
+_NETWORK_FILESYSTEMS = {"nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs", "fuse.sshfs"}
+
+
+def _filesystem_type(path: str) -> Optional[str]:
+    """path가 속한 마운트의 파일시스템 종류 (/proc/mounts가 없으면 None)"""
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = [line.split()[1:3] for line in f]
+    except OSError:
+        return None
+    best, fstype = "", None
+    for point, kind in mounts:
+        point = point.replace("\\040", " ")
+        inside = path == point or path.startswith(point.rstrip("/") + "/")
+        if inside and len(point) >= len(best):
+            best, fstype = point, kind
+    return fstype
+
+
+def _check_local_path(path: str):
+    """pickle을 주고받는 DB이므로 다른 장비/사용자가 쓸 수 있는 경로는 거부"""
+    if "://" in path or path.startswith("file:") or path.startswith("//") or path.startswith("\\\\"):
+        raise ValueError(f"sqlite 브로커는 로컬 파일 경로만 허용합니다: {path}")
+    directory = os.path.realpath(os.path.dirname(path) or ".")
+    fstype = _filesystem_type(directory)
+    if fstype in _NETWORK_FILESYSTEMS:
+        raise ValueError(f"sqlite 브로커 경로가 네트워크 파일시스템({fstype})에 있습니다: {directory}")
+    for target in (directory, os.path.realpath(path)):
+        if not os.path.exists(target):
+            continue
+        st = os.stat(target)
+        if st.st_uid != os.getuid():
+            raise ValueError(f"sqlite 브로커 경로의 소유자가 현재 사용자가 아닙니다: {target}")
+        if st.st_mode & 0o022:
+            raise ValueError(f"sqlite 브로커 경로를 다른 사용자가 쓸 수 있습니다: {target}")
+
+
+class SqliteBroker(Broker):
+    def __init__(self, path: str = ANALYSIS_BROKER_SQLITE_PATH, lease_seconds: float = ANALYSIS_JOB_LEASE_SECONDS,
+                 poll_seconds: float = ANALYSIS_BROKER_POLL_SECONDS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+        _check_local_path(path)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY, task TEXT NOT NULL, payload BLOB NOT NULL, status TEXT NOT NULL,"
+            " outcome BLOB, node TEXT, created_at REAL NOT NULL, claimed_at REAL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+    def _conn(self) -> sqlite3.Connection:
+        # 연결은 스레드마다, fork된 프로세스에서는 새로 (sqlite 연결은 프로세스/스레드 간 공유 불가)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def submit(self, task: str, payload: bytes) -> str:
+        job_id = uuid.uuid4().hex
+        self._conn().execute(
+            "INSERT INTO jobs (id, task, payload, status, created_at) VALUES (?, ?, ?, 'queued', ?)",
+            (job_id, task, payload, time.time()),
+        )
+        return job_id
+
+    def _claim_once(self, node: str) -> Optional[Job]:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")  # 노드끼리 같은 작업을 가져가지 않도록 쓰기 잠금
+        try:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', node = NULL WHERE status = 'running' AND claimed_at < ?",
+                (now - self.lease_seconds,),
+            )
+            row = conn.execute(
+                "SELECT id, task, payload FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', node = ?, claimed_at = ? WHERE id = ?", (node, now, row[0])
+                )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return Job(*row) if row is not None else None
+
+    def claim(self, node: str, timeout: float) -> Optional[Job]:
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self._claim_once(node)
+            if job is not None or time.monotonic() >= deadline:
+                return job
+            time.sleep(self.poll_seconds)
+
+    def heartbeat(self, node: str, job_ids):
+        self._conn().executemany(
+            "UPDATE jobs SET claimed_at = ? WHERE id = ? AND node = ? AND status = 'running'",
+            [(time.time(), job_id, node) for job_id in job_ids],
+        )
+
+    def complete(self, job_id: str, node: str, outcome: bytes):
+        # 취소되어 지워졌거나 임대가 끝나 다른 노드가 가져간 작업이면 아무 행도 바뀌지 않음
+        updated = self._conn().execute(
+            "UPDATE jobs SET status = 'done', outcome = ?, payload = x'' WHERE id = ? AND node = ? AND status = 'running'",
+            (outcome, job_id, node),
+        ).rowcount
+        if not updated:
+            logger.warning("작업 결과 무시 (취소되었거나 다른 노드에 재할당됨): %s", job_id)
+
+    def result(self, job_id: str) -> Optional[bytes]:
+        conn = self._conn()
+        row = conn.execute("SELECT outcome FROM jobs WHERE id = ? AND status = 'done'", (job_id,)).fetchone()
+        if row is None:
+            return None
+        conn.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        return row[0]
+
+    def cancel(self, job_id: str):
+        self._conn().execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+
+    def purge(self, max_age: float) -> int:
+        # API 노드는 ANALYSIS_JOB_TIMEOUT_SECONDS까지만 기다리므로 그보다 오래된 작업은 상태와 관계없이 가져갈 곳이 없음
+        return self._conn().execute("DELETE FROM jobs WHERE created_at < ?", (time.time() - max_age,)).rowcount
+
+
+# ---------- 분석 노드 ----------
+class AnalysisNode:
+    """브로커에서 작업을 가져와 스레드 threads개로 실행"""
+
+    def __init__(self, broker: Broker, threads: int = ANALYSIS_NODE_THREADS, node_id: str = None):
+        self.broker = broker
+        self.threads = threads
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self._stop = threading.Event()
+        self._workers = []
+        self._running = set()  # 실행 중인 작업 ID (임대 연장 대상)
+        self._running_lock = threading.Lock()
+
+    def start(self):
+        for i in range(self.threads):
+            worker = threading.Thread(target=self._loop, name=f"analysis-node-{i}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+        threading.Thread(target=self._heartbeat_loop, name="analysis-node-heartbeat", daemon=True).start()
+        logger.info("분석 노드 시작: %s (스레드 %d개)", self.node_id, self.threads)
+
+    def stop(self, timeout: float = None):
+        """새 작업을 가져가지 않고, 실행 중인 작업이 끝날 때까지 대기"""
+        self._stop.set()
+        for worker in self._workers:
+            worker.join(timeout)
+
+    def _heartbeat_loop(self):
+        """임대 시간의 1/3마다 실행 중인 작업의 임대를 연장 (오래 걸리는 분석이 다른 노드에서 또 실행되지 않도록)
+        하고, 보존 시간이 지난 작업을 정리"""
+        while not self._stop.wait(ANALYSIS_JOB_LEASE_SECONDS / 3):
+            with self._running_lock:
+                job_ids = list(self._running)
+            if job_ids:
+                try:
+                    self.broker.heartbeat(self.node_id, job_ids)
+                except Exception as e:
+                    logger.error("❌ 작업 임대 연장 실패: %s", e)
+            try:
+                purged = self.broker.purge(ANALYSIS_JOB_RETENTION_SECONDS)
+            except Exception as e:
+                logger.error("❌ 오래된 작업 정리 실패: %s", e)
+                continue
+            if purged:
+                logger.info("🧹 보존 시간이 지난 작업 %d개 삭제", purged)
+
+    def _loop(self):
+        running = TASKS_IN_FLIGHT.labels("analysis_node")
+        while not self._stop.is_set():
+            try:
+                job = self.broker.claim(self.node_id, timeout=1.0)
+            except Exception as e:
+                logger.error("❌ 작업 가져오기 실패: %s", e)
+                self._stop.wait(1.0)
+                continue
+            if job is None:
+                continue
+            running.inc()
+            with self._running_lock:
+                self._running.add(job.job_id)
+            try:
+                self.broker.complete(job.job_id, self.node_id, copy_context().run(self._execute, job))
+            except Exception as e:
+                logger.error("❌ 작업 결과 저장 실패 (%s): %s", job.task, e)
+            finally:
+                with self._running_lock:
+                    self._running.discard(job.job_id)
+                running.dec()
+
+    def _execute(self, job: Job) -> bytes:
+        """새 컨텍스트에서 실행: 요청 ID/라우트/테넌트를 복원하고 자원 사용량을 잼"""
+        payload = decode(job.payload)
+        context = payload.get("context", {})
+        request_id.set(context.get("request_id", job.job_id))
+        current_route.set(context.get("route", "analysis_node"))
+        current_tenant.set(context.get("tenant", "default"))
+        usage = request_usage.RequestUsage()
+        request_usage.current_usage.set(usage)
+        try:
+            with request_usage.measure():
+                result = TASKS[job.task](*payload["args"])
+            return encode({"result": result, "usage": usage.fields()})
+        except Exception as e:
+            logger.warning("분석 작업 실패 (%s): %s", job.task, e)
+            try:
+                return encode({"error": e, "usage": usage.fields()})
+            except Exception:
+                return encode({"error": AnalysisJobError(f"{type(e).__name__}: {e}"), "usage": usage.fields()})
+
+
+_broker: Optional[Broker] = None
+_broker_lock = threading.Lock()
+
+
+def get_broker() -> Optional[Broker]:
+    """설정된 브로커 (local이면 None), inprocess는 이 프로세스 안에 분석 노드도 함께 띄움"""
+    global _broker
+    if ANALYSIS_BROKER == "local":
+        return None
+    with _broker_lock:
+        if _broker is None:
+            if ANALYSIS_BROKER == "inprocess":
+                _broker = InProcessBroker()
+                AnalysisNode(_broker).start()
+            elif ANALYSIS_BROKER == "sqlite":
+                _broker = SqliteBroker()
+            else:
+                raise ValueError(f"알 수 없는 ANALYSIS_BROKER: {ANALYSIS_BROKER}")
+        return _broker
@@ -2,11 +2,23 @@
 # 실제 HTTP 요청을 처리하는 엔드포인트 정의
 # Controller 역할
 
+import asyncio
+import json
 import os
+from typing import Optional
 from fastapi import APIRouter, File, UploadFile, HTTPException, Form
+from fastapi.responses import StreamingResponse
 from domains.evaluation.schemas import EvaluationRequest, AnalysisResult
 from core.gpt_engine import generate_question_with_manual, fetch_manual, fetch_criteria,generate_feedback_with_criteria
-from domains.evaluation.service import analyze_video_all
+from domains.evaluation.service import analyze_audio_all, analyze_video_all
+from core.analysis_pool import run_analysis
+from core.answer_screen import screen_answer
+from core.gpt_gateway import GPTUnavailableError
+from core.score_model import log_scored_answer, predict_scores
+from openai import APITimeoutError
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 router = APIRouter()
 
@@ -29,6 +41,9 @@ async def get_question(manual_id: int):
     except HTTPException as e:
         # FastAPI에 다시 예외 전달
         raise e
+    except (GPTUnavailableError, APITimeoutError) as e:
+        # GPT 장애/지연 시 워커를 붙잡지 않고 바로 503 반환
+        raise HTTPException(status_code=503, detail=f"문항 생성 서비스가 일시적으로 지연되고 있습니다: {e}")
 # end def
 
 
@@ -41,15 +56,21 @@ async def get_question(manual_id: int):
 
 
 @router.post("/audio-video", response_model=AnalysisResult)
-async def analyze_from_single_video(video: UploadFile = File(...)):
+async def analyze_from_single_video(video: UploadFile = File(...), emotion: Optional[bool] = Form(None)):
     binary = await video.read()
-    result = analyze_video_all(binary)
+    result = await run_analysis(analyze_video_all, binary, emotion)
     return AnalysisResult(
         text=result["text"],
         head_pose={
             "head_yaw": result["gaze_direction"],
             "head_pitch": result["head_motion"]
-        }
+        },
+        head_angles={
+            "yaw": result.get("head_yaw"),
+            "pitch": result.get("head_pitch")
+        },
+        emotions=result.get("emotions", {}),
+        dominant_emotion=result.get("dominant_emotion")
     )
 
 
@@ -58,45 +79,98 @@ async def submit_answer(
     video: UploadFile,
     question: str = Form(...),
     manual_id: int = Form(...),
-    criteria_id: int = Form(...)
+    criteria_id: int = Form(...),
+    emotion: Optional[bool] = Form(None),  # 표정 분석 채널 (미지정 시 EMOTION_CHANNEL_ENABLED)
+    provisional: bool = Form(False)  # true면 잠정 점수 → 최종 결과 순서로 NDJSON 스트리밍
 ):
     binary = await video.read()
+    analysis = await run_analysis(analyze_video_all, binary, emotion)
+    return await _evaluate_answer(analysis, question, manual_id, criteria_id, provisional)
+
+
+# 오디오만 있는 답변 (또는 시선 분석이 필요 없는 문항): 메모리에서 바로 디코딩해 STT → 같은 피드백 흐름
+@router.post("/submit-audio-answer")
+async def submit_audio_answer(
+    audio: UploadFile,
+    question: str = Form(...),
+    manual_id: int = Form(...),
+    criteria_id: int = Form(...),
+    provisional: bool = Form(False)
+):
+    binary = await audio.read()
+    analysis = await run_analysis(analyze_audio_all, binary)
+    return await _evaluate_answer(analysis, question, manual_id, criteria_id, provisional)
+
 
-    analysis = analyze_video_all(binary)
+async def _evaluate_answer(analysis: dict, question: str, manual_id: int, criteria_id: int, provisional: bool):
     answer = analysis.get("text", "").strip()
     emotion_data = {
         "gaze": analysis.get("gaze_direction", "알 수 없음"),
-        "head": analysis.get("head_motion", "알 수 없음")
+        "head": analysis.get("head_motion", "알 수 없음"),
+        "yaw": analysis.get("head_yaw"),
+        "pitch": analysis.get("head_pitch"),
+        "emotions": analysis.get("emotions", {}),
+        "dominant_emotion": analysis.get("dominant_emotion")
     }
 
-    # 🎯 answer가 비정상일 경우 고정 응답
-    if not answer or answer == "음성 인식 실패" or len(answer) < 5:
+    # 🎯 answer가 비정상일 경우 고정 응답 (규칙 + 로컬 분류기로 선별, GPT 호출 생략)
+    # 분류기(sklearn) 추론은 스레드에서, 요청당 한 번만
+    screen = await asyncio.to_thread(screen_answer, "" if answer == "음성 인식 실패" else answer)
+    if not screen.scorable:
         return {
             "question": question,
             "answer": answer,
             "gaze": emotion_data["gaze"],
             "head": emotion_data["head"],
             "score": {},
-            "feedback": "⚠️ 답변이 정상적으로 인식되지 않아 평가가 불가능합니다. 문의 후 재평가 요청을 진행해 주세요."
+            "feedback": screen.feedback,
+            "screened": screen.reason
         }
 
-    manual = await fetch_manual(manual_id)
-    criteria = await fetch_criteria(criteria_id)
-
-    gpt_result = generate_feedback_with_criteria(
-        question, answer, emotion_data, manual, criteria
-    )
-
-    return {
+    base = {
         "question": question,
         "answer": answer,
         "gaze": emotion_data["gaze"],
         "head": emotion_data["head"],
-        "score": gpt_result["score"],
-        "feedback": gpt_result["feedback"]
+        "head_angles": {"yaw": emotion_data["yaw"], "pitch": emotion_data["pitch"]},
+        "emotions": emotion_data["emotions"],
+        "dominant_emotion": emotion_data["dominant_emotion"],
     }
 
-
-
-
-
+    async def _final():
+        manual = await fetch_manual(manual_id)
+        criteria = await fetch_criteria(criteria_id)
+        gpt_result = await generate_feedback_with_criteria(
+            question, answer, emotion_data, manual, criteria
+        )
+        # GPT 채점 결과는 잠정 점수 모델 재학습용으로 기록
+        await asyncio.to_thread(log_scored_answer, question, answer, emotion_data, gpt_result["score"])
+        return {**base, "score": gpt_result["score"], "feedback": gpt_result["feedback"]}
+
+    if not provisional:
+        try:
+            return await _final()
+        except (GPTUnavailableError, APITimeoutError) as e:
+            raise HTTPException(status_code=503, detail=f"평가 서비스가 일시적으로 지연되고 있습니다: {e}")
+
+    # 📈 잠정 점수를 먼저 한 줄 보내고, GPT 피드백이 끝나면 최종 결과를 이어서 보냄 (NDJSON)
+    async def _stream():
+        # 잠정 점수 모델(sklearn) 추론은 스레드에서 (이벤트 루프를 막지 않도록)
+        scores = await asyncio.to_thread(predict_scores, question, answer, emotion_data)
+        yield json.dumps({**base, "status": "provisional", "score": scores}, ensure_ascii=False) + "\n"
+        try:
+            final = await _final()
+        except (GPTUnavailableError, APITimeoutError) as e:
+            yield json.dumps({"status": "error", "status_code": 503, "detail": f"평가 서비스가 일시적으로 지연되고 있습니다: {e}"}, ensure_ascii=False) + "\n"
+            return
+        except HTTPException as e:
+            yield json.dumps({"status": "error", "status_code": e.status_code, "detail": e.detail}, ensure_ascii=False) + "\n"
+            return
+        except Exception as e:
+            # 200과 잠정 결과를 이미 보냈으므로 예외를 올리면 스트림이 잘림 → 오류 줄로 마무리
+            logger.error("❌ 최종 평가 실패 (스트리밍): %s", e, exc_info=True)
+            yield json.dumps({"status": "error", "status_code": 500, "detail": "평가 중 오류가 발생했습니다."}, ensure_ascii=False) + "\n"
+            return
+        yield json.dumps({**final, "status": "final"}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(_stream(), media_type="application/x-ndjson")
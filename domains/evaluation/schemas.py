@@ -7,7 +7,7 @@
 # domains/evaluation/schemas.py
 
 from pydantic import BaseModel
-from typing import Dict
+from typing import Dict, Optional
 
 
 class TranscriptionResult(BaseModel):
@@ -23,4 +23,7 @@ class EvaluationRequest(BaseModel):
 class AnalysisResult(BaseModel):
     text: str
     head_pose: Dict[str, str]  # 예: {"head_yaw": "정면", "head_pitch": "안정적"}
+    head_angles: Dict[str, Optional[float]] = {}  # 예: {"yaw": -3.2, "pitch": 4.1} (도, landmark 엔진에서만 값 있음)
+    emotions: Dict[str, float] = {}  # 예: {"neutral": 0.62, "happy": 0.21, ...} (감정 채널을 켠 경우만)
+    dominant_emotion: Optional[str] = None
 
@@ -2,11 +2,31 @@
 #whisper 모델을 불러와서 binary 오디오 데이터를 받아 텍스트로 변환하는 핵심 로직
 
 import os
-import cv2
-from faster_whisper import WhisperModel
-from moviepy.editor import VideoFileClip
-import tempfile
-import subprocess
+from config.settings import (
+    EMOTION_BATCH_SIZE,
+    EMOTION_CHANNEL_ENABLED,
+    EMOTION_SAMPLE_FPS,
+    POSE_BATCH_SIZE,
+    POSE_MAX_WIDTH,
+    POSE_SAMPLE_FPS,
+    SCRATCH_VIDEO_EXPANSION,
+)
+from core.metrics import stage_timer
+from core.request_usage import (
+    RequestLimitExceeded,
+    add_audio_seconds,
+    add_scratch_file,
+    check_audio_seconds,
+    check_video_seconds,
+    run_process,
+)
+from core.scratch import scratch
+from core.stt_batcher import stt_batcher
+from core.work_broker import analysis_task
+from core.whisper_engine import SAMPLE_RATE, decode_audio_bytes, decode_audio_file, probe_duration
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
 
 # 영상 처리 로직
 def fix_video_metadata(input_path: str) -> str:
@@ -28,86 +48,101 @@ def fix_video_metadata(input_path: str) -> str:
             output_path
         ]
 
-    subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    with stage_timer("ffmpeg_fixup"):
+        run_process(cmd)  # ffmpeg CPU 시간도 요청 사용량에 포함
     return output_path
 #end def
 
-# Whisper 모델 (빠른 버전)
-stt_model = WhisperModel("base", device="cpu", compute_type="int8")
-
-# Haar Cascade 로드
-face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-eye_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_eye.xml")
+# Whisper 모델 / Haar Cascade는 core.model_registry에서 서버 시작 단계에 로드
 
 
 # 🎙️ 영상에서 음성 추출 → STT 텍스트 변환
 def transcribe_audio_from_video(video_path: str) -> str:
     fixed_path = fix_video_metadata(video_path)
-    audio_path = video_path.replace(".mp4", ".wav")
-
-    clip = VideoFileClip(fixed_path)
-    clip.audio.write_audiofile(audio_path, verbose=False, logger=None)
-    clip.close()  # ✅ 파일 점유 해제
-
-    segments, _ = stt_model.transcribe(audio_path, language="ko")
-    text = " ".join([segment.text for segment in segments])
 
-    os.remove(audio_path)
-    os.remove(fixed_path)  # ✅ 재인코딩된 영상도 정리
+    try:
+        # 디코딩 전에 컨테이너 메타데이터로 길이 상한 확인 (긴 영상은 Whisper까지 가지 않음)
+        duration = probe_duration(fixed_path)
+        if duration is not None:
+            check_video_seconds(duration)
+            check_audio_seconds(duration)
+        with stage_timer("audio_extraction"):
+            # 영상의 오디오 트랙을 바로 16kHz 배열로 디코딩 (wav 파일을 거치지 않음)
+            audio = decode_audio_file(fixed_path)
+        add_audio_seconds(len(audio) / SAMPLE_RATE)
+        with stage_timer("whisper"):
+            text = stt_batcher.transcribe(audio)  # 동시 요청과 묶어서 배치 추론
+    finally:
+        # 중간에 실패해도 재인코딩된 영상이 남지 않도록
+        add_scratch_file(fixed_path)
+        if os.path.exists(fixed_path):
+            os.remove(fixed_path)
     return text
 
 
-# 👁️ 시선 + 고개 움직임 분석
-def analyze_pose_only(video_path: str) -> dict:
-    cap = cv2.VideoCapture(video_path)
-    gaze_directions = []
-    yaw_distances = []
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
+class _ChannelSampler:
+    """공용 디코더 프레임 중 채널별 샘플링 간격(fps)에 맞는 것만 골라 배치로 모아 넘김"""
 
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = face_cascade.detectMultiScale(gray, 1.1, 4)
+    def __init__(self, sink, sample_fps: float, batch_size: int):
+        self.sink = sink
+        self.interval = 1.0 / sample_fps if sample_fps > 0 else 0.0
+        self.batch_size = batch_size
+        self._next_t = 0.0
+        self._batch = []
 
-        for (x, y, w, h) in faces:
-            roi = gray[y:y + h, x:x + w]
-            eyes = eye_cascade.detectMultiScale(roi)
+    def offer(self, frame):
+        if frame.timestamp + 1e-6 < self._next_t:
+            return
+        self._next_t += self.interval
+        self._batch.append(frame.image)
+        if len(self._batch) >= self.batch_size:
+            self.flush()
 
-            if len(eyes) >= 2:
-                centers = [(ex + ew // 2) for (ex, ey, ew, eh) in eyes]
-                avg_x = sum(centers) / len(centers)
+    def flush(self):
+        if self._batch:
+            self.sink.add_batch(self._batch)
+            self._batch = []
 
-                if avg_x < w // 2 - 10:
-                    gaze_directions.append("왼쪽")
-                elif avg_x > w // 2 + 10:
-                    gaze_directions.append("오른쪽")
-                else:
-                    gaze_directions.append("정면")
 
-                yaw = abs(centers[0] - centers[1])
-                yaw_distances.append(yaw)
+# 👁️ 시선 + 고개 움직임 (+ 선택: 표정) 분석
+def analyze_frames(video_path: str, engine_name: str = None, emotion: bool = False) -> dict:
+    """영상을 한 번만 디코딩해 pose 엔진과 (선택) 감정 분석기가 각자의 fps로 프레임을 나눠 씀"""
+    from core.pose_engine import create_pose_engine
+    from core.video_frames import iter_sampled_frames
 
-    cap.release()
+    engine = create_pose_engine(engine_name)
+    try:
+        channels = {"pose": _ChannelSampler(engine, POSE_SAMPLE_FPS, POSE_BATCH_SIZE)}
+        if emotion:
+            from core.emotion_engine import EmotionAnalyzer
+            channels["emotion"] = _ChannelSampler(EmotionAnalyzer(), EMOTION_SAMPLE_FPS, EMOTION_BATCH_SIZE)
+
+        decode_fps = max(POSE_SAMPLE_FPS, EMOTION_SAMPLE_FPS if emotion else 0)
+        for frame in iter_sampled_frames(video_path, decode_fps, POSE_MAX_WIDTH):
+            for channel in channels.values():
+                channel.offer(frame)
+        for channel in channels.values():
+            channel.flush()
+
+        result = engine.summarize()
+        if emotion:
+            result.update(channels["emotion"].sink.summarize())
+        return result
+    finally:
+        engine.close()
 
-    gaze_result = max(set(gaze_directions), key=gaze_directions.count) if gaze_directions else "알 수 없음"
-    head_motion = (
-        "움직임 있음" if max(yaw_distances, default=0) - min(yaw_distances, default=0) > 10 else "안정적"
-    )
 
-    return {
-        "gaze_direction": gaze_result,
-        "head_stability": head_motion
-    }
+def analyze_pose_only(video_path: str, engine_name: str = None) -> dict:
+    """샘플링한 프레임을 배치로 pose 엔진에 넣어 시선 방향/고개 안정성 + yaw/pitch(도) 계산"""
+    return analyze_frames(video_path, engine_name)
 
 
 # 🔄 전체 분석 통합
-def analyze_video_all(binary_video: bytes) -> dict:
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as temp_file:
-        temp_file.write(binary_video)
-        temp_file.flush()
-        video_path = temp_file.name
+@analysis_task
+def analyze_video_all(binary_video: bytes, emotion: bool = None) -> dict:
+    """emotion=None 이면 설정(EMOTION_CHANNEL_ENABLED)을 따름"""
+    if emotion is None:
+        emotion = EMOTION_CHANNEL_ENABLED
 
     stt_text = "음성 인식 실패"
     pose_result = {
@@ -115,26 +150,61 @@ def analyze_video_all(binary_video: bytes) -> dict:
         "head_stability": "알 수 없음"
     }
 
-    try:
+    # 작업 디렉터리(기본 tmpfs)에 원본/변환본/wav를 두고 끝나면 통째로 삭제
+    with scratch.workspace(len(binary_video) * SCRATCH_VIDEO_EXPANSION) as workspace:
+        video_path = workspace.write("input.mp4", binary_video)
+
         try:
             stt_text = transcribe_audio_from_video(video_path)
+        except RequestLimitExceeded:
+            raise
         except Exception as e:
-            print(f"🎙️ 음성 분석 실패: {e}")
+            logger.warning("🎙️ 음성 분석 실패: %s", e)
 
         try:
-            pose_result = analyze_pose_only(video_path)
+            with stage_timer("pose_analysis"):
+                pose_result = analyze_frames(video_path, emotion=emotion)
+        except RequestLimitExceeded:
+            raise
         except Exception as e:
-            print(f"👁️ 시선 분석 실패: {e}")
-
-    finally:
-        os.remove(video_path)
+            logger.warning("👁️ 시선 분석 실패: %s", e)
 
     return {
         "text": stt_text,
         "gaze_direction": pose_result.get("gaze_direction", "알 수 없음"),
-        "head_motion": pose_result.get("head_stability", "알 수 없음")
+        "head_motion": pose_result.get("head_stability", "알 수 없음"),
+        "head_yaw": pose_result.get("head_yaw"),
+        "head_pitch": pose_result.get("head_pitch"),
+        "emotions": pose_result.get("emotions", {}),
+        "dominant_emotion": pose_result.get("dominant_emotion"),
     }
 
 
-
-
+@analysis_task
+def analyze_audio_all(binary_audio: bytes) -> dict:
+    """오디오만 있는 답변: 메모리에서 디코딩 → Whisper (ffmpeg 재인코딩, 프레임 디코딩 없음)"""
+    stt_text = "음성 인식 실패"
+    try:
+        # 통째로 디코딩하기 전에 컨테이너 메타데이터로 길이 상한 확인 (길이를 모르면 디코딩 후 확인)
+        duration = probe_duration(binary_audio)
+        if duration is not None:
+            check_audio_seconds(duration)
+        audio = decode_audio_bytes(binary_audio)
+        add_audio_seconds(len(audio) / SAMPLE_RATE)
+        with stage_timer("whisper"):
+            stt_text = stt_batcher.transcribe(audio)
+    except RequestLimitExceeded:
+        raise
+    except Exception as e:
+        logger.warning("🎙️ 음성 분석 실패: %s", e)
+
+    # 영상 분석 결과와 같은 형태로 반환 (시선/고개/표정은 알 수 없음)
+    return {
+        "text": stt_text,
+        "gaze_direction": "알 수 없음",
+        "head_motion": "알 수 없음",
+        "head_yaw": None,
+        "head_pitch": None,
+        "emotions": {},
+        "dominant_emotion": None,
+    }
@@ -0,0 +1,159 @@
+# domains/simulation/catalog.py
+# 시나리오 카탈로그: 시나리오 ID → 내용/태그 조회
+# 파일(또는 DB 스냅샷을 내보낸 JSON)에서 한 번 로드해 메모리에 ID 인덱스로 보관
+# 저장소의 data/scenarios.json은 예시 스냅샷 → 운영에서는 DB에서 내보낸 행으로 교체:
+#
+#   python -m domains.simulation.catalog export scenarios_dump.csv   # 또는 .json, 결과는 SCENARIO_CATALOG_PATH
+#   (열/키: scenarioId, scenarioContent, scenarioTag — 실행 중인 서버는 파일 변경을 감지해 다시 로드)
+
+import csv
+import json
+import os
+import tempfile
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from config.settings import SCENARIO_CATALOG_PATH, SCENARIO_CATALOG_RELOAD_CHECK_SECONDS
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+class ScenarioInfo(NamedTuple):
+    scenario_id: int
+    content: str
+    tags: str  # "출근조,기기고장" 형식
+
+
+def _parse_catalog(raw: Any) -> Dict[int, ScenarioInfo]:
+    """[{scenarioId, scenarioContent, scenarioTag}, ...] 또는 {"scenarios": [...]} 형식 지원"""
+    items = raw.get("scenarios", []) if isinstance(raw, dict) else raw
+    index = {}
+    for item in items:
+        scenario_id = int(item["scenarioId"])
+        index[scenario_id] = ScenarioInfo(
+            scenario_id,
+            item.get("scenarioContent", ""),
+            sys.intern(item.get("scenarioTag", "") or ""),  # 태그는 반복이 많아 intern
+        )
+    return index
+
+
+class ScenarioCatalog:
+    """ID 인덱스 기반 시나리오 카탈로그 (파일 변경 시 원자적으로 재로드)"""
+
+    def __init__(self, path: str = SCENARIO_CATALOG_PATH, reload_check_seconds: float = SCENARIO_CATALOG_RELOAD_CHECK_SECONDS):
+        self.path = path
+        self.reload_check_seconds = reload_check_seconds
+        self._index: Dict[int, ScenarioInfo] = {}
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._reload_lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> bool:
+        """파일이 바뀌었으면 새 인덱스를 만든 뒤 참조만 교체 (조회 중인 요청은 이전 인덱스를 그대로 사용)"""
+        with self._reload_lock:
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                if self._mtime is None:
+                    logger.warning("⚠️ 시나리오 카탈로그 파일이 없습니다: %s", self.path)
+                return False
+            if mtime == self._mtime:
+                return False
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    new_index = _parse_catalog(json.load(f))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                # 깨진 파일로 교체 중이면 기존 인덱스 유지
+                logger.error("❌ 시나리오 카탈로그 로드 실패: %s", e)
+                return False
+            self._index = new_index
+            self._mtime = mtime
+            logger.info("✅ 시나리오 카탈로그 로드: %s개", len(new_index))
+            return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._next_check = now + self.reload_check_seconds
+            self.reload()
+
+    def get(self, scenario_id: int) -> ScenarioInfo:
+        """시나리오 1개 조회 (카탈로그에 없으면 기본 시나리오)"""
+        self._maybe_reload()
+        return self._index.get(scenario_id) or _unknown_scenario(scenario_id)
+
+    def get_many(self, scenario_ids: Iterable[int]) -> List[ScenarioInfo]:
+        """userorder 전체를 한 번에 조회 (순서 유지)"""
+        self._maybe_reload()
+        index = self._index
+        return [index.get(scenario_id) or _unknown_scenario(scenario_id) for scenario_id in scenario_ids]
+
+    def as_hint_scenarios(self) -> List[Dict[str, Any]]:
+        """힌트 생성 요청 형식으로 카탈로그 전체 반환"""
+        self._maybe_reload()
+        return [
+            {"scenarioId": info.scenario_id, "scenarioContent": info.content, "scenarioTag": info.tags}
+            for info in self._index.values()
+        ]
+
+    def __len__(self):
+        return len(self._index)
+
+
+# 카탈로그 파일이 없거나 ID가 없을 때 쓰는 기본 시나리오 (카탈로그 도입 전 매핑과 같음: ID % 5)
+_FALLBACK_SCENARIOS = (
+    ("커피머신이 작동하지 않음", "출근조,기기고장"),
+    ("고객이 음료 주문을 취소하겠다고 함", "고객클레임,주문관리"),
+    ("신입 직원이 계산을 틀려서 당황함", "신입교육,실수처리"),
+    ("매장에 고객이 줄을 서서 대기 중", "혼잡상황,대기관리"),
+    ("배달 주문이 5건 동시에 들어옴", "배달,다중업무"),
+)
+_MAX_WARNED_IDS = 1000
+_warned_ids = set()
+
+
+def _unknown_scenario(scenario_id: int) -> ScenarioInfo:
+    # 조회마다 경고하지 않도록 ID당 한 번만 (요청에서 오는 값이라 기억하는 ID 수는 제한)
+    if scenario_id not in _warned_ids and len(_warned_ids) < _MAX_WARNED_IDS:
+        _warned_ids.add(scenario_id)
+        logger.warning("⚠️ 카탈로그에 없는 시나리오 ID: %s (기본 시나리오 사용)", scenario_id)
+    content, tags = _FALLBACK_SCENARIOS[scenario_id % len(_FALLBACK_SCENARIOS)]
+    return ScenarioInfo(scenario_id, content, tags)
+
+
+def export_catalog(source: str, path: str = SCENARIO_CATALOG_PATH) -> int:
+    """DB에서 내보낸 행(JSON 배열 또는 CSV)을 검증해 카탈로그 파일로 저장 (임시 파일 → 교체), 시나리오 수 반환"""
+    with open(source, encoding="utf-8-sig", newline="") as f:
+        rows = list(csv.DictReader(f)) if source.endswith(".csv") else json.load(f)
+    index = _parse_catalog(rows)
+    items = [
+        {"scenarioId": info.scenario_id, "scenarioContent": info.content, "scenarioTag": info.tags}
+        for info in sorted(index.values())
+    ]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    logger.info("✅ 시나리오 카탈로그 내보내기: %s개 → %s", len(items), path)
+    return len(items)
+
+
+scenario_catalog = ScenarioCatalog()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4) or sys.argv[1] != "export":
+        sys.exit("사용법: python -m domains.simulation.catalog export rows.(json|csv) [출력 경로]")
+    export_catalog(*sys.argv[2:])
@@ -1,25 +1,23 @@
 # domains/simulation/router.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import List, Dict, Any
-from openai import OpenAI, OpenAIError
+from openai import OpenAIError
+import asyncio
 import json
-import os
 import re
+from core.admin_auth import require_admin
+from core.answer_screen import rule_reason, screen_answers
+from core.fair_scheduler import TenantOverloadedError, current_tenant, resolve_tenant
+from core.gpt_gateway import chat_completion, chat_completion_async, gpt_scheduler, is_available as gpt_available
+from core.prompt_templates import PromptTemplate
+from domains.simulation.catalog import ScenarioInfo, scenario_catalog
+from domains.simulation.service import get_hints_with_cache, hint_cache, warm_up_hint_cache
+from core.structured_logging import get_logger
 
-router = APIRouter()
+logger = get_logger(__name__)
 
-# OpenAI API 키 설정 및 검증
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    print("경고: OPENAI_API_KEY 환경변수가 설정되지 않았습니다.")
-    client = None
-else:
-    try:
-        client = OpenAI(api_key=api_key)
-    except Exception as e:
-        print(f"OpenAI 클라이언트 초기화 실패: {e}")
-        client = None
+router = APIRouter()
 
 # Pydantic 모델 정의
 class HintsRequest(BaseModel):
@@ -37,84 +35,29 @@ class EducationalAnalysisRequest(BaseModel):
     reasonWritingTime: int
     totalTimeSpent: int
 
-# 무의미한 입력 검증 함수
+# 무의미한 입력 검증 함수 (규칙은 core.answer_screen과 공유)
 def validate_response_text(text: str) -> bool:
-    """응답 텍스트 유효성 검증"""
-    if not text or len(text.strip()) < 5:
-        return False
-    
-    text_stripped = text.strip()
-    
-    # 자음/모음만 있는 경우 (ㄱ, ㅏ, ㅀ 등)
-    korean_consonants = re.compile(r'^[ㄱ-ㅎㅏ-ㅣ]+$')
-    if korean_consonants.match(text_stripped):
-        return False
-    
-    # 반복 문자 (ㅋㅋㅋ, ㅎㅎㅎ, 111, aaa 등)
-    repeated_char = re.compile(r'^(.)\1{2,}$')
-    if repeated_char.match(text_stripped):
-        return False
-    
-    # 숫자만 있는 경우
-    if text_stripped.isdigit():
-        return False
-    
-    # 특수문자만 있는 경우
-    if re.match(r'^[^a-zA-Z0-9가-힣]+$', text_stripped):
-        return False
-    
-    # 의미없는 짧은 반복 (ㄱㄱㄱ, 안안안, 네네네 등)
-    if len(text_stripped) <= 10:
-        # 같은 문자가 50% 이상인 경우
-        char_count = {}
-        for char in text_stripped:
-            char_count[char] = char_count.get(char, 0) + 1
-        
-        max_char_count = max(char_count.values())
-        if max_char_count / len(text_stripped) > 0.5:
-            return False
-    
-    return True
+    """응답 텍스트 유효성 검증 (core.answer_screen.rule_reason과 같은 규칙)
+    예전 규칙 외에 공백이 섞인 자음/모음, Whisper 환각 문구(40자 미만), 같은 단어 반복(STT 루프)도 무효로 봄"""
+    return rule_reason(text) is None
 
 def get_invalid_responses(request: EducationalAnalysisRequest) -> List[str]:
-    """무의미한 응답이 있는 시나리오 ID 목록 반환"""
-    invalid_responses = []
-    for scenario_id, text in request.responseTexts.items():
-        if not validate_response_text(text):
-            invalid_responses.append(scenario_id)
-    return invalid_responses
+    """무의미한 응답이 있는 시나리오 ID 목록 반환 (규칙 + 로컬 분류기, 한 번의 배치로 선별)"""
+    scenario_ids = list(request.responseTexts)
+    results = screen_answers([request.responseTexts[scenario_id] for scenario_id in scenario_ids])
+    return [scenario_id for scenario_id, result in zip(scenario_ids, results) if not result.scorable]
 
 # 시나리오 내용 매핑 함수
-def get_scenario_info_by_id(scenario_id: int) -> Dict[str, str]:
-    """실제 시나리오 ID를 받아서 내용과 태그 반환"""
-    # 기본 시나리오 패턴 매핑 (실제로는 DB에서 조회하거나 요청에서 받은 정보 사용)
-    scenario_patterns = {
-        # 커피머신 관련
-        "coffee": {"content": "커피머신이 작동하지 않음", "tags": "출근조,기기고장"},
-        # 주문 취소 관련  
-        "cancel": {"content": "고객이 음료 주문을 취소하겠다고 함", "tags": "고객클레임,주문관리"},
-        # 신입직원 관련
-        "newbie": {"content": "신입 직원이 계산을 틀려서 당황함", "tags": "신입교육,실수처리"},
-        # 대기 고객 관련
-        "waiting": {"content": "매장에 고객이 줄을 서서 대기 중", "tags": "혼잡상황,대기관리"},
-        # 배달 주문 관련
-        "delivery": {"content": "배달 주문이 5건 동시에 들어옴", "tags": "배달,다중업무"}
-    }
-    
-    # 기본값 반환 (실제로는 더 정교한 매핑 필요)
-    patterns = list(scenario_patterns.keys())
-    pattern_index = (scenario_id % len(patterns))
-    pattern_key = patterns[pattern_index]
-    
-    return scenario_patterns[pattern_key]
+def get_scenario_info_by_id(scenario_id: int) -> ScenarioInfo:
+    """실제 시나리오 ID를 받아서 카탈로그의 내용과 태그 반환"""
+    return scenario_catalog.get(scenario_id)
 
 def build_scenarios_info_from_request(request: EducationalAnalysisRequest) -> str:
     """요청에서 받은 시나리오 ID들을 기반으로 1~5 순서의 시나리오 정보 생성"""
     scenarios_info = ""
     
-    for i, scenario_id in enumerate(request.userorder, 1):
-        scenario_info = get_scenario_info_by_id(scenario_id)
-        scenarios_info += f"{i}. {scenario_info['content']} ({scenario_info['tags']})\n"
+    for i, scenario_info in enumerate(scenario_catalog.get_many(request.userorder), 1):
+        scenarios_info += f"{i}. {scenario_info.content} ({scenario_info.tags})\n"
     
     return scenarios_info
 
@@ -123,14 +66,10 @@ def build_scenarios_info_from_request(request: EducationalAnalysisRequest) -> st
 async def get_hints_only(request: HintsRequest):
     """페이지 로딩 시 각 상황별 응대 힌트만 생성"""
     
-    if not client:
-        print("OpenAI 클라이언트가 설정되지 않음 - 기본 힌트 반환")
-        return create_default_hints(request.scenarios)
-    
     scenarios = request.scenarios
     task = request.task
     
-    print(f"힌트 요청 받음: {len(scenarios)}개 시나리오")
+    logger.info("힌트 요청 받음: %s개 시나리오", len(scenarios))
     
     if not scenarios:
         raise HTTPException(status_code=400, detail="시나리오가 제공되지 않았습니다.")
@@ -138,93 +77,101 @@ async def get_hints_only(request: HintsRequest):
     if task != "generate_hints_only":
         raise HTTPException(status_code=400, detail="잘못된 작업 유형입니다.")
     
-    try:
-        prompt = generate_hints_only_prompt(scenarios)
-        
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7
-        )
-        
-        gpt_response = response.choices[0].message.content
-        print(f"GPT 힌트 응답: {gpt_response}")
-        
-        hints_result = json.loads(gpt_response)
-        return hints_result
-        
-    except OpenAIError as e:
-        print(f"❌ OpenAI API 오류: {e}")
-        return create_default_hints(scenarios)
-        
-    except json.JSONDecodeError as e:
-        print(f"❌ JSON 파싱 오류: {e}")
-        print(f"파싱 실패한 응답: {gpt_response}")
-        return create_default_hints(scenarios)
-        
-    except Exception as e:
-        print(f"❌ 힌트 생성 오류: {e}")
-        return create_default_hints(scenarios)
+    cached = hint_cache.lookup(scenarios)  # 요청당 한 번만 조회해서 아래 경로에 그대로 넘김
+
+    def default_hints(missing):
+        return create_default_hints(missing)["responseHints"]
+
+    # GPT를 쓸 수 없으면(클라이언트 없음/서킷 브레이커 열림) 캐시 + 기본 힌트로 즉시 응답
+    if not gpt_available():
+        logger.info("GPT 사용 불가 - 캐시/기본 힌트 반환")
+        return {"responseHints": get_hints_with_cache(scenarios, None, default_hints, cached)}
+
+    # 캐시에 없는 시나리오만 GPT로 생성
+    def fill_hints():
+        return get_hints_with_cache(scenarios, generate_hints_from_gpt, default_hints, cached)
+
+    # GPT를 불러야 할 때만 테넌트 차례를 기다렸다가 스레드에서 실행
+    _, misses = cached
+    if misses:
+        async with gpt_scheduler.slot():
+            hints = await asyncio.to_thread(fill_hints)
+    else:
+        hints = fill_hints()
+    return {"responseHints": hints}
+
+# 힌트 캐시 워밍업 엔드포인트 (cron 등에서 X-Admin-Token 헤더로 주기적으로 호출)
+@router.post("/warm-up-hints", include_in_schema=False)
+async def warm_up_hints(request: Request):
+    """시나리오 카탈로그 전체 힌트를 미리 생성 (GPT 사용량이 크므로 관리자 토큰 필요)"""
+    require_admin(request)
+    warmed = await asyncio.to_thread(warm_up_hints_from_catalog)
+    return {"warmed": warmed}
 
 # 교육용 분석 엔드포인트
 @router.post("/educational-analysis")
 async def educational_analysis(request: EducationalAnalysisRequest):
     """교육 중심 시뮬레이션 분석 - 실제 시나리오 ID 지원"""
+    current_tenant.set(resolve_tenant(request.companyid))  # 회사별 공정 스케줄링 기준
     
-    if not client:
-        print("❌ OpenAI 클라이언트가 설정되지 않음")
-        return create_default_educational_analysis(request)
+    if not gpt_available():
+        logger.error("❌ GPT 사용 불가 (클라이언트 없음 또는 서킷 브레이커 열림) - 기본 분석 반환")
+        invalid_responses = await asyncio.to_thread(get_invalid_responses, request)
+        return create_improved_default_educational_analysis(request, invalid_responses)
     
-    print(f"교육용 분석 요청 - 사용자: {request.userid}")
-    print(f"선택한 순서 (실제 ID): {request.userorder}")
-    print(f"사용자 이유: {request.reason}")
+    logger.info("교육용 분석 요청 - 사용자: %s", request.userid)
+    logger.info("선택한 순서 (실제 ID): %s", request.userorder)
+    logger.debug("사용자 이유: %s", request.reason)
     
     # 무의미한 입력 검증
-    invalid_responses = get_invalid_responses(request)
+    invalid_responses = await asyncio.to_thread(get_invalid_responses, request)  # 분류기 배치 추론은 스레드에서
     if invalid_responses:
-        print(f"⚠️ 무의미한 입력 감지 - 시나리오: {invalid_responses}")
+        logger.warning("⚠️ 무의미한 입력 감지 - 시나리오: %s", invalid_responses)
+        # 모든 멘트가 채점 불가면 GPT를 부르지 않고 기본 분석(무의미한 입력 안내 포함) 반환
+        if len(invalid_responses) == len(request.responseTexts):
+            return create_improved_default_educational_analysis(request, invalid_responses)
     
     try:
         # 1단계: 사용자가 선택한 순서를 기반으로 1~5 시나리오 정보 생성
-        print("🔄 시나리오 정보 구성 중...")
+        logger.info("🔄 시나리오 정보 구성 중...")
         scenarios_info = build_scenarios_info_from_request(request)
-        print(f"생성된 시나리오 정보:\n{scenarios_info}")
+        logger.debug("생성된 시나리오 정보:\n%s", scenarios_info)
         
         # 2단계: GPT 추천 순서 및 이유 생성 (1~5 기준)
-        print("🔄 GPT 추천 순서 생성 중...")
+        logger.info("🔄 GPT 추천 순서 생성 중...")
         gpt_recommendation = await get_gpt_recommended_order_detailed(scenarios_info)
         
         # 3단계: 교육용 분석 프롬프트 생성
-        print("🔄 교육용 분석 프롬프트 생성 중...")
-        educational_prompt = generate_educational_analysis_prompt(request, gpt_recommendation, invalid_responses)
+        logger.info("🔄 교육용 분석 프롬프트 생성 중...")
+        educational_messages = generate_educational_analysis_prompt(request, gpt_recommendation, invalid_responses)
         
         # GPT API 호출
-        print("🔄 GPT API 호출 중...")
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[{"role": "user", "content": educational_prompt}],
+        logger.info("🔄 GPT API 호출 중...")
+        response = await chat_completion_async(
+            "educational_analysis",
+            messages=educational_messages,
             temperature=0.7,
             max_tokens=4000
         )
         
         gpt_response = response.choices[0].message.content
-        print(f"✅ GPT 교육 분석 응답 길이: {len(gpt_response)}")
-        print(f"GPT 응답 미리보기: {gpt_response[:200]}...")
+        logger.info("✅ GPT 교육 분석 응답 길이: %s", len(gpt_response))
+        logger.debug("GPT 응답 미리보기: %s", gpt_response[:200])
         
         # JSON 파싱 시도
         try:
             analysis_result = json.loads(gpt_response)
-            print("✅ JSON 파싱 성공")
+            logger.info("✅ JSON 파싱 성공")
         except json.JSONDecodeError:
             # JSON 추출 시도
-            print("⚠️ 직접 JSON 파싱 실패, JSON 블록 추출 시도...")
+            logger.warning("⚠️ 직접 JSON 파싱 실패, JSON 블록 추출 시도...")
             json_match = re.search(r'```json\s*(\{.*?\})\s*```', gpt_response, re.DOTALL)
             if json_match:
                 json_str = json_match.group(1)
                 analysis_result = json.loads(json_str)
-                print("✅ JSON 블록 추출 및 파싱 성공")
+                logger.info("✅ JSON 블록 추출 및 파싱 성공")
             else:
-                print("❌ JSON 블록 추출 실패, 기본값 사용")
+                logger.error("❌ JSON 블록 추출 실패, 기본값 사용")
                 return create_improved_default_educational_analysis(request, invalid_responses)
         
         # 사용자 순서 정보 추가 (실제 시나리오 ID 사용)
@@ -233,56 +180,83 @@ async def educational_analysis(request: EducationalAnalysisRequest):
         return analysis_result
         
     except OpenAIError as e:
-        print(f"❌ OpenAI API 오류: {e}")
+        logger.error("❌ OpenAI API 오류: %s", e)
         return create_improved_default_educational_analysis(request, invalid_responses)
         
     except json.JSONDecodeError as e:
-        print(f"❌ JSON 파싱 오류: {e}")
-        print(f"파싱 실패한 응답: {gpt_response if 'gpt_response' in locals() else 'N/A'}")
+        logger.error("❌ JSON 파싱 오류: %s", e)
+        logger.warning("파싱 실패한 응답: %s", gpt_response if 'gpt_response' in locals() else 'N/A')
         return create_improved_default_educational_analysis(request, invalid_responses)
         
+    except TenantOverloadedError:
+        raise  # 429로 응답 (main.py 예외 처리기)
     except Exception as e:
-        print(f"❌ 교육 분석 오류: {e}")
+        logger.error("❌ 교육 분석 오류: %s", e)
         return create_improved_default_educational_analysis(request, invalid_responses)
 
 # 힌트 관련 함수들
-def generate_hints_only_prompt(scenarios):
-    """힌트 전용 프롬프트 생성"""
-    
-    prompt = """다음은 카페에서 발생할 수 있는 상황들입니다. 각 상황에 대한 실무에서 바로 사용할 수 있는 고객 응대 힌트를 제공해주세요.
+HINTS_PROMPT = PromptTemplate(
+    "hints",
+    system="""
+    다음에 주어지는 카페에서 발생할 수 있는 상황들에 대해, 실무에서 바로 사용할 수 있는 고객 응대 힌트를 제공해주세요.
 
-【상황 목록】
-"""
-    
-    for i, scenario in enumerate(scenarios):
-        scenario_id = scenario.get('scenarioId')
-        content = scenario.get('scenarioContent', '')
-        tags = scenario.get('scenarioTag', '')
-        prompt += f"{scenario_id}. {content} (태그: {tags})\n"
-    
-    prompt += """
-각 상황별로 현실적이고 실용적인 고객 응대 힌트를 제공해주세요.
-태그에 맞는 상황을 고려하여 구체적인 멘트나 행동 지침을 포함해주세요.
-
-다음 JSON 형식으로만 응답해주세요:
-{
-    "responseHints": {
-"""
-     
-    for i, scenario in enumerate(scenarios):
-        scenario_id = scenario.get('scenarioId')
-        if i == len(scenarios) - 1:
-            prompt += f'        "{scenario_id}": "이 상황에 대한 구체적인 응대 힌트"\n'
-        else:
-            prompt += f'        "{scenario_id}": "이 상황에 대한 구체적인 응대 힌트",\n'
-    
-    prompt += """    }
-}
+    각 상황별로 현실적이고 실용적인 고객 응대 힌트를 제공해주세요.
+    태그에 맞는 상황을 고려하여 구체적인 멘트나 행동 지침을 포함해주세요.
+
+    다음 JSON 형식으로만 응답해주세요 (키는 주어진 시나리오 ID 전부):
+    {
+        "responseHints": {
+            "시나리오ID": "이 상황에 대한 구체적인 응대 힌트",
+            ...
+        }
+    }
+
+    반드시 위의 JSON 형식으로만 응답하고, 다른 설명이나 텍스트는 포함하지 마세요.
+    각 힌트는 실무에서 바로 사용할 수 있도록 구체적이고 실용적으로 작성해주세요.
+    """,
+    request="""
+    【상황 목록】
+    {scenario_lines}
+    응답에 포함할 시나리오 ID: {scenario_ids}
+    """,
+)
+
+def generate_hints_only_prompt(scenarios) -> List[Dict[str, str]]:
+    """힌트 전용 프롬프트 메시지 생성 (고정 지시문 뒤에 요청별 상황 목록)"""
+    scenario_lines = "".join(
+        f"{scenario.get('scenarioId')}. {scenario.get('scenarioContent', '')} (태그: {scenario.get('scenarioTag', '')})\n"
+        for scenario in scenarios
+    )
+    scenario_ids = ", ".join(str(scenario.get('scenarioId')) for scenario in scenarios)
+    return HINTS_PROMPT.render(scenario_lines=scenario_lines, scenario_ids=scenario_ids)
+
+def generate_hints_from_gpt(scenarios) -> Dict[str, str]:
+    """GPT로 여러 시나리오의 힌트를 한 번에 생성 ({시나리오ID: 힌트})"""
+    messages = generate_hints_only_prompt(scenarios)
+
+    response = chat_completion(
+        "hints",
+        messages=messages,
+        temperature=0.7
+    )
 
-반드시 위의 JSON 형식으로만 응답하고, 다른 설명이나 텍스트는 포함하지 마세요.
-각 힌트는 실무에서 바로 사용할 수 있도록 구체적이고 실용적으로 작성해주세요."""
+    gpt_response = response.choices[0].message.content
+    logger.debug("GPT 힌트 응답: %s", gpt_response)
 
-    return prompt
+    try:
+        hints_result = json.loads(gpt_response)
+    except json.JSONDecodeError:
+        logger.warning("파싱 실패한 응답: %s", gpt_response)
+        raise
+
+    return {str(k): v for k, v in hints_result.get("responseHints", {}).items()}
+
+def warm_up_hints_from_catalog() -> int:
+    """시나리오 카탈로그 전체 힌트 사전 생성 (서버 시작 시 / cron)"""
+    if not gpt_available():
+        logger.info("GPT 사용 불가 - 힌트 워밍업 생략")
+        return 0
+    return warm_up_hint_cache(scenario_catalog.as_hint_scenarios(), generate_hints_from_gpt)
 
 def create_default_hints(scenarios):
     """GPT 호출 실패 시 기본 힌트 반환"""
@@ -330,11 +304,8 @@ async def get_gpt_recommended_order_detailed(scenarios_info: str):
     """
     
     try:
-        if not client:
-            raise Exception("OpenAI 클라이언트가 없음")
-            
-        response = client.chat.completions.create(
-            model="gpt-4",
+        response = await chat_completion_async(
+            "recommended_order",
             messages=[{"role": "user", "content": prompt}],
             temperature=0.7
         )
@@ -342,8 +313,10 @@ async def get_gpt_recommended_order_detailed(scenarios_info: str):
         gpt_response = response.choices[0].message.content
         return json.loads(gpt_response)
         
+    except TenantOverloadedError:
+        raise  # 429로 응답 (main.py 예외 처리기)
     except Exception as e:
-        print(f"❌ GPT 추천 순서 생성 실패: {e}")
+        logger.error("❌ GPT 추천 순서 생성 실패: %s", e)
         return {
             "recommendedOrder": [1, 4, 2, 5, 3],
             "priorityCriteria": "매장 운영에 미치는 파급효과와 고객이 직접 체감하는 불편함의 시급성을 종합적으로 고려합니다.",
@@ -423,88 +396,29 @@ def analyze_text_quality(request: EducationalAnalysisRequest, invalid_responses:
     
     return analysis
 
-def generate_educational_analysis_prompt(request: EducationalAnalysisRequest, gpt_recommendation: dict, invalid_responses: List[str]):
-    """교육용 분석 프롬프트 생성 - 실제 시나리오 ID 지원"""
-    
-    # 시간 분석
-    time_analysis = analyze_time_data(request)
-    
-    # 텍스트 길이 분석
-    text_analysis = analyze_text_quality(request, invalid_responses)
-    
-    # 사용자가 선택한 순서를 텍스트로 변환 (1~5 순서 기준)
-    user_order_text = ""
-    for i, scenario_id in enumerate(request.userorder):
-        scenario_info = get_scenario_info_by_id(scenario_id)
-        user_order_text += f"{i+1}순위: {scenario_info['content']} (ID: {scenario_id})\n"
-    
-    # GPT 추천 순서를 텍스트로 변환 (1~5 순서 기준)
-    gpt_order_text = ""
-    for i, position in enumerate(gpt_recommendation.get('recommendedOrder', [])):
-        # position은 1~5 중 하나, 이는 사용자 선택 순서의 인덱스를 의미
-        if position <= len(request.userorder):
-            actual_scenario_id = request.userorder[position - 1]
-            scenario_info = get_scenario_info_by_id(actual_scenario_id)
-            gpt_order_text += f"{i+1}순위: {scenario_info['content']} (ID: {actual_scenario_id})\n"
-    
-    # 각 시나리오별 멘트 (실제 ID 기준)
-    response_texts = ""
-    for i, scenario_id in enumerate(request.userorder, 1):
-        scenario_info = get_scenario_info_by_id(scenario_id)
-        response_text = request.responseTexts.get(str(scenario_id), "")
-        
-        # 무의미한 입력인지 체크
-        is_invalid = str(scenario_id) in invalid_responses
-        invalid_note = " [⚠️ 무의미한 입력]" if is_invalid else ""
-        
-        response_texts += f"시나리오 {i} (ID: {scenario_id}) - {scenario_info['content']}{invalid_note}\n사용자 멘트: '{response_text}'\n\n"
-    
-    # 무의미한 입력에 대한 특별 지침
-    invalid_guidance = ""
-    if invalid_responses:
-        invalid_guidance = f"""
-    
-    【⚠️ 무의미한 입력 감지】
-    시나리오 {', '.join(invalid_responses)}에서 무의미한 입력이 감지되었습니다.
-    해당 시나리오들에 대해서는 "이 시나리오에 대해 의미있는 응답을 작성해주시지 않으셨네요. 실제 고객 상황에서 사용할 수 있는 구체적인 멘트를 작성해보시면 어떨까요?"라는 안내를 포함해주세요.
-    """
-    
-    prompt = f"""
+EDUCATIONAL_PROMPT = PromptTemplate(
+    "educational_analysis",
+    system="""
     카페 시뮬레이션 교육용 분석을 수행해주세요. 점수나 등급 없이 순수 교육적 관점에서 피드백해주세요.
-
-    【GPT 추천 순서】
-    {gpt_order_text}
-    판단 기준: {gpt_recommendation.get('priorityCriteria', '')}
-
-    【사용자 선택 순서】
-    {user_order_text}
-    선택 이유: {request.reason}
-
-    【사용자 응대 멘트】
-    {response_texts}
-
-    【시간 및 참여도 분석】
-    {time_analysis}
-    {text_analysis}
-    {invalid_guidance}
+    함께 주어지는 GPT 추천 순서, 사용자 선택 순서와 이유, 사용자 응대 멘트, 시간 및 참여도 분석을 참고하세요.
 
     사용자가 실제로 작성한 멘트를 기반으로 개별적이고 구체적인 코칭을 제공해주세요.
     각 시나리오별로 사용자의 실제 멘트 내용을 분석하여 맞춤형 개선점을 제시해야 합니다.
 
     다음 JSON 형식으로만 응답해주세요:
-    {{
+    {
         "participationFeedback": "학습 참여도에 대한 피드백 (시간과 텍스트 길이, 무의미한 입력 고려)",
-        "scenarioCoaching": {{
+        "scenarioCoaching": {
             "scenario1": ["사용자 멘트에 대한 구체적 개선점 1", "사용자 멘트에 대한 구체적 개선점 2"],
             "scenario2": ["사용자 멘트에 대한 구체적 개선점 1", "사용자 멘트에 대한 구체적 개선점 2"],
             "scenario3": ["사용자 멘트에 대한 구체적 개선점 1", "사용자 멘트에 대한 구체적 개선점 2"],
             "scenario4": ["사용자 멘트에 대한 구체적 개선점 1", "사용자 멘트에 대한 구체적 개선점 2"],
             "scenario5": ["사용자 멘트에 대한 구체적 개선점 1", "사용자 멘트에 대한 구체적 개선점 2"]
-        }},
+        },
         "orderAnalysis": "사용자 순서에 대한 분석과 개선 방향을 자연스러운 글로 작성",
         "strengths": [
             "강점 1에 대한 상세 설명",
-            "강점 2에 대한 상세 설명", 
+            "강점 2에 대한 상세 설명",
             "강점 3에 대한 상세 설명"
         ],
         "learningDirections": [
@@ -512,7 +426,7 @@ def generate_educational_analysis_prompt(request: EducationalAnalysisRequest, gp
             "학습 방향 2에 대한 구체적 설명",
             "학습 방향 3에 대한 구체적 설명"
         ],
-        "gptOrderDetails": {{
+        "gptOrderDetails": {
             "recommendedOrder": [1, 2, 3, 4, 5 순서 배열],
             "formattedOrderList": [
                 "1순위: 시나리오명",
@@ -521,31 +435,108 @@ def generate_educational_analysis_prompt(request: EducationalAnalysisRequest, gp
                 "4순위: 시나리오명",
                 "5순위: 시나리오명"
             ]
-        }},
-        "gptReasoningDetails": {{
+        },
+        "gptReasoningDetails": {
             "priorityCriteria": "GPT가 순서를 정한 판단 기준",
             "detailedReasoning": "GPT가 이런 순서를 추천하는 상세한 이유와 각 순위별 판단 근거"
-        }}
-    }}
+        }
+    }
 
     **중요**: 각 시나리오 코칭은 반드시 사용자가 실제로 작성한 멘트 내용을 분석하여 개별적으로 작성해야 합니다.
     동일한 피드백을 여러 시나리오에 반복 사용하지 마세요.
     무의미한 입력이 감지된 시나리오에는 적절한 안내 메시지를 포함해주세요.
     코칭 톤: "~하시면 더 좋을 것 같아요", "~해보시는 건 어떨까요" 같은 부드럽고 제안하는 말투
+    """,
+    request="""
+    【GPT 추천 순서】
+    {gpt_order_text}
+    판단 기준: {priority_criteria}
+
+    【사용자 선택 순서】
+    {user_order_text}
+    선택 이유: {reason}
+
+    【사용자 응대 멘트】
+    {response_texts}
+
+    【시간 및 참여도 분석】
+    {time_analysis}
+    {text_analysis}
+    {invalid_guidance}
+    """,
+)
+
+def generate_educational_analysis_prompt(request: EducationalAnalysisRequest, gpt_recommendation: dict, invalid_responses: List[str]) -> List[Dict[str, str]]:
+    """교육용 분석 프롬프트 메시지 생성 - 실제 시나리오 ID 지원"""
+    
+    # 시간 분석
+    time_analysis = analyze_time_data(request)
+    
+    # 텍스트 길이 분석
+    text_analysis = analyze_text_quality(request, invalid_responses)
+    
+    # 사용자 순서의 시나리오 정보를 한 번에 조회
+    scenario_infos = scenario_catalog.get_many(request.userorder)
+
+    # 사용자가 선택한 순서를 텍스트로 변환 (1~5 순서 기준)
+    user_order_text = ""
+    for i, scenario_info in enumerate(scenario_infos):
+        user_order_text += f"{i+1}순위: {scenario_info.content} (ID: {scenario_info.scenario_id})\n"
+    
+    # GPT 추천 순서를 텍스트로 변환 (1~5 순서 기준)
+    gpt_order_text = ""
+    for i, position in enumerate(gpt_recommendation.get('recommendedOrder', [])):
+        # position은 1~5 중 하나, 이는 사용자 선택 순서의 인덱스를 의미
+        if position <= len(request.userorder):
+            scenario_info = scenario_infos[position - 1]
+            gpt_order_text += f"{i+1}순위: {scenario_info.content} (ID: {scenario_info.scenario_id})\n"
+    
+    # 각 시나리오별 멘트 (실제 ID 기준)
+    response_texts = ""
+    for i, scenario_info in enumerate(scenario_infos, 1):
+        scenario_id = scenario_info.scenario_id
+        response_text = request.responseTexts.get(str(scenario_id), "")
+        
+        # 무의미한 입력인지 체크
+        is_invalid = str(scenario_id) in invalid_responses
+        invalid_note = " [⚠️ 무의미한 입력]" if is_invalid else ""
+        
+        response_texts += f"시나리오 {i} (ID: {scenario_id}) - {scenario_info.content}{invalid_note}\n사용자 멘트: '{response_text}'\n\n"
+    
+    # 무의미한 입력에 대한 특별 지침
+    invalid_guidance = ""
+    if invalid_responses:
+        invalid_guidance = f"""
+    
+    【⚠️ 무의미한 입력 감지】
+    시나리오 {', '.join(invalid_responses)}에서 무의미한 입력이 감지되었습니다.
+    해당 시나리오들에 대해서는 "이 시나리오에 대해 의미있는 응답을 작성해주시지 않으셨네요. 실제 고객 상황에서 사용할 수 있는 구체적인 멘트를 작성해보시면 어떨까요?"라는 안내를 포함해주세요.
     """
     
-    return prompt
+    # 입력 토큰 예산을 넘으면 선택 이유 → 응대 멘트 순으로 뒤쪽을 잘라냄
+    return EDUCATIONAL_PROMPT.render_fitted(
+        {
+            "gpt_order_text": gpt_order_text,
+            "priority_criteria": gpt_recommendation.get('priorityCriteria', ''),
+            "user_order_text": user_order_text,
+            "reason": request.reason,
+            "response_texts": response_texts,
+            "time_analysis": time_analysis,
+            "text_analysis": text_analysis,
+            "invalid_guidance": invalid_guidance,
+        },
+        trim_order=("reason", "response_texts"),
+    )
 
 def format_user_order_with_real_ids(userorder: List[int]) -> dict:
     """실제 시나리오 ID를 사용한 사용자 순서 정보 포맷팅"""
     
     formatted_order = []
-    for i, scenario_id in enumerate(userorder):
-        scenario_info = get_scenario_info_by_id(scenario_id)
+    for i, scenario_info in enumerate(scenario_catalog.get_many(userorder)):
         formatted_order.append({
             "priority": i + 1,
-            "scenarioId": scenario_id,
-            "scenarioName": scenario_info['content']
+            "scenarioId": scenario_info.scenario_id,
+            "scenarioName": scenario_info.content
         })
     
     return {
@@ -559,7 +550,7 @@ def create_improved_default_educational_analysis(request: EducationalAnalysisReq
     if invalid_responses is None:
         invalid_responses = get_invalid_responses(request)
     
-    print("⚠️ GPT 분석 실패 - 개선된 기본 분석 사용")
+    logger.warning("⚠️ GPT 분석 실패 - 개선된 기본 분석 사용")
     
     # 참여도 체크 (5초, 5자 기준)
     order_time = request.orderSelectionTime
@@ -631,12 +622,11 @@ def create_improved_default_educational_analysis(request: EducationalAnalysisReq
         learning_directions[1] = "의미있는 문장으로 고객과 소통하는 능력을 기르고, 상황별 커뮤니케이션 스킬을 늘려가보세요"
     
     # GPT 추천 순서를 실제 시나리오 내용으로 변환
+    scenario_infos = scenario_catalog.get_many(request.userorder)
     formatted_order_list = []
     for i, position in enumerate(gpt_order, 1):
         if position <= len(request.userorder):
-            actual_scenario_id = request.userorder[position - 1]
-            scenario_info = get_scenario_info_by_id(actual_scenario_id)
-            formatted_order_list.append(f"{i}순위: {scenario_info['content']}")
+            formatted_order_list.append(f"{i}순위: {scenario_infos[position - 1].content}")
     
     return {
         "userOrder": format_user_order_with_real_ids(request.userorder),
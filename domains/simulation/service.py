@@ -0,0 +1,112 @@
+# domains/simulation/service.py
+# 시뮬레이션 도메인 비즈니스 로직 (힌트 캐시 등)
+
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config.settings import HINT_CACHE_TTL_SECONDS, HINT_WARMUP_BATCH_SIZE
+from core.metrics import record_cache
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _scenario_fingerprint(scenario: Dict[str, Any]) -> str:
+    """시나리오 내용이 바뀌면 캐시가 무효화되도록 내용+태그를 지문으로 사용"""
+    return f"{scenario.get('scenarioContent', '')}|{scenario.get('scenarioTag', '')}"
+
+
+class HintCache:
+    """시나리오 ID별 응대 힌트 캐시"""
+
+    def __init__(self, ttl_seconds: int = HINT_CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[str, str, float]] = {}  # id -> (지문, 힌트, 만료시각)
+        self._lock = threading.Lock()
+
+    def lookup(self, scenarios: List[Dict[str, Any]]) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+        """캐시 적중 힌트와 캐시에 없는 시나리오 목록을 함께 반환"""
+        hits = {}
+        misses = []
+        now = time.time()
+        with self._lock:
+            for scenario in scenarios:
+                scenario_id = str(scenario.get('scenarioId'))
+                entry = self._entries.get(scenario_id)
+                if entry and entry[0] == _scenario_fingerprint(scenario) and entry[2] > now:
+                    hits[scenario_id] = entry[1]
+                else:
+                    misses.append(scenario)
+        return hits, misses
+
+    def store(self, scenarios: List[Dict[str, Any]], hints: Dict[str, str]):
+        """GPT가 생성한 힌트를 시나리오 ID별로 저장"""
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            for scenario in scenarios:
+                scenario_id = str(scenario.get('scenarioId'))
+                hint = hints.get(scenario_id)
+                if hint:
+                    self._entries[scenario_id] = (_scenario_fingerprint(scenario), hint, expires_at)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+hint_cache = HintCache()
+
+
+def get_hints_with_cache(
+    scenarios: List[Dict[str, Any]],
+    generate_hints: Optional[Callable[[List[Dict[str, Any]]], Dict[str, str]]],
+    default_hints: Callable[[List[Dict[str, Any]]], Dict[str, str]],
+    cached: Optional[Tuple[Dict[str, str], List[Dict[str, Any]]]] = None,
+) -> Dict[str, str]:
+    """캐시에 없는 시나리오만 한 번의 GPT 요청으로 생성하고 캐시 결과와 병합
+    (generate_hints가 None이면 GPT 없이 캐시에 없는 시나리오는 기본 힌트,
+    cached: 호출 측에서 이미 구한 hint_cache.lookup 결과 → 같은 요청에서 다시 조회하지 않음)"""
+    hits, misses = cached if cached is not None else hint_cache.lookup(scenarios)
+    record_cache("hints", len(hits), len(misses))
+    logger.info("힌트 캐시: 적중 %s개, 미적중 %s개", len(hits), len(misses))
+
+    generated = {}
+    if misses:
+        if generate_hints is not None:
+            try:
+                generated = generate_hints(misses)
+                hint_cache.store(misses, generated)
+            except Exception as e:
+                logger.error("❌ 힌트 생성 오류: %s", e)
+
+        # GPT가 누락한 시나리오는 기본 힌트로 채움 (캐시에는 저장하지 않음)
+        missing = [s for s in misses if not generated.get(str(s.get('scenarioId')))]
+        if missing:
+            generated.update(default_hints(missing))
+
+    merged = {}
+    for scenario in scenarios:
+        scenario_id = str(scenario.get('scenarioId'))
+        merged[scenario_id] = hits.get(scenario_id) or generated.get(scenario_id, "")
+    return merged
+
+
+def warm_up_hint_cache(
+    scenarios: List[Dict[str, Any]],
+    generate_hints: Callable[[List[Dict[str, Any]]], Dict[str, str]],
+    batch_size: int = HINT_WARMUP_BATCH_SIZE,
+) -> int:
+    """카탈로그 전체 힌트를 미리 생성해 캐시에 채움 (서버 시작 시 또는 cron)"""
+    _, misses = hint_cache.lookup(scenarios)
+    warmed = 0
+    for start in range(0, len(misses), batch_size):
+        batch = misses[start:start + batch_size]
+        try:
+            hints = generate_hints(batch)
+        except Exception as e:
+            logger.error("❌ 힌트 워밍업 실패 (%s~%s): %s", start, start + len(batch), e)
+            continue
+        hint_cache.store(batch, hints)
+        warmed += sum(1 for s in batch if hints.get(str(s.get('scenarioId'))))
+    logger.info("✅ 힌트 워밍업 완료: %s/%s개", warmed, len(scenarios))
+    return warmed
@@ -0,0 +1,217 @@
+# loadtest/run_load.py
+# 로컬 스텁(OpenAI, 메뉴얼 백엔드)을 띄운 상태에서 앱에 혼합 트래픽을 보내고
+# 동시성 단계별로 라우트마다 처리량, p50/p95/p99, 오류율을 출력한다.
+#
+#   python -m loadtest.run_load --spawn                    # 스텁 2개 + 앱을 직접 띄워서 실행
+#   python -m loadtest.run_load --target http://127.0.0.1:5000 --concurrency 1,4,16,32 --duration 30
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.fixtures import make_deck, make_video
+
+# (라우트 라벨, 가중치)
+DEFAULT_MIX = {
+    "/submit-answer": 2,
+    "/generate-question/{manual_id}": 2,
+    "/simulation/get-hints": 4,
+    "/simulation/educational-analysis": 2,
+    "/api/upload-ppt": 1,
+    "/api/generate-quiz": 1,
+}
+
+SCENARIO_IDS = [144, 132, 162, 154, 112]
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+class Traffic:
+    """라우트별 요청 생성기"""
+
+    def __init__(self, video_path: str, deck_path: str):
+        with open(video_path, "rb") as f:
+            self.video = f.read()
+        with open(deck_path, "rb") as f:
+            self.deck = f.read()
+
+    async def send(self, client: httpx.AsyncClient, route: str) -> httpx.Response:
+        if route == "/submit-answer":
+            return await client.post(
+                "/submit-answer",
+                files={"video": ("answer.mp4", self.video, "video/mp4")},
+                data={"question": "상황 설명 : 고객이 주문한 음료가 다르다고 합니다.", "manual_id": "1", "criteria_id": "1"},
+            )
+        if route == "/generate-question/{manual_id}":
+            return await client.get(f"/generate-question/{random.randint(1, 20)}")
+        if route == "/simulation/get-hints":
+            scenarios = [
+                {"scenarioId": sid, "scenarioContent": f"시나리오 {sid}", "scenarioTag": "고객클레임"}
+                for sid in random.sample(range(100, 200), 5)
+            ]
+            return await client.post("/simulation/get-hints", json={"scenarios": scenarios, "task": "generate_hints_only"})
+        if route == "/simulation/educational-analysis":
+            order = random.sample(SCENARIO_IDS, len(SCENARIO_IDS))
+            return await client.post("/simulation/educational-analysis", json={
+                "userid": f"user{random.randint(1, 500)}",
+                "companyid": random.randint(1, 10),
+                "userorder": order,
+                "reason": "매장 운영에 영향이 큰 상황부터 처리했습니다.",
+                "responseTexts": {str(sid): "고객님 불편을 드려 죄송합니다. 바로 확인해 드리겠습니다." for sid in order},
+                "hints": {},
+                "orderSelectionTime": random.randint(10, 120),
+                "reasonWritingTime": random.randint(10, 200),
+                "totalTimeSpent": random.randint(60, 600),
+            })
+        if route == "/api/upload-ppt":
+            return await client.post(
+                "/api/upload-ppt",
+                files={"file": ("deck.pptx", self.deck, "application/vnd.openxmlformats-officedocument.presentationml.presentation")},
+            )
+        if route == "/api/generate-quiz":
+            return await client.post("/api/generate-quiz", json={"text": "고객 응대 기본 절차와 음료 제조 위생 수칙 " * 50})
+        raise ValueError(route)
+
+
+async def run_step(target: str, traffic: Traffic, mix: dict, concurrency: int, duration: float, timeout: float) -> dict:
+    """동시성 concurrency로 duration초 동안 혼합 트래픽 전송"""
+    routes = list(mix.keys())
+    weights = list(mix.values())
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(base_url=target, timeout=timeout) as client:
+        async def worker():
+            while time.perf_counter() < deadline:
+                route = random.choices(routes, weights)[0]
+                started = time.perf_counter()
+                try:
+                    response = await traffic.send(client, route)
+                    ok = response.status_code < 400
+                except httpx.HTTPError:
+                    ok = False
+                latencies[route].append(time.perf_counter() - started)
+                if not ok:
+                    errors[route] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    report = {}
+    for route in routes:
+        samples = latencies[route]
+        report[route] = {
+            "requests": len(samples),
+            "throughput_rps": len(samples) / elapsed,
+            "p50_s": _percentile(samples, 0.50),
+            "p95_s": _percentile(samples, 0.95),
+            "p99_s": _percentile(samples, 0.99),
+            "mean_s": statistics.fmean(samples) if samples else 0.0,
+            "error_rate": errors[route] / len(samples) if samples else 0.0,
+        }
+    return report
+
+
+def _spawn(args) -> list:
+    """스텁 2개와 앱을 하위 프로세스로 실행"""
+    python = sys.executable
+    procs = [
+        subprocess.Popen([python, "-m", "loadtest.stub_openai", "--port", str(args.openai_port),
+                          "--latency-ms", str(args.openai_latency_ms), "--error-rate", str(args.openai_error_rate)]),
+        subprocess.Popen([python, "-m", "loadtest.stub_backend", "--port", str(args.backend_port)]),
+    ]
+    env = dict(
+        os.environ,
+        OPENAI_API_KEY="stub",
+        OPENAI_BASE_URL=f"http://127.0.0.1:{args.openai_port}/v1",
+        BACKEND_BASE_URL=f"http://127.0.0.1:{args.backend_port}",
+        HINT_WARMUP_ON_STARTUP="0",
+    )
+    port = args.target.rsplit(":", 1)[-1]
+    procs.append(subprocess.Popen(
+        [python, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", port, "--log-level", "warning"], env=env,
+    ))
+    return procs
+
+
+async def _wait_ready(target: str, timeout: float = 120):
+    deadline = time.perf_counter() + timeout
+    async with httpx.AsyncClient(base_url=target, timeout=2) as client:
+        while time.perf_counter() < deadline:
+            try:
+                await client.get("/metrics")
+                return
+            except httpx.HTTPError:
+                await asyncio.sleep(0.5)
+    raise RuntimeError(f"앱이 {timeout}초 안에 뜨지 않았습니다: {target}")
+
+
+def print_report(concurrency: int, report: dict):
+    print(f"\n=== 동시성 {concurrency} ===")
+    print(f"{'라우트':<36} {'요청':>6} {'RPS':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'오류율':>7}")
+    for route, r in report.items():
+        print(f"{route:<36} {r['requests']:>6} {r['throughput_rps']:>7.2f} {r['p50_s']:>7.2f} "
+              f"{r['p95_s']:>7.2f} {r['p99_s']:>7.2f} {r['error_rate']:>7.1%}")
+
+
+async def main_async(args) -> dict:
+    await _wait_ready(args.target)
+    mix = json.loads(args.mix) if args.mix else DEFAULT_MIX
+    traffic = Traffic(make_video(args.video_seconds, 640, 360, "mp4"), make_deck(args.deck_slides))
+    results = {}
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        report = await run_step(args.target, traffic, mix, concurrency, args.duration, args.timeout)
+        print_report(concurrency, report)
+        results[concurrency] = report
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="엔드투엔드 부하 테스트")
+    parser.add_argument("--target", default="http://127.0.0.1:5000")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="쉼표로 구분한 동시성 단계")
+    parser.add_argument("--duration", type=float, default=30, help="단계별 실행 시간(초)")
+    parser.add_argument("--timeout", type=float, default=120, help="요청 타임아웃(초)")
+    parser.add_argument("--mix", help='라우트별 가중치 JSON (예: \'{"/simulation/get-hints": 1}\')')
+    parser.add_argument("--video-seconds", type=int, default=10)
+    parser.add_argument("--deck-slides", type=int, default=30)
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--spawn", action="store_true", help="스텁과 앱을 직접 실행")
+    parser.add_argument("--openai-port", type=int, default=9100)
+    parser.add_argument("--openai-latency-ms", type=float, default=1500)
+    parser.add_argument("--openai-error-rate", type=float, default=0.0)
+    parser.add_argument("--backend-port", type=int, default=9000)
+    args = parser.parse_args()
+
+    procs = _spawn(args) if args.spawn else []
+    try:
+        results = asyncio.run(main_async(args))
+    finally:
+        for proc in procs:
+            proc.terminate()
+        for proc in procs:
+            proc.wait()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
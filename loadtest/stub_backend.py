@@ -0,0 +1,50 @@
+# loadtest/stub_backend.py
+# 메뉴얼/평가 기준 백엔드 스텁 (GET /api/manuals/{id}, GET /api/criteria/{id})
+#
+#   python -m loadtest.stub_backend --port 9000 --latency-ms 30 --manual-chars 4000
+#   앱 실행 시: BACKEND_BASE_URL=http://127.0.0.1:9000
+
+import argparse
+import asyncio
+import random
+
+import uvicorn
+from fastapi import FastAPI
+
+app = FastAPI()
+config = {"latency_ms": 30.0, "manual_chars": 4000}
+
+_MANUAL_LINE = "고객이 매장에 들어오면 밝게 인사하고, 주문을 정확히 복창한 뒤 결제를 안내합니다. "
+_CRITERIA = "친절도, 문제해결능력, 소통능력, 전문성, 감정조절, 태도를 각 5점 만점으로 평가합니다."
+
+
+async def _delay():
+    await asyncio.sleep(random.uniform(0.5, 1.5) * config["latency_ms"] / 1000)
+
+
+@app.get("/api/manuals/{manual_id}")
+async def get_manual(manual_id: int):
+    await _delay()
+    repeat = config["manual_chars"] // len(_MANUAL_LINE) + 1
+    return {"id": manual_id, "content": (f"[매뉴얼 {manual_id}] " + _MANUAL_LINE * repeat)[:config["manual_chars"]]}
+
+
+@app.get("/api/criteria/{criteria_id}")
+async def get_criteria(criteria_id: int):
+    await _delay()
+    return {"id": criteria_id, "guideline": _CRITERIA}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="메뉴얼/평가 기준 백엔드 스텁")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=config["latency_ms"])
+    parser.add_argument("--manual-chars", type=int, default=config["manual_chars"])
+    args = parser.parse_args()
+    config.update(latency_ms=args.latency_ms, manual_chars=args.manual_chars)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# loadtest/stub_openai.py
+# OpenAI 호환 스텁 서버 (POST /v1/chat/completions)
+# 프롬프트 내용을 보고 호출 지점별로 형식이 맞는 응답을 돌려주며, 지연/오류 분포를 설정할 수 있다.
+#
+#   python -m loadtest.stub_openai --port 9100 --latency-ms 1500 --latency-dist lognormal --error-rate 0.02
+#   앱 실행 시: OPENAI_BASE_URL=http://127.0.0.1:9100/v1 OPENAI_API_KEY=stub
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+app = FastAPI()
+config = {
+    "latency_ms": 1500.0,
+    "latency_dist": "lognormal",  # fixed / uniform / lognormal
+    "latency_sigma": 0.5,
+    "error_rate": 0.0,
+    "completion_tokens": 400,
+}
+
+
+def _sample_latency() -> float:
+    mean = config["latency_ms"] / 1000
+    dist = config["latency_dist"]
+    if dist == "fixed":
+        return mean
+    if dist == "uniform":
+        return random.uniform(0, 2 * mean)
+    sigma = config["latency_sigma"]
+    # 평균이 mean이 되도록 mu 보정
+    return random.lognormvariate(math.log(max(mean, 1e-6)) - sigma ** 2 / 2, sigma)
+
+
+def _filler(tokens: int) -> str:
+    return " ".join(random.choice(["고객님", "응대", "친절하게", "안내", "확인", "음료", "죄송합니다"]) for _ in range(tokens))
+
+
+def hint_ids(prompt: str) -> list:
+    """힌트 프롬프트의 "응답에 포함할 시나리오 ID: 1, 2, 3" 줄에서 ID 목록 추출"""
+    match = re.search(r"응답에 포함할 시나리오 ID:\s*([^\n]*)", prompt)
+    if not match:
+        return []
+    return [i.strip() for i in match.group(1).split(",") if i.strip()]
+
+
+def _build_content(prompt: str) -> str:
+    """프롬프트 내용으로 호출 지점을 추정해 앱이 파싱할 수 있는 응답 생성"""
+    if "responseHints" in prompt:
+        ids = hint_ids(prompt)
+        if not ids:
+            # 프롬프트 형식이 바뀌어 ID를 못 찾으면 앱이 기본 힌트로 대체해 부하 결과가 의미 없어짐
+            print("⚠️ 힌트 프롬프트에서 시나리오 ID를 찾지 못함 (HINTS_PROMPT 형식 확인)")
+        return json.dumps({"responseHints": {i: _filler(20) for i in ids}}, ensure_ascii=False)
+    if "participationFeedback" in prompt:
+        return json.dumps({
+            "participationFeedback": _filler(40),
+            "scenarioCoaching": {f"scenario{i}": [_filler(15), _filler(15)] for i in range(1, 6)},
+            "orderAnalysis": _filler(60),
+            "strengths": [_filler(20) for _ in range(3)],
+            "learningDirections": [_filler(20) for _ in range(3)],
+            "gptOrderDetails": {"recommendedOrder": [1, 4, 2, 5, 3], "formattedOrderList": [f"{i}순위: 시나리오" for i in range(1, 6)]},
+            "gptReasoningDetails": {"priorityCriteria": _filler(20), "detailedReasoning": _filler(60)},
+        }, ensure_ascii=False)
+    if "recommendedOrder" in prompt:
+        order = [1, 2, 3, 4, 5]
+        random.shuffle(order)
+        return json.dumps({"recommendedOrder": order, "priorityCriteria": _filler(20), "detailedReasoning": _filler(60)}, ensure_ascii=False)
+    if "객관식" in prompt:
+        return json.dumps([
+            {"question": f"{_filler(8)}?", "options": [_filler(3) for _ in range(4)], "answer_index": random.randint(0, 3)}
+            for _ in range(5)
+        ], ensure_ascii=False)
+    if "상황 설명" in prompt and "[답변]" not in prompt:
+        return f"상황 설명 : {_filler(25)}"
+    # 피드백 채점
+    scores = "\n".join(f"- {c}: {random.choice([3.0, 3.5, 4.0, 4.5, 5.0])}" for c in ["친절도", "문제해결능력", "소통능력", "전문성", "감정조절", "태도"])
+    return f"{scores}\n- 총평: {_filler(config['completion_tokens'] // 4)}"
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+
+    await asyncio.sleep(_sample_latency())
+    if random.random() < config["error_rate"]:
+        return JSONResponse(status_code=500, content={"error": {"message": "stub error", "type": "server_error"}})
+
+    content = _build_content(prompt)
+    prompt_tokens = len(prompt) // 2
+    completion_tokens = len(content) // 2
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI 호환 스텁 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=config["latency_ms"])
+    parser.add_argument("--latency-dist", choices=["fixed", "uniform", "lognormal"], default=config["latency_dist"])
+    parser.add_argument("--latency-sigma", type=float, default=config["latency_sigma"])
+    parser.add_argument("--error-rate", type=float, default=config["error_rate"])
+    parser.add_argument("--completion-tokens", type=int, default=config["completion_tokens"])
+    args = parser.parse_args()
+    config.update(
+        latency_ms=args.latency_ms, latency_dist=args.latency_dist, latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate, completion_tokens=args.completion_tokens,
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,72 @@
 #FastAPI 서버 실행부 (router 등록만)
-from fastapi import FastAPI
+import asyncio
+import time
+import uuid
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse
+import os
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+from starlette.routing import Match
+from config.settings import (
+    HINT_WARMUP_ON_STARTUP,
+    SCRATCH_SWEEP_INTERVAL_SECONDS,
+    SCRATCH_WAIT_SECONDS,
+)
+from core.structured_logging import request_id, setup_logging
+
+setup_logging()  # 라우터 모듈 import 중 남기는 로그도 큐 핸들러로 보내기 위해 가장 먼저 설정
+
 from domains.evaluation.router import router as eval_router
-from domains.simulation.router import router as simulation_router
+from domains.simulation.router import router as simulation_router, warm_up_hints_from_catalog
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes import upload
 from app.routes import gpt_quiz
+from core.metrics import REQUEST_LATENCY, REQUESTS_IN_FLIGHT, current_route
+from core import model_registry, profiler
+from core.admin_auth import require_admin
+from core.request_usage import RequestLimitExceeded, RequestUsage, current_usage
+from core.work_broker import AnalysisTimeoutError
+from core.scratch import ScratchQuotaError, scratch
+from core.fair_scheduler import TenantOverloadedError, current_tenant, resolve_tenant
+from core.structured_logging import get_logger
+
+logger = get_logger(__name__)
+_background_tasks = set()
+
+
+def _run_in_background(fn):
+    task = asyncio.create_task(asyncio.to_thread(fn))
+    _background_tasks.add(task)  # 참조를 유지해야 작업이 중간에 GC되지 않음
+    task.add_done_callback(_background_tasks.discard)
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())  # 실패는 각 함수에서 이미 로그로 남김
+
+
+async def _sweep_scratch_periodically():
+    """죽은 워커/예외로 남은 임시 작업 디렉터리를 주기적으로 정리"""
+    while True:
+        try:
+            await asyncio.to_thread(scratch.sweep)
+        except Exception as e:
+            logger.error("❌ 임시 작업 디렉터리 정리 실패: %s", e)
+        await asyncio.sleep(SCRATCH_SWEEP_INTERVAL_SECONDS)
 
-app = FastAPI()
+
+# 서버 시작 단계: import 시점이 아니라 여기서 모델 로드 / 힌트 캐시 워밍업
+# 모델 로드는 백그라운드로 진행하고, 끝나기 전까지 /readyz는 503을 반환
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    for route in app.routes:
+        logger.debug("%s  ⮕  %s", route.path, route.name)
+    _run_in_background(model_registry.load_models)
+    if HINT_WARMUP_ON_STARTUP:
+        _run_in_background(warm_up_hints_from_catalog)
+    sweeper = asyncio.create_task(_sweep_scratch_periodically())
+    yield
+    sweeper.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
 # /analyze/evaluation 경로에 API 연결
 app.include_router(eval_router) # prefix 날렸음
 app.include_router(simulation_router, prefix="/simulation")  # 🔥 추가
@@ -22,16 +82,148 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 브라우저에서 요청 ID / 자원 사용량 헤더를 읽을 수 있도록
+    expose_headers=[
+        "X-Request-ID", "X-Profile-ID", "X-Usage-Wall-Ms", "X-Usage-CPU-Ms", "X-Usage-Peak-RSS-Bytes",
+        "X-Usage-Scratch-Bytes", "X-Usage-Frames", "X-Usage-Audio-Seconds",
+    ],
 )
 
 app.include_router(upload.router, prefix="/api")
 app.include_router(gpt_quiz.router, prefix="/api")
-print("라우터 경로 목록:")
-for route in app.routes:
-    print(f"{route.path}  ⮕  {route.name}")
 
 
-# main.py 맨 아래 추가
+# 임시 저장 공간이 부족하면 (대기 후에도) 요청을 거절하고 재시도를 유도
+@app.exception_handler(ScratchQuotaError)
+async def scratch_quota_exceeded(request: Request, exc: ScratchQuotaError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"요청이 많아 잠시 후 다시 시도해 주세요: {exc}"},
+        headers={"Retry-After": str(int(SCRATCH_WAIT_SECONDS))},
+    )
+
+
+# 영상 길이/프레임 수/오디오 길이가 요청별 상한을 넘으면 분석을 중단하고 413
+@app.exception_handler(RequestLimitExceeded)
+async def request_limit_exceeded(request: Request, exc: RequestLimitExceeded):
+    return JSONResponse(
+        status_code=413,
+        content={"detail": f"업로드한 파일이 허용된 처리 한도를 넘습니다: {exc}", "limit": exc.limit},
+    )
+
+
+# 분석 노드가 제시간에 결과를 내지 못하면 (노드 부족/장애) 재시도를 유도
+@app.exception_handler(AnalysisTimeoutError)
+async def analysis_timed_out(request: Request, exc: AnalysisTimeoutError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": f"분석 서비스가 일시적으로 지연되고 있습니다: {exc}"},
+        headers={"Retry-After": "30"},
+    )
+
+
+# 테넌트별 대기열이 가득 차면 해당 테넌트에만 429 (다른 회사 요청은 계속 처리)
+@app.exception_handler(TenantOverloadedError)
+async def tenant_overloaded(request: Request, exc: TenantOverloadedError):
+    return JSONResponse(
+        status_code=429,
+        content={"detail": f"요청이 몰려 잠시 후 다시 시도해 주세요: {exc}"},
+        headers={"Retry-After": "5"},
+    )
+
+
+def _route_template(request: Request) -> str:
+    """/generate-question/3 → /generate-question/{manual_id} (지표 라벨 폭증 방지)"""
+    for route in request.app.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return route.path
+    return "unmatched"
+
+
+# 라우트별 처리 시간 / 동시 처리 수 기록 + 요청 ID 부여
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    route = _route_template(request)
+    if route in ("/metrics", "/healthz", "/readyz"):
+        return await call_next(request)
+
+    rid = request.headers.get("X-Request-ID") or uuid.uuid4().hex
+    rid_token = request_id.set(rid)
+    tenant_token = current_tenant.set(resolve_tenant(request.headers.get("X-Company-ID")))
+    token = current_route.set(route)
+    # 선택된 요청만 프로파일링 (스트리밍 응답은 응답 헤더를 보낼 때까지만 포함)
+    profile = profiler.start(rid, route) if profiler.should_profile(request.headers) else None
+    profile_token = profiler.current_profile.set(profile)
+    usage = RequestUsage()
+    usage_token = current_usage.set(usage)
+    in_flight = REQUESTS_IN_FLIGHT.labels(route)
+    in_flight.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        response.headers["X-Request-ID"] = rid
+        response.headers.update(usage.headers())
+        if profile is not None:
+            response.headers["X-Profile-ID"] = rid
+        return response
+    finally:
+        in_flight.dec()
+        REQUEST_LATENCY.labels(route, request.method, str(status)).observe(time.perf_counter() - started)
+        profiler.current_profile.reset(profile_token)
+        current_usage.reset(usage_token)
+        usage.observe(route)
+        if profile is not None:
+            await asyncio.to_thread(profiler.finish, profile)
+        current_route.reset(token)
+        request_id.reset(rid_token)
+        current_tenant.reset(tenant_token)
+
+
+# Prometheus 수집 엔드포인트 (serve.py 다중 워커 실행 시 모든 워커 지표를 합산)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+# 저장된 요청 프로파일 목록 / 다운로드 (collapsed stack 형식)
+@app.get("/admin/profiles", include_in_schema=False)
+async def list_request_profiles(request: Request):
+    require_admin(request)
+    return {"profiles": await asyncio.to_thread(profiler.list_profiles)}
+
+
+@app.get("/admin/profiles/{profile_id}", include_in_schema=False)
+async def download_request_profile(profile_id: str, request: Request):
+    require_admin(request)
+    path = profiler.path_for(profile_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="프로파일이 없습니다.")
+    return FileResponse(path, media_type="text/plain", filename=os.path.basename(path))
+
+# liveness: 프로세스가 살아 있으면 200
+@app.get("/healthz", include_in_schema=False)
+async def healthz():
+    return {"status": "ok"}
+
+
+# readiness: 모델 로드/워밍업이 끝나야 200 (그 전에는 로드밸런서가 트래픽을 보내지 않도록 503)
+@app.get("/readyz", include_in_schema=False)
+async def readyz():
+    if model_registry.is_ready():
+        return {"status": "ready"}
+    error = model_registry.load_error()
+    detail = f"모델 로드 실패: {error}" if error else "모델 로드 중"
+    return Response(content=detail, status_code=503, media_type="text/plain; charset=utf-8")
+
+
+# main.py 맨 아래 추가 (개발용 단일 프로세스 실행, 운영은 python serve.py)
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=5000, reload=True)
\ No newline at end of file
+    from config.settings import SERVER_HOST, SERVER_PORT, DEV_RELOAD
+    uvicorn.run("main:app", host=SERVER_HOST, port=SERVER_PORT, reload=DEV_RELOAD)
\ No newline at end of file
@@ -0,0 +1,154 @@
+# 운영용 서버 실행부: 모델을 부모 프로세스에서 한 번 로드한 뒤 워커를 fork
+# 워커들은 읽기 전용 모델 가중치를 copy-on-write로 공유하므로 워커 수가 늘어도 전체 메모리가 선형으로 늘지 않는다.
+#
+#   WEB_WORKERS=4 WORKER_MAX_REQUESTS=1000 python serve.py
+#
+# - 워커는 WORKER_MAX_REQUESTS(+지터)건 처리 후 스스로 종료하고, 부모가 새 워커를 fork (메모리 증가 억제)
+# - PROMETHEUS_MULTIPROC_DIR 을 사용해 /metrics 가 모든 워커의 지표를 합쳐서 보여줌
+# - 개발 중에는 기존처럼 python main.py (자동 리로드, 단일 프로세스)
+
+import gc
+import os
+import random
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+from config.settings import (
+    HINT_WARMUP_ON_STARTUP,
+    SERVER_HOST,
+    SERVER_PORT,
+    WEB_WORKERS,
+    WORKER_MAX_REQUESTS,
+    WORKER_MAX_REQUESTS_JITTER,
+    WORKER_MEMORY_REPORT_SECONDS,
+)
+
+# prometheus_client가 import되기 전에 설정해야 워커별 지표 파일을 공유 디렉터리에 기록함
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "growkit-prometheus"))
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+import psutil  # noqa: E402
+import uvicorn  # noqa: E402
+from prometheus_client import multiprocess  # noqa: E402
+
+from core import model_registry  # noqa: E402
+from core.structured_logging import get_logger  # noqa: E402
+from domains.simulation.router import warm_up_hints_from_catalog  # noqa: E402
+from main import app  # noqa: E402
+
+logger = get_logger("serve")
+_workers = {}  # pid -> 워커 번호
+_stopping = False
+
+
+def _bind_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((SERVER_HOST, SERVER_PORT))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(sock: socket.socket, worker_no: int):
+    """fork된 자식 프로세스: 공유 소켓으로 uvicorn 실행 후 종료"""
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    random.seed()
+    max_requests = WORKER_MAX_REQUESTS + random.randint(0, WORKER_MAX_REQUESTS_JITTER) if WORKER_MAX_REQUESTS else None
+    config = uvicorn.Config(app, limit_max_requests=max_requests, log_level="warning", access_log=False)
+    server = uvicorn.Server(config)
+    logger.info("워커 %s 시작 (pid=%s, 최대 요청 %s)", worker_no, os.getpid(), max_requests)
+    server.run(sockets=[sock])
+    os._exit(0)
+
+
+def _spawn(sock: socket.socket, worker_no: int):
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _run_worker(sock, worker_no)
+        finally:
+            os._exit(1)
+    _workers[pid] = worker_no
+
+
+def _report_memory():
+    """워커 전체 RSS / PSS(공유 페이지를 나눠 계산한 실제 점유량) 로그"""
+    total_rss = total_pss = 0
+    for pid in list(_workers):
+        try:
+            info = psutil.Process(pid).memory_full_info()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        total_rss += info.rss
+        total_pss += getattr(info, "pss", info.rss)
+    parent = psutil.Process().memory_info().rss
+    logger.info(
+        "메모리: 부모 RSS %.0fMB, 워커 %s개 RSS 합 %.0fMB, PSS 합 %.0fMB",
+        parent / 2**20, len(_workers), total_rss / 2**20, total_pss / 2**20,
+    )
+
+
+def _stop(signum, frame):
+    global _stopping
+    _stopping = True
+    for pid in list(_workers):
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+
+def main():
+    sock = _bind_socket()
+
+    # 부모에서 모델 로드 (워밍업 추론은 추론 스레드 풀이 fork 전에 생기지 않도록 워커에서 수행)
+    model_registry.load_models(warmup=False)
+
+    # 힌트 캐시도 부모에서 채워 두면 워커들이 그대로 물려받음 (워커마다 GPT로 다시 생성하지 않도록)
+    if HINT_WARMUP_ON_STARTUP:
+        warm_up_hints_from_catalog()
+
+    # 이후 생성되는 객체만 GC 대상으로 → 워커에서 GC가 공유 페이지를 건드려 복사되는 것을 줄임
+    gc.collect()
+    gc.freeze()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    for worker_no in range(WEB_WORKERS):
+        _spawn(sock, worker_no)
+    logger.info("✅ 서버 시작: http://%s:%s (워커 %s개)", SERVER_HOST, SERVER_PORT, WEB_WORKERS)
+
+    next_report = time.monotonic() + WORKER_MEMORY_REPORT_SECONDS
+    while _workers:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            time.sleep(0.5)
+            if time.monotonic() >= next_report:
+                _report_memory()
+                next_report = time.monotonic() + WORKER_MEMORY_REPORT_SECONDS
+            continue
+
+        worker_no = _workers.pop(pid, None)
+        multiprocess.mark_process_dead(pid)
+        if worker_no is None or _stopping:
+            continue
+        logger.info("워커 %s 종료 (pid=%s, status=%s) → 재시작", worker_no, pid, status)
+        _spawn(sock, worker_no)
+
+    sock.close()
+    logger.info("서버 종료")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+# core/answer_screen.py 규칙 선별 + 이를 그대로 쓰는 공개 도우미
+# (is_meaningless / validate_response_text): 어떤 입력을 받고 어떤 입력을 거르는지 고정
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from core.answer_screen import rule_reason  # noqa: E402
+
+VALID = [
+    "안녕하세요, 주문하신 음료 바로 준비해 드리겠습니다.",
+    "고객님 불편을 드려 죄송합니다. 바로 확인해 드리겠습니다.",
+    "네 알겠습니다",
+    "시청해주셔서 감사합니다. 오늘 고객님께서 주문하신 음료는 아이스 아메리카노 두 잔과 카페라떼 한 잔입니다.",  # 40자 이상
+    "감사합니다 다시 한번 확인해 드릴게요 감사합니다",
+]
+
+INVALID = [
+    ("", "too_short"),
+    ("    ", "too_short"),
+    ("네네", "too_short"),
+    ("ㄱㄴㄷㄹㅁ", "jamo_only"),
+    ("ㅋㅋㅋ ㅎㅎㅎ", "jamo_only"),
+    ("aaaaaa", "repeated"),
+    ("12345", "no_words"),
+    ("123 456", "no_words"),
+    ("?!?!?!", "no_words"),
+    ("시청해주셔서 감사합니다", "stt_noise"),
+    ("구독과 좋아요 부탁드려요", "stt_noise"),
+    ("안안안안녕", "repeated"),
+    ("감사합니다 감사합니다 감사합니다 감사합니다 감사합니다 감사합니다", "repeated"),
+]
+
+
+@pytest.mark.parametrize("text", VALID)
+def test_rule_reason_accepts(text):
+    assert rule_reason(text) is None
+
+
+@pytest.mark.parametrize("text,reason", INVALID)
+def test_rule_reason_rejects(text, reason):
+    assert rule_reason(text) == reason
+
+
+def test_rule_reason_min_chars():
+    assert rule_reason("좋아요", min_chars=3) is None
+    assert rule_reason("좋아요", min_chars=5) == "too_short"
+
+
+def test_rule_reason_none_text():
+    assert rule_reason(None) == "too_short"
+
+
+@pytest.mark.parametrize("text", VALID)
+def test_public_helpers_accept(text):
+    gpt_engine = pytest.importorskip("core.gpt_engine")
+    simulation = pytest.importorskip("domains.simulation.router")
+    assert not gpt_engine.is_meaningless(text)
+    assert simulation.validate_response_text(text)
+
+
+@pytest.mark.parametrize("text,reason", INVALID)
+def test_public_helpers_reject(text, reason):
+    gpt_engine = pytest.importorskip("core.gpt_engine")
+    simulation = pytest.importorskip("domains.simulation.router")
+    assert gpt_engine.is_meaningless(text)
+    assert not simulation.validate_response_text(text)
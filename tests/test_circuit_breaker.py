@@ -0,0 +1,90 @@
+# core/circuit_breaker.py 상태 전이: closed → open → half_open(탐색 1건) → closed/open
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from core import circuit_breaker  # noqa: E402
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError  # noqa: E402
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def breaker(clock):
+    return CircuitBreaker("test", failure_threshold=3, reset_seconds=30)
+
+
+def _open(breaker):
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_single_probe(breaker, clock):
+    _open(breaker)
+    clock[0] += 30
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.is_open()
+
+    breaker.before_call()  # 탐색 호출
+    assert breaker.is_open()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_probe_success_closes(breaker, clock):
+    _open(breaker)
+    clock[0] += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_probe_failure_reopens_for_another_reset_period(breaker, clock):
+    _open(breaker)
+    clock[0] += 30
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock[0] += 29
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock[0] += 1
+    breaker.before_call()
+
+
+def test_released_probe_lets_next_call_probe(breaker, clock):
+    _open(breaker)
+    clock[0] += 30
+    breaker.before_call()
+    breaker.release_probe()  # 잘못된 요청 등 장애가 아닌 오류
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
@@ -0,0 +1,128 @@
+# core/fair_scheduler.py 가중 공정 큐잉: 실행 순서, 테넌트 동시 실행 상한, 대기열/대기 시간 상한
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from core import fair_scheduler  # noqa: E402
+from core.fair_scheduler import FairScheduler, TenantOverloadedError, resolve_tenant  # noqa: E402
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def _run_in_order(scheduler, tenants):
+    """blocker가 자리를 잡은 동안 tenants 순서로 대기열에 넣고, 풀어 준 뒤 실제 시작 순서를 반환"""
+    started = []
+    gate = asyncio.Event()
+
+    async def blocker():
+        async with scheduler.slot("blocker"):  # 비교 대상이 아닌 테넌트가 먼저 자리를 차지
+            await gate.wait()
+
+    async def job(tenant):
+        async with scheduler.slot(tenant):
+            started.append(tenant)
+            await asyncio.sleep(0)
+
+    tasks = [asyncio.create_task(blocker())]
+    await _settle()
+    for tenant in tenants:
+        tasks.append(asyncio.create_task(job(tenant)))
+        await _settle()
+    gate.set()
+    await asyncio.gather(*tasks)
+    return started
+
+
+def test_late_tenant_is_not_starved_behind_burst():
+    scheduler = FairScheduler("test", capacity=1, tenant_max_concurrency=1)
+    started = asyncio.run(_run_in_order(scheduler, ["a"] * 6 + ["b"] * 2))
+
+    assert started[:4].count("b") == 2  # a가 먼저 6건을 넣었어도 b가 번갈아 차례를 받음
+
+
+def test_weight_controls_share(monkeypatch):
+    monkeypatch.setattr(fair_scheduler, "TENANT_OVERRIDES", {"b": {"weight": 2}})
+    scheduler = FairScheduler("test", capacity=1, tenant_max_concurrency=1)
+    started = asyncio.run(_run_in_order(scheduler, ["a"] * 6 + ["b"] * 6))
+
+    assert started[:6].count("b") == 4
+
+
+def test_tenant_max_concurrency_leaves_room_for_others():
+    async def scenario():
+        scheduler = FairScheduler("test", capacity=3, tenant_max_concurrency=1)
+        gate = asyncio.Event()
+        running = []
+
+        async def job(tenant):
+            async with scheduler.slot(tenant):
+                running.append(tenant)
+                await gate.wait()
+
+        tasks = [asyncio.create_task(job(t)) for t in ("a", "a", "b")]
+        await _settle()
+        snapshot = sorted(running)
+        gate.set()
+        await asyncio.gather(*tasks)
+        return snapshot, sorted(running)
+
+    during, after = asyncio.run(scenario())
+    assert during == ["a", "b"]  # 자리가 남아도 a는 한 번에 1건만
+    assert after == ["a", "a", "b"]
+
+
+def test_queue_cap_rejects_with_overloaded_error():
+    async def scenario():
+        scheduler = FairScheduler("test", capacity=1, tenant_max_concurrency=1, max_queued=1)
+        gate = asyncio.Event()
+
+        async def job():
+            async with scheduler.slot("a"):
+                await gate.wait()
+
+        tasks = [asyncio.create_task(job()), asyncio.create_task(job())]  # 실행 1 + 대기 1
+        await _settle()
+        with pytest.raises(TenantOverloadedError):
+            async with scheduler.slot("a"):
+                pass
+        gate.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+
+def test_queue_timeout_rejects_and_frees_queue_entry():
+    async def scenario():
+        scheduler = FairScheduler("test", capacity=1, tenant_max_concurrency=1, queue_timeout=0.05)
+        gate = asyncio.Event()
+
+        async def holder():
+            async with scheduler.slot("a"):
+                await gate.wait()
+
+        task = asyncio.create_task(holder())
+        await _settle()
+        with pytest.raises(TenantOverloadedError):
+            async with scheduler.slot("b"):
+                pass
+        assert not scheduler._tenants["b"].waiters
+        gate.set()
+        await task
+        async with scheduler.slot("b"):
+            pass
+
+    asyncio.run(scenario())
+
+
+def test_resolve_tenant_maps_unknown_ids_to_default(monkeypatch):
+    monkeypatch.setattr(fair_scheduler, "TENANT_KNOWN_IDS", {"acme"})
+    assert resolve_tenant(" acme ") == "acme"
+    assert resolve_tenant("other") == "default"
+    assert resolve_tenant("") == "default"
+    assert resolve_tenant(None) == "default"
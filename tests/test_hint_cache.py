@@ -0,0 +1,76 @@
+# domains/simulation/service.py 힌트 캐시: 시나리오 지문이 바뀌거나 TTL이 지나면 다시 생성
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from domains.simulation import service  # noqa: E402
+from domains.simulation.service import HintCache, get_hints_with_cache  # noqa: E402
+
+
+def _scenario(scenario_id, content="주문 받기", tag="카페"):
+    return {"scenarioId": scenario_id, "scenarioContent": content, "scenarioTag": tag}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(service.time, "time", lambda: now[0])
+    return now
+
+
+def test_store_then_lookup_hits(clock):
+    cache = HintCache(ttl_seconds=60)
+    cache.store([_scenario(1), _scenario(2)], {"1": "힌트1", "2": "힌트2"})
+
+    hits, misses = cache.lookup([_scenario(1), _scenario(2), _scenario(3)])
+
+    assert hits == {"1": "힌트1", "2": "힌트2"}
+    assert [s["scenarioId"] for s in misses] == [3]
+
+
+def test_empty_hint_is_not_stored(clock):
+    cache = HintCache(ttl_seconds=60)
+    cache.store([_scenario(1)], {"1": ""})
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("changed", [_scenario(1, content="환불 요청"), _scenario(1, tag="편의점")])
+def test_changed_content_or_tag_misses(clock, changed):
+    cache = HintCache(ttl_seconds=60)
+    cache.store([_scenario(1)], {"1": "힌트1"})
+
+    hits, misses = cache.lookup([changed])
+
+    assert hits == {}
+    assert misses == [changed]
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = HintCache(ttl_seconds=60)
+    cache.store([_scenario(1)], {"1": "힌트1"})
+
+    clock[0] += 59
+    assert cache.lookup([_scenario(1)])[0] == {"1": "힌트1"}
+    clock[0] += 1
+    assert cache.lookup([_scenario(1)])[0] == {}
+
+
+def test_get_hints_generates_only_misses_and_fills_gaps(clock, monkeypatch):
+    cache = HintCache(ttl_seconds=60)
+    cache.store([_scenario(1)], {"1": "캐시 힌트"})
+    monkeypatch.setattr(service, "hint_cache", cache)
+    requested = []
+
+    def generate(scenarios):
+        requested.extend(s["scenarioId"] for s in scenarios)
+        return {"2": "GPT 힌트"}  # 3번은 GPT가 누락
+
+    def default_hints(missing):
+        return {str(s["scenarioId"]): "기본 힌트" for s in missing}
+
+    hints = get_hints_with_cache([_scenario(1), _scenario(2), _scenario(3)], generate, default_hints)
+
+    assert requested == [2, 3]
+    assert hints == {"1": "캐시 힌트", "2": "GPT 힌트", "3": "기본 힌트"}
+    assert cache.lookup([_scenario(3)])[0] == {}  # 기본 힌트는 캐시하지 않음
@@ -0,0 +1,100 @@
+# app/services/quiz_bank.py GPT 퀴즈 응답 파싱/검증, MinHash 중복 제거, 자료별 저장
+
+import json
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from app.services.quiz_bank import (  # noqa: E402
+    QuizBank,
+    QuizParseError,
+    minhash_signature,
+    parse_quiz_items,
+    signature_similarity,
+    source_key_for,
+)
+
+
+def _item(question="아메리카노 주문 시 가장 먼저 확인할 것은?", answer_index=1, options=None):
+    return {
+        "question": question,
+        "options": options or ["사이즈", "온도(핫/아이스)", "결제 수단", "적립 여부"],
+        "answer_index": answer_index,
+    }
+
+
+def test_parse_accepts_code_fence_and_surrounding_text():
+    text = "다음은 문제입니다.\n```json\n" + json.dumps([_item()], ensure_ascii=False) + "\n```\n참고하세요."
+    assert parse_quiz_items(text) == [_item()]
+
+
+def test_parse_normalizes_numeric_string_answer_index():
+    assert parse_quiz_items(json.dumps([_item(answer_index="2")]))[0]["answer_index"] == 2
+
+
+@pytest.mark.parametrize("bad", [
+    _item(answer_index=4),
+    _item(answer_index=True),
+    _item(answer_index=None),
+    _item(question="  "),
+    _item(options=["a", "b", "c"]),
+    _item(options=["a", "a", "b", "c"]),
+    _item(options=["a", "b", "c", " "]),
+    "문제",
+])
+def test_parse_drops_invalid_items(bad):
+    assert parse_quiz_items(json.dumps([bad, _item()], ensure_ascii=False)) == [_item()]
+
+
+@pytest.mark.parametrize("text", ["", "문제를 만들 수 없습니다.", "[{\"question\": ", json.dumps([_item(answer_index=7)])])
+def test_parse_raises_when_nothing_usable(text):
+    with pytest.raises(QuizParseError):
+        parse_quiz_items(text)
+
+
+def test_minhash_ignores_spacing_punctuation_and_width():
+    a = minhash_signature("아메리카노 주문 시, 가장 먼저 확인할 것은?")
+    b = minhash_signature("아메리카노주문 시 가장 먼저 확인할 것은 ？")
+    assert signature_similarity(a, b) == 1.0
+
+
+def test_minhash_separates_different_questions():
+    a = minhash_signature("아메리카노 주문 시 가장 먼저 확인할 것은? 온도")
+    b = minhash_signature("환불을 요청한 고객에게 먼저 안내할 내용은? 영수증")
+    assert signature_similarity(a, b) < 0.3
+
+
+def test_add_skips_near_duplicates_and_persists(tmp_path):
+    bank = QuizBank(root=str(tmp_path), threshold=0.8)
+    near_duplicate = _item(question="아메리카노 주문 시, 가장 먼저 확인할 것은??")
+    other = _item(question="환불을 요청한 고객에게 먼저 안내할 내용은?", answer_index=2)
+
+    added, duplicates = bank.add("doc-1", [_item(), near_duplicate])
+    assert (added, duplicates) == ([_item()], 1)
+
+    added, duplicates = bank.add("doc-1", [near_duplicate, other])
+    assert (added, duplicates) == ([other], 1)
+
+    reopened = QuizBank(root=str(tmp_path), threshold=0.8)
+    assert reopened.items("doc-1") == [_item(), other]  # 시그니처는 밖으로 내보내지 않음
+    assert reopened.items("doc-2") == []
+
+
+def test_same_question_with_different_answer_is_kept(tmp_path):
+    bank = QuizBank(root=str(tmp_path), threshold=0.8)
+    added, duplicates = bank.add("doc-1", [_item(answer_index=0), _item(answer_index=2)])
+    assert len(added) == 2 and duplicates == 0
+
+
+def test_draw_returns_at_most_stored(tmp_path):
+    bank = QuizBank(root=str(tmp_path))
+    bank.add("doc-1", [_item()])
+    assert bank.draw("doc-1", 5) == [_item()]
+
+
+def test_source_key_for():
+    assert source_key_for("doc", None, None, "본문") == "doc"
+    assert source_key_for("doc", 3, None, "본문") == "doc#3-end"
+    assert source_key_for("doc", None, 5, "본문") == "doc#1-5"
+    assert source_key_for(None, None, None, "본문") == source_key_for(None, 1, 2, "본문") != source_key_for(None, None, None, "다른 본문")
@@ -0,0 +1,34 @@
+# loadtest/stub_openai.py: 스텁이 실제 힌트 프롬프트에서 시나리오 ID를 전부 읽어 내는지
+# (프롬프트 형식이 바뀌면 스텁이 빈 힌트를 돌려주고 앱은 기본 힌트로 대체 → 부하 결과가 무의미해짐)
+
+import json
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("uvicorn")
+
+from domains.simulation.router import generate_hints_only_prompt  # noqa: E402
+from loadtest.stub_openai import _build_content, hint_ids  # noqa: E402
+
+
+def _prompt(scenarios):
+    # 스텁과 같은 방식으로 메시지 내용을 이어 붙임
+    return "\n".join(m["content"] for m in generate_hints_only_prompt(scenarios))
+
+
+def test_stub_returns_one_hint_per_requested_scenario():
+    scenarios = [
+        {"scenarioId": sid, "scenarioContent": f"상황 {sid}", "scenarioTag": "고객클레임"}
+        for sid in (144, 132, 162, 154, 112)
+    ]
+    prompt = _prompt(scenarios)
+
+    assert hint_ids(prompt) == ["144", "132", "162", "154", "112"]
+    hints = json.loads(_build_content(prompt))["responseHints"]
+    assert len(hints) == len(scenarios)
+    assert set(hints) == {str(s["scenarioId"]) for s in scenarios}
+
+
+def test_hint_ids_without_id_line():
+    assert hint_ids('{"responseHints": {"시나리오ID": "..."}}') == []
@@ -0,0 +1,48 @@
+# core/token_budget.py fit_messages: 입력 예산을 넘으면 마지막 user 메시지 뒤쪽만 잘라냄
+
+import pytest
+
+pytest.importorskip("tiktoken")
+pytest.importorskip("prometheus_client")
+
+from core import token_budget  # noqa: E402
+from core.token_budget import TRUNCATION_MARKER, count_message_tokens, fit_messages  # noqa: E402
+
+SYSTEM = {"role": "system", "content": "You are a helpful evaluator."}
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    limit = [0]
+    monkeypatch.setattr(token_budget, "input_budget", lambda route: limit[0])
+    return limit
+
+
+def _user(words: int, prefix: str = "word") -> dict:
+    return {"role": "user", "content": " ".join(f"{prefix}{i}" for i in range(words))}
+
+
+def test_within_budget_is_returned_unchanged(budget):
+    messages = [SYSTEM, _user(20)]
+    budget[0] = count_message_tokens(messages)
+    assert fit_messages("feedback", messages) is messages
+
+
+def test_over_budget_truncates_last_user_message_to_fit(budget):
+    messages = [SYSTEM, _user(10, "first"), {"role": "assistant", "content": "ok"}, _user(400)]
+    original = [dict(m) for m in messages]
+    budget[0] = count_message_tokens(messages) - 200
+
+    fitted = fit_messages("feedback", messages)
+
+    assert fitted[:3] == messages[:3]
+    assert fitted[3]["content"].endswith(TRUNCATION_MARKER)
+    assert messages[3]["content"].startswith(fitted[3]["content"][:-len(TRUNCATION_MARKER)])
+    assert count_message_tokens(fitted) <= budget[0]
+    assert messages == original  # 원본 목록은 바꾸지 않음
+
+
+def test_without_user_message_nothing_is_cut(budget):
+    messages = [SYSTEM, {"role": "assistant", "content": "word " * 200}]
+    budget[0] = 10
+    assert fit_messages("feedback", messages) == messages
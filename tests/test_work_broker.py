@@ -0,0 +1,47 @@
+# core/work_broker.py SqliteBroker: 오래된 작업 정리, pickle DB 경로 제한
+
+import os
+import time
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+from core.work_broker import SqliteBroker  # noqa: E402
+
+
+@pytest.fixture
+def broker(tmp_path):
+    os.chmod(tmp_path, 0o700)
+    return SqliteBroker(str(tmp_path / "jobs.sqlite3"), lease_seconds=60, poll_seconds=0.01)
+
+
+def test_purge_removes_only_expired_jobs(broker):
+    old = broker.submit("task", b"payload")
+    job = broker.claim("node", timeout=0)
+    broker.complete(job.job_id, "node", b"outcome")  # 결과를 아무도 가져가지 않은 done 행
+    time.sleep(0.05)
+    fresh = broker.submit("task", b"payload")
+
+    assert broker.purge(0.03) == 1
+    assert broker.result(old) is None
+    assert broker.claim("node", timeout=0).job_id == fresh
+
+
+def test_purge_keeps_jobs_within_retention(broker):
+    broker.submit("task", b"payload")
+    assert broker.purge(3600) == 0
+
+
+@pytest.mark.parametrize("path", ["file:jobs.sqlite3", "//fileserver/share/jobs.sqlite3", "sqlite://jobs"])
+def test_rejects_non_local_paths(path):
+    with pytest.raises(ValueError):
+        SqliteBroker(path)
+
+
+def test_rejects_directory_writable_by_others(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o777)
+    with pytest.raises(ValueError):
+        SqliteBroker(str(shared / "jobs.sqlite3"))